@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from analytics import stats
+from analytics.models import DashboardStats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized dashboard statistics (global, per country and per branch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help='Only recompute rows that signals have marked stale',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['stale']:
+            rows = 0
+            for row in DashboardStats.objects.filter(is_stale=True).iterator():
+                stats.refresh(row.scope, country_id=row.country_id, branch_id=row.branch_id)
+                rows += 1
+        else:
+            rows = stats.rollup()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Dashboard stats recomputed: {rows} rows in {elapsed:.2f}s'))
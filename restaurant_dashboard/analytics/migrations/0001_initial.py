@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('country', 'Country'), ('branch', 'Branch')], max_length=10)),
+                ('total_branches', models.PositiveIntegerField(default=0)),
+                ('branches_with_ordering', models.PositiveIntegerField(default=0)),
+                ('staff_count', models.PositiveIntegerField(default=0)),
+                ('microsites_live', models.PositiveIntegerField(default=0)),
+                ('recent_menu_items', models.JSONField(blank=True, default=list)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField()),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='management.branch')),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='management.country')),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('scope', 'global')), fields=('scope',), name='dashboard_stats_one_global'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('scope', 'country')), fields=('country',), name='dashboard_stats_one_per_country'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('scope', 'branch')), fields=('branch',), name='dashboard_stats_one_per_branch'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# analytics/models.py
+from django.db import models
+from management.models import Country, Branch
+
+class DashboardStats(models.Model):
+    """
+    Materialized dashboard statistics for one scope: everything, one country
+    or one branch. Rows are marked stale by signals when their inputs change
+    and recomputed on the next read or by `rollup_dashboard_stats`.
+    """
+    GLOBAL = 'global'
+    COUNTRY = 'country'
+    BRANCH = 'branch'
+
+    SCOPE_CHOICES = [
+        (GLOBAL, 'Global'),
+        (COUNTRY, 'Country'),
+        (BRANCH, 'Branch'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+
+    total_branches = models.PositiveIntegerField(default=0)
+    branches_with_ordering = models.PositiveIntegerField(default=0)
+    staff_count = models.PositiveIntegerField(default=0)
+    microsites_live = models.PositiveIntegerField(default=0)
+    recent_menu_items = models.JSONField(default=list, blank=True)
+
+    is_stale = models.BooleanField(default=False)
+    # Bumped every time the row is marked stale, so a recomputation that
+    # raced with a change doesn't mark its result fresh
+    stale_version = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Dashboard stats"
+        constraints = [
+            models.UniqueConstraint(fields=['scope'], condition=models.Q(scope='global'),
+                                    name='dashboard_stats_one_global'),
+            models.UniqueConstraint(fields=['country'], condition=models.Q(scope='country'),
+                                    name='dashboard_stats_one_per_country'),
+            models.UniqueConstraint(fields=['branch'], condition=models.Q(scope='branch'),
+                                    name='dashboard_stats_one_per_branch'),
+        ]
+
+    def __str__(self):
+        if self.scope == self.COUNTRY:
+            return f"Dashboard stats (country {self.country_id})"
+        if self.scope == self.BRANCH:
+            return f"Dashboard stats (branch {self.branch_id})"
+        return "Dashboard stats (global)"
@@ -0,0 +1,76 @@
+# analytics/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from content.models import MenuItem
+from management.models import Branch
+from microsites.models import Microsite
+from users.models import User
+from . import stats
+
+
+def mark_branches_stale(branch_ids):
+    branch_ids = set(branch_ids)
+    stats.mark_stale(
+        country_ids=Branch.objects.filter(pk__in=branch_ids).values_list('country_id', flat=True),
+        branch_ids=branch_ids,
+    )
+
+
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def mark_stale_on_branch_change(sender, instance, **kwargs):
+    # The branch may have moved between countries, so every country row is affected
+    stats.mark_stale(all_countries=True, branch_ids=[instance.pk])
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_branch(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and not (update_fields and set(update_fields) <= {'last_login'}):
+        instance._stats_previous_branch_id = User.objects.filter(
+            pk=instance.pk).values_list('branch_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def mark_stale_on_user_change(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no statistic depends on
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    branch_ids = [instance.branch_id, getattr(instance, '_stats_previous_branch_id', None)]
+    stats.mark_stale(all_countries=True, branch_ids=[pk for pk in branch_ids if pk])
+
+
+@receiver(post_save, sender=Microsite)
+@receiver(pre_delete, sender=Microsite)
+def mark_stale_on_microsite_change(sender, instance, **kwargs):
+    stats.mark_microsites_stale([instance.pk])
+
+
+@receiver(m2m_changed, sender=Microsite.branches.through)
+def mark_stale_on_microsite_branches(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # branch.microsites.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            mark_branches_stale([instance.pk])
+    elif action == 'pre_clear':
+        mark_branches_stale(instance.branches.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        mark_branches_stale(pk_set)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(pre_delete, sender=MenuItem)
+def mark_stale_on_menu_item_change(sender, instance, **kwargs):
+    stats.mark_microsites_stale(instance.microsites.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=MenuItem.microsites.through)
+def mark_stale_on_menu_item_microsites(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # microsite.menu_items.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            stats.mark_microsites_stale([instance.pk])
+    elif action == 'pre_clear':
+        stats.mark_microsites_stale(instance.microsites.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        stats.mark_microsites_stale(pk_set)
@@ -0,0 +1,216 @@
+# analytics/stats.py
+"""
+Computing and reading the materialized DashboardStats rows.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Prefetch, Q, Value, When
+from django.utils import timezone
+from utils.single_flight import single_flight
+from imaging.thumbnails import thumbnail_url
+from content.models import MenuItem
+from management.models import Branch, Country
+from microsites.models import Microsite, MicrositeVisibility
+from users.models import User
+from .models import DashboardStats
+
+RECENT_MENU_ITEMS = 5
+RECENT_MENU_ITEM_THUMBNAIL = 128  # px; one of THUMBNAIL_SIZES
+
+
+def scope_filter(scope, country_id=None, branch_id=None):
+    """
+    Lookup kwargs identifying the row of one scope.
+    """
+    if scope == DashboardStats.COUNTRY:
+        return {'scope': scope, 'country_id': country_id}
+    if scope == DashboardStats.BRANCH:
+        return {'scope': scope, 'branch_id': branch_id}
+    return {'scope': DashboardStats.GLOBAL}
+
+
+def compute(scope, country_id=None, branch_id=None):
+    """
+    Return the DashboardStats field values for one scope.
+
+    One aggregate query per table (branch counts use conditional aggregation),
+    so the number of queries doesn't grow with the number of rows in scope.
+    """
+    branches = Branch.objects.all()
+    staff = User.objects.filter(is_staff=False)
+    microsites = Microsite.objects.filter(is_active=True)
+    if scope == DashboardStats.COUNTRY:
+        branches = branches.filter(country_id=country_id)
+        staff = staff.filter(Q(country_id=country_id) | Q(branch__country_id=country_id))
+        microsites = microsites.filter(pk__in=MicrositeVisibility.objects.filter(
+            country_id=country_id).values('microsite_id'))
+    elif scope == DashboardStats.BRANCH:
+        branches = branches.filter(pk=branch_id)
+        staff = staff.filter(branch_id=branch_id)
+        microsites = microsites.filter(pk__in=MicrositeVisibility.objects.filter(
+            branch_id=branch_id).values('microsite_id'))
+
+    branch_counts = branches.aggregate(
+        total=Count('pk'),
+        with_ordering=Count('pk', filter=Q(has_online_ordering=True)),
+    )
+    return {
+        'total_branches': branch_counts['total'],
+        'branches_with_ordering': branch_counts['with_ordering'],
+        'staff_count': staff.count(),
+        'microsites_live': microsites.count(),
+        'recent_menu_items': recent_menu_items(scope, country_id, branch_id),
+    }
+
+
+def recent_menu_items(scope, country_id=None, branch_id=None):
+    items = MenuItem.objects.all()
+    if scope != DashboardStats.GLOBAL:
+        # A subquery, so the filter doesn't narrow the branches_count join below
+        visible = MicrositeVisibility.objects.filter(
+            **({'country_id': country_id} if scope == DashboardStats.COUNTRY else {'branch_id': branch_id})
+        ).values('microsite_id')
+        items = items.filter(pk__in=MenuItem.microsites.through.objects.filter(
+            microsite_id__in=visible).values('menuitem_id'))
+
+    # `branches` sums the branch count of every microsite the item is on
+    items = items.annotate(
+        branches_count=Count('microsites__branches')
+    ).prefetch_related(
+        Prefetch('microsites', queryset=Microsite.objects.only('id', 'name').order_by('id'))
+    ).order_by('-created_at', '-id')[:RECENT_MENU_ITEMS]
+
+    recent = []
+    for item in items:
+        microsites = list(item.microsites.all())
+        recent.append({
+            'id': item.id,
+            'name': item.name,
+            'branch': microsites[0].name if microsites else "No Microsite",
+            'branches': item.branches_count,
+            # Made absolute per request when the row is read
+            'image': thumbnail_url(item.image.name, RECENT_MENU_ITEM_THUMBNAIL) if item.image else None,
+        })
+    return recent
+
+
+def refresh(scope, country_id=None, branch_id=None):
+    """
+    Recompute and store the row of one scope.
+
+    The row is only marked fresh if nothing marked it stale while it was
+    being computed; otherwise it keeps the new values but stays stale.
+    """
+    lookup = scope_filter(scope, country_id, branch_id)
+    seen = DashboardStats.objects.filter(**lookup).values_list('stale_version', flat=True).first()
+    values = {**compute(scope, country_id, branch_id), 'computed_at': timezone.now()}
+    if seen is None:
+        try:
+            with transaction.atomic():
+                return DashboardStats.objects.create(**lookup, **values)
+        except IntegrityError:
+            # Created concurrently by another request
+            return DashboardStats.objects.get(**lookup)
+
+    DashboardStats.objects.filter(**lookup).update(
+        **values, is_stale=Case(When(stale_version=seen, then=Value(False)), default=Value(True)),
+    )
+    return DashboardStats.objects.get(**lookup)
+
+
+def scope_for_access(access):
+    """
+    The (scope, country_id, branch_id) an AccessContext's statistics cover,
+    or None for users who see nothing.
+    """
+    if access.is_leadership:
+        return DashboardStats.GLOBAL, None, None
+    if access.is_country_level:
+        return DashboardStats.COUNTRY, access.country_id, None
+    if access.is_branch_manager:
+        return DashboardStats.BRANCH, None, access.branch_id
+    return None
+
+
+def get_stats_for_access(access):
+    """
+    Return the statistics row the user's role may see; an unsaved all-zero
+    row for users without a scope.
+    """
+    scope = scope_for_access(access)
+    if scope is None:
+        return DashboardStats(scope=DashboardStats.GLOBAL, computed_at=timezone.now())
+    return get_stats(*scope)
+
+
+def get_stats(scope=DashboardStats.GLOBAL, country_id=None, branch_id=None):
+    """
+    Return the current row of one scope, recomputing it if missing or stale.
+
+    Only one process recomputes a scope at a time. While it does, others
+    serve the stale row if there is one, or wait for the new row if not. A
+    row invalidated during the recomputation is returned but stays stale,
+    so the next read recomputes it again.
+    """
+    lookup = scope_filter(scope, country_id, branch_id)
+    stats = DashboardStats.objects.filter(**lookup).first()
+    if stats is not None and not stats.is_stale:
+        return stats
+
+    lock_name = 'analytics:dashboard-stats:' + ':'.join(str(value) for value in lookup.values())
+    with single_flight(lock_name, timeout=0 if stats is not None else None) as acquired:
+        if acquired:
+            # Another process may have refreshed the row while we waited
+            current = DashboardStats.objects.filter(**lookup).first()
+            if current is not None and not current.is_stale:
+                return current
+            return refresh(scope, country_id, branch_id)
+
+    if stats is not None:
+        # Stale while revalidate: someone else is recomputing it
+        return stats
+    return refresh(scope, country_id, branch_id)
+
+
+def mark_stale(country_ids=(), branch_ids=(), all_countries=False, all_branches=False):
+    """
+    Flag the global row and the given country/branch rows for recomputation.
+    """
+    scopes = Q(scope=DashboardStats.GLOBAL)
+    if all_countries:
+        scopes |= Q(scope=DashboardStats.COUNTRY)
+    elif country_ids:
+        scopes |= Q(scope=DashboardStats.COUNTRY, country_id__in=set(country_ids))
+    if all_branches:
+        scopes |= Q(scope=DashboardStats.BRANCH)
+    elif branch_ids:
+        scopes |= Q(scope=DashboardStats.BRANCH, branch_id__in=set(branch_ids))
+    # Rows already stale are bumped too: one may be being recomputed
+    return DashboardStats.objects.filter(scopes).update(is_stale=True, stale_version=F('stale_version') + 1)
+
+
+def mark_microsites_stale(microsite_ids):
+    """
+    Flag the rows of every country and branch that sees one of the microsites.
+    """
+    visibility = MicrositeVisibility.objects.filter(microsite_id__in=list(microsite_ids))
+    rows = list(visibility.values_list('country_id', 'branch_id'))
+    return mark_stale(
+        country_ids=[country_id for country_id, _ in rows],
+        branch_ids=[branch_id for _, branch_id in rows],
+    )
+
+
+def rollup():
+    """
+    Recompute every scope: global, each country and each branch.
+    Returns the number of rows written.
+    """
+    refresh(DashboardStats.GLOBAL)
+    rows = 1
+    for country_id in Country.objects.values_list('pk', flat=True).iterator():
+        refresh(DashboardStats.COUNTRY, country_id=country_id)
+        rows += 1
+    for branch_id in Branch.objects.values_list('pk', flat=True).iterator():
+        refresh(DashboardStats.BRANCH, branch_id=branch_id)
+        rows += 1
+    return rows
@@ -0,0 +1,161 @@
+# analytics/test.py
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from content.models import MenuItem
+from management.models import Country, Branch
+from microsites.models import Microsite
+from users.models import User, UserRole
+from utils.single_flight import FileLock
+from .models import DashboardStats
+from . import stats
+
+
+class DashboardStatsSnapshotTest(TestCase):
+    def setUp(self):
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.user = User.objects.create_user(email='lead@example.com', password='secret', role=role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        country = Country.objects.create(name='Test Country', code='TST')
+        branches = [
+            Branch.objects.create(name=f'Branch {i}', country=country, address='1 Test St', has_online_ordering=i == 0)
+            for i in range(3)
+        ]
+        self.microsite = Microsite.objects.create(name='Test Site')
+        self.microsite.branches.add(*branches)
+        other = Microsite.objects.create(name='Other Site')
+        other.branches.add(branches[0])
+
+        item = MenuItem.objects.create(name='Dish')
+        item.microsites.add(self.microsite, other)
+
+    def test_endpoint_reads_one_row(self):
+        response = self.client.get('/api/analytics/dashboard-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['statistics']['branchesWithOrdering']['count'], 1)
+        self.assertEqual(response.data['statistics']['micrositesLive']['count'], 2)
+        self.assertEqual(response.data['recentMenuItems'][0]['branches'], 4)
+        self.assertIsNotNone(response.data['statsComputedAt'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/analytics/dashboard-stats/')
+        self.assertEqual(len(queries), 1)
+
+    def test_changes_mark_snapshot_stale(self):
+        self.client.get('/api/analytics/dashboard-stats/')
+
+        MenuItem.objects.create(name='New Dish').microsites.add(self.microsite)
+        self.assertTrue(DashboardStats.objects.get(scope=DashboardStats.GLOBAL).is_stale)
+
+        response = self.client.get('/api/analytics/dashboard-stats/')
+        self.assertEqual(response.data['recentMenuItems'][0]['name'], 'New Dish')
+        self.assertFalse(DashboardStats.objects.get(scope=DashboardStats.GLOBAL).is_stale)
+
+    def test_change_during_refresh_keeps_row_stale(self):
+        stats.refresh(DashboardStats.GLOBAL)
+        stats.mark_stale()
+        compute = stats.compute
+
+        def compute_then_change(*args):
+            values = compute(*args)
+            # A change committed while the old values were being computed
+            stats.mark_stale()
+            return values
+
+        with mock.patch('analytics.stats.compute', compute_then_change):
+            row = stats.refresh(DashboardStats.GLOBAL)
+        self.assertTrue(row.is_stale)
+
+        self.assertFalse(stats.refresh(DashboardStats.GLOBAL).is_stale)
+
+
+class ScopedDashboardStatsTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(name='Country A', code='AAA')
+        other_country = Country.objects.create(name='Country B', code='BBB')
+        Branch.objects.create(name='Branch A', country=self.country, address='1 A St', has_online_ordering=True)
+        Branch.objects.create(name='Branch B', country=other_country, address='1 B St', has_online_ordering=True)
+
+        role = UserRole.objects.create(name=UserRole.COUNTRY_ADMIN)
+        user = User.objects.create_user(email='admin@example.com', password='secret', role=role, country=self.country)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def fetch_stale(self):
+        DashboardStats.objects.update(is_stale=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/analytics/dashboard-stats/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_stats_are_scoped_to_country(self):
+        response, _ = self.fetch_stale()
+        self.assertEqual(response.data['statistics']['branchesWithOrdering']['count'], 1)
+        self.assertEqual(response.data['staffCount'], 1)
+
+    def test_query_count_does_not_grow_with_branches(self):
+        self.client.get('/api/analytics/dashboard-stats/')  # creates the country row
+        _, queries_with_one_branch = self.fetch_stale()
+
+        Branch.objects.bulk_create([
+            Branch(name=f'Branch {i}', country=self.country, address='1 A St', has_online_ordering=True)
+            for i in range(9999)
+        ])
+        response, queries_with_many_branches = self.fetch_stale()
+
+        self.assertEqual(response.data['statistics']['branchesWithOrdering']['count'], 10000)
+        self.assertEqual(queries_with_many_branches, queries_with_one_branch)
+
+
+class SingleFlightTest(TestCase):
+    def test_file_lock_excludes_other_holders(self):
+        with override_settings(SINGLE_FLIGHT_LOCK_DIR=self.enterContext(tempfile.TemporaryDirectory())):
+            first, second = FileLock('stats'), FileLock('stats')
+            self.assertTrue(first.try_acquire())
+            self.assertFalse(second.try_acquire())
+            first.release()
+            self.assertTrue(second.try_acquire())
+            second.release()
+
+    def test_stale_row_is_served_while_another_process_recomputes(self):
+        stats.refresh(DashboardStats.GLOBAL)
+        Branch.objects.create(
+            name='Branch', country=Country.objects.create(name='C', code='CCC'), address='1 St', has_online_ordering=True
+        )
+
+        @contextmanager
+        def lock_held_elsewhere(name, timeout=None):
+            yield False
+
+        with mock.patch('analytics.stats.single_flight', lock_held_elsewhere), \
+                mock.patch('analytics.stats.refresh') as refresh:
+            row = stats.get_stats(DashboardStats.GLOBAL)
+
+        refresh.assert_not_called()
+        self.assertTrue(row.is_stale)
+        self.assertEqual(row.branches_with_ordering, 0)
+
+    def test_change_during_coalesced_refresh_is_not_lost(self):
+        stats.refresh(DashboardStats.GLOBAL)
+        stats.mark_stale()
+        compute = stats.compute
+
+        def compute_then_change(*args):
+            values = compute(*args)
+            Branch.objects.create(
+                name='Branch', country=Country.objects.create(name='C', code='CCC'), address='1 St',
+                has_online_ordering=True,
+            )
+            return values
+
+        with mock.patch('analytics.stats.compute', compute_then_change):
+            self.assertEqual(stats.get_stats(DashboardStats.GLOBAL).branches_with_ordering, 0)
+
+        # The branch's signal kept the row stale, so the next read recomputes it
+        self.assertEqual(stats.get_stats(DashboardStats.GLOBAL).branches_with_ordering, 1)
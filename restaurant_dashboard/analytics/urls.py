@@ -1,7 +1,8 @@
 # analytics/urls.py
 from django.urls import path
-from .views import DashboardStatsAPIView
+from .views import DashboardStatsAPIView, ResponseCacheStatsAPIView
 
 urlpatterns = [
     path('dashboard-stats/', DashboardStatsAPIView.as_view(), name='dashboard_stats'),
+    path('response-cache-stats/', ResponseCacheStatsAPIView.as_view(), name='response_cache_stats'),
 ]
\ No newline at end of file
@@ -3,11 +3,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
-from management.models import Branch
-from content.models import MenuItem
-from users.models import User
-from microsites.models import Microsite
+from users.access import get_access_context
+from users.permissions import IsLeadershipTeam
+from utils import response_cache
+from . import stats
 # Add this import
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse, inline_serializer
 from rest_framework import serializers
@@ -29,13 +28,14 @@ class DashboardStatsResponseSerializer(serializers.Serializer):
         child=serializers.DictField(),
         help_text="Traffic statistics by region"
     )
+    statsComputedAt = serializers.DateTimeField(help_text="When the statistics snapshot was computed")
 
 class DashboardStatsAPIView(APIView):
     permission_classes = [IsAuthenticated]
     
     @extend_schema(
         summary="Get dashboard statistics",
-        description="Returns various statistics and metrics for the dashboard including branch data, user counts, web traffic, and social media metrics.",
+        description="Returns various statistics and metrics for the dashboard including branch data, user counts, web traffic, and social media metrics. Counts are scoped to the user's role: leadership sees everything, country roles their country, branch managers their branch.",
         tags=["Analytics"],
         responses={
             200: OpenApiResponse(
@@ -60,38 +60,24 @@ class DashboardStatsAPIView(APIView):
                     "staffCount": 25,
                     "webTraffic": {"total": 320958, "growth": 20.9},
                     "socialMedia": {"likes": 306500, "comments": 27500},
-                    "trafficByRegion": [{"region": "Region A", "visits": 44}]
+                    "trafficByRegion": [{"region": "Region A", "visits": 44}],
+                    "statsComputedAt": "2025-03-21T09:06:00Z"
                 }
             )
         ]
     )
     def get(self, request):
-        # Get counts
-        total_branches = Branch.objects.count()
-        branches_with_ordering = Branch.objects.filter(has_online_ordering=True).count()
-        total_staff = User.objects.filter(is_staff=False).count()
-        total_microsites = Microsite.objects.filter(is_active=True).count()
-        
-    # Get recent menu items
-        recent_menu_items = []
-        menu_items = MenuItem.objects.prefetch_related('microsites').order_by('-created_at')[:5]
-        for item in menu_items:
-            # Get the first associated microsite or use a default
-            microsites = list(item.microsites.all())
-            microsite_name = microsites[0].name if microsites else "No Microsite"
-            
-            # Count branches for all microsites of this menu item
-            branches_count = 0
-            for microsite in microsites:
-                branches_count += microsite.branches.count()
-            
-            recent_menu_items.append({
-                'id': item.id,
-                'name': item.name,
-                'branch': microsite_name,
-                'branches': branches_count,
-                'image': request.build_absolute_uri(item.image.url) if item.image else None
-            })
+        # Counts and recent menu items come from the materialized snapshot of
+        # the user's scope: everything, their country or their branch
+        snapshot = stats.get_stats_for_access(get_access_context(request))
+        total_staff = snapshot.staff_count
+        branches_with_ordering = snapshot.branches_with_ordering
+        total_microsites = snapshot.microsites_live
+
+        recent_menu_items = [
+            {**item, 'image': request.build_absolute_uri(item['image']) if item['image'] else None}
+            for item in snapshot.recent_menu_items
+        ]
     
         
         # Mock web traffic data
@@ -149,7 +135,26 @@ class DashboardStatsAPIView(APIView):
             'staffCount': total_staff,
             'webTraffic': web_traffic,
             'socialMedia': social_media,
-            'trafficByRegion': traffic_by_region
+            'trafficByRegion': traffic_by_region,
+            'statsComputedAt': snapshot.computed_at
         }
         
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ResponseCacheStatsAPIView(APIView):
+    permission_classes = [IsLeadershipTeam]
+
+    @extend_schema(
+        summary="Get response cache statistics",
+        description="Returns hits, misses and hit ratio of the shared list response cache per endpoint, "
+                    "and how many times each model's cached responses were invalidated, across all "
+                    "worker processes.",
+        tags=["Analytics"],
+        responses={
+            200: OpenApiResponse(description="Response cache statistics"),
+            403: OpenApiResponse(description="Leadership team only")
+        }
+    )
+    def get(self, request):
+        return Response(response_cache.get_stats(), status=status.HTTP_200_OK)
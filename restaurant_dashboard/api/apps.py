@@ -2,4 +2,12 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
\ No newline at end of file
+    name = 'api'
+
+    def ready(self):
+        # Define the cached viewsets, then invalidate the shared response
+        # cache on changes to the models they list
+        from django.utils.module_loading import autodiscover_modules
+        from utils import response_cache
+        autodiscover_modules('views')
+        response_cache.connect_signals()
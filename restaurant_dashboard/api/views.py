@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from users.serializers import UserSerializer
+from users.authentication import ClaimsTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
 # Add these imports
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from drf_spectacular.utils import extend_schema_view
@@ -27,7 +28,8 @@ class UserInfoView(APIView):
         }
     )
     def get(self, request):
-        user = request.user
+        # Read requests are authenticated from token claims only; load the full profile
+        user = User.objects.select_related('role', 'country', 'branch').get(pk=request.user.pk)
         serializer = UserSerializer(user)
         return Response(serializer.data)
 
@@ -84,6 +86,9 @@ from drf_spectacular.utils import extend_schema
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 
 class CustomTokenObtainPairView(TokenObtainPairView):
+    # Access tokens carry role, country_id, branch_id and claims_version claims
+    serializer_class = ClaimsTokenObtainPairSerializer
+    
     @extend_schema(
         summary="Obtain JWT token pair",
         description="Takes a set of user credentials and returns an access and refresh JSON web token pair",
@@ -97,6 +102,9 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         return super().post(request, *args, **kwargs)
 
 class CustomTokenRefreshView(TokenRefreshView):
+    # Re-reads the user so refreshed access tokens carry current claims
+    serializer_class = ClaimsTokenRefreshSerializer
+    
     @extend_schema(
         summary="Refresh JWT token",
         description="Takes a refresh type JSON web token and returns an access type JSON web token",
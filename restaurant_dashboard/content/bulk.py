@@ -0,0 +1,131 @@
+# content/bulk.py
+"""
+Writing many menu items at once, and the side effects of menu item writes
+that bypass model signals (bulk_create, bulk_update, queryset update and
+raw deletes): what content/signals.py, analytics/signals.py and
+imaging/signals.py would otherwise do row by row.
+"""
+from collections import Counter
+
+from django.utils import timezone
+from analytics import stats
+from imaging import blobs
+from imaging import jobs as image_jobs
+from imaging.models import ImageStatus
+from microsites import bundle
+from microsites.models import Microsite
+from utils.response_cache import bump_version
+from .models import MenuItem
+
+BATCH_SIZE = 500
+
+
+def menu_items_changed(item_ids, microsite_ids=()):
+    """
+    Invalidate everything built from the given menu items: cached lists,
+    the bundles of their microsites and the dashboard statistics of every
+    scope seeing them. `microsite_ids` adds microsites the items were
+    linked to before the write.
+    """
+    linked = MenuItem.microsites.through.objects.filter(menuitem_id__in=list(item_ids))
+    microsite_ids = set(microsite_ids) | set(linked.values_list('microsite_id', flat=True))
+    bump_version(MenuItem)
+    bundle.invalidate(microsite_ids)
+    stats.mark_microsites_stale(microsite_ids)
+
+
+def link_microsites(links):
+    """
+    Insert (menu item id, microsite id) links with one statement.
+    """
+    Link = MenuItem.microsites.through
+    created = Link.objects.bulk_create(
+        [Link(menuitem_id=item_id, microsite_id=microsite_id) for item_id, microsite_id in links],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+    if created:
+        bump_version(Microsite)
+
+
+def unlink_microsites(item_ids):
+    """
+    Remove every microsite link of the given items with one statement.
+    Returns the ids of the microsites they were linked to.
+    """
+    links = MenuItem.microsites.through.objects.filter(menuitem_id__in=list(item_ids))
+    microsite_ids = set(links.values_list('microsite_id', flat=True))
+    if microsite_ids:
+        # A plain DELETE: a queryset delete() would load and signal every row
+        links._raw_delete(links.db)
+        bump_version(Microsite)
+    return microsite_ids
+
+
+def create_menu_items(rows):
+    """
+    Insert menu items from validated serializer data, with one statement for
+    the items and one for their microsite links. Returns the new items.
+    Run it in a transaction.
+    """
+    items = MenuItem.objects.bulk_create([
+        MenuItem(**{name: value for name, value in row.items() if name != 'microsites'}) for row in rows
+    ], batch_size=BATCH_SIZE)
+    link_microsites([
+        (item.pk, microsite.pk) for item, row in zip(items, rows) for microsite in row.get('microsites', ())
+    ])
+    menu_items_changed([item.pk for item in items])
+    return items
+
+
+def update_menu_items(items, rows):
+    """
+    Apply validated (partial) serializer data to the matching menu items,
+    with one bulk_update for the rows and, for items given microsites, one
+    statement each to remove and insert their links. Images can only be
+    removed here; uploads go through MenuItemViewSet.bulk_upload_images.
+    Run it in a transaction.
+    """
+    update_fields = {'updated_at'}
+    released = Counter()
+    relinked = {}
+    now = timezone.now()
+    for item, row in zip(items, rows):
+        for name, value in row.items():
+            if name == 'microsites':
+                relinked[item.pk] = value
+                continue
+            if name == 'image' and not value:
+                released += image_jobs.referenced_names(item, 'image') or Counter()
+                item.image_status, item.image_variants = ImageStatus.NONE, {}
+                update_fields.update(('image_status', 'image_variants'))
+            setattr(item, name, value)
+            update_fields.add(name)
+        item.updated_at = now
+    MenuItem.objects.bulk_update(items, sorted(update_fields), batch_size=BATCH_SIZE)
+    blobs.decref(released.elements())
+
+    previous = unlink_microsites(relinked)
+    link_microsites([
+        (item_id, microsite.pk) for item_id, microsites in relinked.items() for microsite in microsites
+    ])
+    menu_items_changed([item.pk for item in items], previous)
+    return items
+
+
+def delete_menu_items(items):
+    """
+    Delete menu items with one statement for their microsite links and one
+    for the rows, releasing their images. Returns the number deleted.
+    Run it in a transaction.
+    """
+    item_ids = [item.pk for item in items]
+    released = Counter()
+    for item in items:
+        released += image_jobs.referenced_names(item, 'image') or Counter()
+    microsite_ids = unlink_microsites(item_ids)
+    # Nothing else references menu items; pending image jobs find them gone
+    deleted = MenuItem.objects.filter(pk__in=item_ids)
+    deleted._raw_delete(deleted.db)
+    blobs.decref(released.elements())
+    menu_items_changed(item_ids, microsite_ids)
+    return len(item_ids)
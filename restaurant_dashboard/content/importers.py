@@ -0,0 +1,315 @@
+# content/importers.py
+"""
+Importing branches, microsites, menu items and testimonials from CSV rows,
+one chunk at a time (the `import_content` command).
+
+A chunk costs a fixed number of queries however many rows it has: one
+lookup per kind of reference its rows make (country codes, microsite
+site_ids, branch names), one insert for the rows and one for their
+many-to-many links. Bulk inserts send no signals, so each importer applies
+their side effects (visibility rows, caches, bundles, statistics) once per
+chunk.
+
+Columns are named after model fields. Multi-valued columns (microsites,
+branches) separate their values with ';'. Empty cells take the field's
+default.
+"""
+from django.core.exceptions import ValidationError
+from django.db import models
+from analytics import stats
+from management.models import Branch, Country
+from microsites import bundle, visibility
+from microsites.models import Microsite
+from utils.conditional import touch
+from utils.response_cache import bump_version
+from .bulk import BATCH_SIZE, menu_items_changed
+from .models import MenuItem, Testimonial
+
+
+class RowError(ValueError):
+    pass
+
+
+TRUE_VALUES = {'true', 'yes', 'y', '1', 't'}
+FALSE_VALUES = {'false', 'no', 'n', '0', 'f'}
+
+
+def to_python(field, raw):
+    if isinstance(field, models.BooleanField):
+        if raw.lower() in TRUE_VALUES | FALSE_VALUES:
+            return raw.lower() in TRUE_VALUES
+        raise ValidationError(f'"{raw}" is not one of yes/no, true/false or 1/0.')
+    return field.to_python(raw)
+
+
+def split_values(value):
+    return [part.strip() for part in (value or '').split(';') if part.strip()]
+
+
+class Importer:
+    """
+    Builds model instances from rows and writes them in bulk, with links
+    to other rows through `link_model`, whose `link_fields` are the column
+    of the imported row and of the linked row.
+    """
+    model = None
+    fields = ()
+    required = ('name',)
+    link_model = None
+    link_fields = ()
+
+    def __init__(self):
+        # Unique values seen earlier in the file
+        self.seen = set()
+
+    def lookups(self, rows):
+        """
+        What `build()` needs to resolve the references of `rows`, loaded
+        with one query per kind of reference.
+        """
+        return {}
+
+    def build(self, row, lookups):
+        """
+        An unsaved instance for `row` and the ids of the rows to link it to.
+        Raises RowError if the row is invalid.
+        """
+        raise NotImplementedError
+
+    def changed(self, instances, linked_ids):
+        """
+        Apply the side effects signals would have for the new rows.
+        """
+
+    def parse(self, row):
+        values = {}
+        for name in self.fields:
+            raw = (row.get(name) or '').strip()
+            if not raw:
+                continue
+            try:
+                values[name] = to_python(self.model._meta.get_field(name), raw)
+            except ValidationError as e:
+                raise RowError(f'{name}: {" ".join(e.messages)}')
+        missing = [name for name in self.required if name not in values]
+        if missing:
+            raise RowError(f'{", ".join(missing)} required')
+        return values
+
+    def validate(self, instance, resolved=()):
+        # References were resolved from the lookups; don't query them per row
+        try:
+            instance.full_clean(exclude=resolved, validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            raise RowError('; '.join(f'{name}: {" ".join(messages)}' for name, messages in e.message_dict.items()))
+        return instance
+
+    def import_chunk(self, rows):
+        """
+        Import (line number, row) pairs. Returns the number of rows written
+        and (line number, error) for each invalid row, which is skipped.
+        """
+        lookups = self.lookups([row for _, row in rows])
+        built, errors = [], []
+        for line, row in rows:
+            try:
+                built.append(self.build(row, lookups))
+            except RowError as e:
+                errors.append((line, str(e)))
+
+        instances = self.model.objects.bulk_create([instance for instance, _ in built], batch_size=BATCH_SIZE)
+        own, other = self.link_fields
+        self.link_model.objects.bulk_create([
+            self.link_model(**{own: instance.pk, other: linked_id})
+            for instance, (_, linked_ids) in zip(instances, built) for linked_id in linked_ids
+        ], batch_size=BATCH_SIZE)
+        if instances:
+            self.changed(instances, {linked_id for _, linked_ids in built for linked_id in linked_ids})
+        return len(instances), errors
+
+
+class MicrositeLinksMixin:
+    """
+    For rows linked to microsites by a `microsites` column of site_ids.
+    """
+    def microsite_lookup(self, rows):
+        site_ids = {site_id for row in rows for site_id in split_values(row.get('microsites'))}
+        return dict(Microsite.objects.filter(site_id__in=site_ids).values_list('site_id', 'pk'))
+
+    def microsite_ids(self, row, microsites):
+        site_ids = split_values(row.get('microsites'))
+        unknown = [site_id for site_id in site_ids if site_id not in microsites]
+        if unknown:
+            raise RowError(f'unknown microsites: {", ".join(unknown)}')
+        return [microsites[site_id] for site_id in dict.fromkeys(site_ids)]
+
+
+class UniqueFieldMixin:
+    """
+    For rows with a unique `unique_field`: values already stored or seen
+    earlier in the file are rejected before they reach the database.
+    """
+    unique_field = None
+
+    def existing_values(self, rows):
+        values = {(row.get(self.unique_field) or '').strip() for row in rows} - {''}
+        return set(self.model.objects.filter(**{f'{self.unique_field}__in': values}).values_list(
+            self.unique_field, flat=True))
+
+    def claim(self, value, existing):
+        # Called once the rest of the row is valid, so an invalid row
+        # doesn't take the value from a later one
+        if value in existing or value in self.seen:
+            raise RowError(f'{self.unique_field} {value} already exists')
+        self.seen.add(value)
+
+
+def branch_lookup(rows, column):
+    """
+    {branch name: [(branch id, country code)]} of the branch names in
+    `column` of the rows.
+    """
+    names = {name for row in rows for name in split_values(row.get(column))}
+    branches = {}
+    for name, pk, code in Branch.objects.filter(name__in=names).values_list('name', 'pk', 'country__code'):
+        branches.setdefault(name, []).append((pk, code))
+    return branches
+
+
+def branch_id(name, country_code, branches):
+    """
+    The id of the branch called `name`, in the country `country_code` if
+    given; an error unless exactly one matches.
+    """
+    candidates = [pk for pk, code in branches.get(name, ()) if not country_code or code == country_code]
+    if len(candidates) != 1:
+        where = f' in {country_code}' if country_code else ''
+        problem = 'no' if not candidates else f'{len(candidates)}'
+        raise RowError(f'{problem} branches named "{name}"{where}' + (
+            '; add a country column' if len(candidates) > 1 and not country_code else ''))
+    return candidates[0]
+
+
+class BranchImporter(MicrositeLinksMixin, Importer):
+    """
+    Columns: name, country (code), address, phone, email, is_active,
+    has_online_ordering, microsites.
+    """
+    model = Branch
+    fields = ('name', 'address', 'phone', 'email', 'is_active', 'has_online_ordering')
+    required = ('name', 'address')
+    link_model = Microsite.branches.through
+    link_fields = ('branch_id', 'microsite_id')
+
+    def lookups(self, rows):
+        codes = {(row.get('country') or '').strip() for row in rows}
+        countries = dict(Country.objects.filter(code__in=codes).values_list('code', 'pk'))
+        return {'countries': countries, 'microsites': self.microsite_lookup(rows)}
+
+    def build(self, row, lookups):
+        values = self.parse(row)
+        code = (row.get('country') or '').strip()
+        if code not in lookups['countries']:
+            raise RowError(f'unknown country code "{code}"')
+        branch = self.validate(Branch(country_id=lookups['countries'][code], **values), resolved=['country'])
+        return branch, self.microsite_ids(row, lookups['microsites'])
+
+    def changed(self, instances, linked_ids):
+        visibility.sync_microsites(linked_ids)
+        touch(Microsite.objects.filter(pk__in=linked_ids))
+        bump_version(Branch, Microsite)
+        bundle.invalidate(linked_ids)
+        stats.mark_stale(
+            country_ids=[branch.country_id for branch in instances], branch_ids=[branch.pk for branch in instances]
+        )
+
+
+class MicrositeImporter(UniqueFieldMixin, Importer):
+    """
+    Columns: name, site_id, is_active, branches (names), and country (code)
+    to tell apart branches with the same name.
+    """
+    model = Microsite
+    fields = ('name', 'site_id', 'is_active')
+    link_model = Microsite.branches.through
+    link_fields = ('microsite_id', 'branch_id')
+    unique_field = 'site_id'
+
+    def lookups(self, rows):
+        return {'branches': branch_lookup(rows, 'branches'), 'site_ids': self.existing_values(rows)}
+
+    def build(self, row, lookups):
+        values = self.parse(row)
+        microsite = self.validate(Microsite(**values))
+        country = (row.get('country') or '').strip()
+        branch_ids = [branch_id(name, country, lookups['branches']) for name in split_values(row.get('branches'))]
+        if microsite.site_id:
+            self.claim(microsite.site_id, lookups['site_ids'])
+        return microsite, list(dict.fromkeys(branch_ids))
+
+    def changed(self, instances, linked_ids):
+        microsite_ids = [microsite.pk for microsite in instances]
+        visibility.sync_microsites(microsite_ids)
+        bump_version(Microsite, Branch)
+        bundle.invalidate(microsite_ids)
+        stats.mark_microsites_stale(microsite_ids)
+
+
+class MenuItemImporter(MicrositeLinksMixin, UniqueFieldMixin, Importer):
+    """
+    Columns: name, description, price, currency, is_active, external_id,
+    microsites.
+    """
+    model = MenuItem
+    fields = ('name', 'description', 'price', 'currency', 'is_active', 'external_id')
+    link_model = MenuItem.microsites.through
+    link_fields = ('menuitem_id', 'microsite_id')
+    unique_field = 'external_id'
+
+    def lookups(self, rows):
+        return {'microsites': self.microsite_lookup(rows), 'external_ids': self.existing_values(rows)}
+
+    def build(self, row, lookups):
+        item = self.validate(MenuItem(**self.parse(row)))
+        microsite_ids = self.microsite_ids(row, lookups['microsites'])
+        if item.external_id:
+            self.claim(item.external_id, lookups['external_ids'])
+        return item, microsite_ids
+
+    def changed(self, instances, linked_ids):
+        bump_version(Microsite)
+        menu_items_changed([item.pk for item in instances])
+
+
+class TestimonialImporter(MicrositeLinksMixin, Importer):
+    """
+    Columns: name, content, rating, link, is_active, branch (name), country
+    (code) to tell apart branches with the same name, microsites.
+    """
+    model = Testimonial
+    fields = ('name', 'content', 'rating', 'link', 'is_active')
+    link_model = Testimonial.microsites.through
+    link_fields = ('testimonial_id', 'microsite_id')
+
+    def lookups(self, rows):
+        return {'branches': branch_lookup(rows, 'branch'), 'microsites': self.microsite_lookup(rows)}
+
+    def build(self, row, lookups):
+        values = self.parse(row)
+        branch_name = (row.get('branch') or '').strip()
+        if branch_name:
+            values['branch_id'] = branch_id(branch_name, (row.get('country') or '').strip(), lookups['branches'])
+        testimonial = self.validate(Testimonial(**values), resolved=['branch'])
+        return testimonial, self.microsite_ids(row, lookups['microsites'])
+
+    def changed(self, instances, linked_ids):
+        bump_version(Testimonial, Microsite)
+        bundle.invalidate(linked_ids)
+
+
+IMPORTERS = {
+    'branches': BranchImporter,
+    'microsites': MicrositeImporter,
+    'menu_items': MenuItemImporter,
+    'testimonials': TestimonialImporter,
+}
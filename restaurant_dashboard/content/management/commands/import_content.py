@@ -0,0 +1,71 @@
+import csv
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from content.importers import IMPORTERS
+
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = 'Imports branches, microsites, menu items or testimonials from a CSV file, in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file with a header row of column names')
+        parser.add_argument(
+            '--type',
+            required=True,
+            choices=sorted(IMPORTERS),
+            help='What the rows are; see content/importers.py for the columns of each',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows read, resolved and inserted per round of queries (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and insert every row, then roll back',
+        )
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options['type']]()
+        imported, errors = 0, []
+        started = time.monotonic()
+
+        try:
+            csv_file = open(options['file'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["file"]}: {e}')
+
+        # One transaction: the file is imported entirely or not at all
+        with csv_file, transaction.atomic():
+            # Line numbers count the header as line 1
+            rows = enumerate(csv.DictReader(csv_file), start=2)
+            while chunk := list(islice(rows, options['chunk_size'])):
+                written, chunk_errors = importer.import_chunk(chunk)
+                imported += written
+                errors += chunk_errors
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Line {chunk[-1][0]}: {imported} rows imported')
+            if errors or options['dry_run']:
+                transaction.set_rollback(True)
+
+        elapsed = time.monotonic() - started
+        rate = f'{imported / elapsed:.0f} rows/s' if elapsed else 'n/a'
+        if errors:
+            for line, error in errors[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(f'Line {line}: {error}')
+            if len(errors) > MAX_REPORTED_ERRORS:
+                self.stderr.write(f'... and {len(errors) - MAX_REPORTED_ERRORS} more')
+            raise CommandError(f'{len(errors)} invalid rows; nothing was imported')
+
+        summary = f'{imported} {options["type"].replace("_", " ")} in {elapsed:.2f}s ({rate})'
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run, rolled back: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Imported {summary}'))
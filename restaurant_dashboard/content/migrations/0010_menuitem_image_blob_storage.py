@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import imaging.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_menuitem_image_processing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menuitem',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=imaging.storage.get_blob_storage, upload_to='menu_items/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_menuitem_image_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='sync_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
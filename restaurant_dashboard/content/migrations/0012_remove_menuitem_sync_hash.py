@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_menuitem_external_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='menuitem',
+            name='sync_hash',
+        ),
+    ]
@@ -40,6 +40,7 @@ class Testimonial(models.Model):
     microsites = models.ManyToManyField('microsites.Microsite', related_name='testimonials', blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"Testimonial by {self.name}"# content/models.py (Update these models)
@@ -52,6 +53,7 @@ class FoodDeliveryEmbed(models.Model):
     description = models.TextField(blank=True, null=True)  # Optional
     # embed_code removed as requested
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
@@ -79,12 +81,15 @@ class Career(models.Model):
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)  # Status
     microsites = models.ManyToManyField('microsites.Microsite', related_name='careers', blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name# content/models.py
 from django.db import models
 from microsites.models import Microsite
-from utils.image_utils import resize_image
+from imaging import jobs as image_jobs
+from imaging.models import ImageStatus
+from imaging.storage import get_blob_storage
 
 # First define all your models correctly
 class MenuItem(models.Model):
@@ -100,8 +105,14 @@ class MenuItem(models.Model):
     description = models.TextField(blank=True, null=True)  # Optional
     price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)  # Price field
     currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default='USD', blank=True, null=True)  # Currency field
-    image = models.ImageField(upload_to='menu_items/', blank=True, null=True)  # Optional
+    # Optional, stored as uploaded; identical photos share one file
+    image = models.ImageField(upload_to='menu_items/', storage=get_blob_storage, blank=True, null=True, db_index=True)
+    # Resized versions are rendered in the background (see imaging/jobs.py)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.CHOICES, default=ImageStatus.NONE, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
+    # Set for items managed by the POS sync (content/sync.py)
+    external_id = models.CharField(max_length=64, unique=True, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -109,7 +120,8 @@ class MenuItem(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        # Resize image if one is provided
-        if self.image and hasattr(self.image, 'file'):
-            self.image = resize_image(self.image, max_size=(800, 600))
-        super(MenuItem, self).save(*args, **kwargs)
\ No newline at end of file
+        # New uploads are stored as-is and queued for resizing
+        new_upload = image_jobs.prepare_upload(self, 'image')
+        super(MenuItem, self).save(*args, **kwargs)
+        if new_upload:
+            image_jobs.enqueue(self, 'image')
\ No newline at end of file
@@ -1,15 +1,82 @@
 # content/serializers.py
 from rest_framework import serializers
+from imaging.serializers import ProcessedImageMixin
+from microsites.models import Microsite
+from utils.relations import PrefetchedPrimaryKeyRelatedField, prefetch
 from .models import MenuItem, Testimonial, FoodDeliveryEmbed, Career
+from . import bulk
+
+
+class MenuItemListSerializer(serializers.ListSerializer):
+    """
+    Validates many menu items with one microsite query in total, and writes
+    them in bulk (content/bulk.py). `update()` takes the items in the same
+    order as the data.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            prefetch(self, Microsite, [
+                pk for row in data if isinstance(row, dict) and isinstance(row.get('microsites'), list)
+                for pk in row['microsites']
+            ])
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        return bulk.create_menu_items(validated_data)
+
+    def update(self, instance, validated_data):
+        return bulk.update_menu_items(instance, validated_data)
+
+
 # content/serializers.py (Update the MenuItemSerializer)
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(ProcessedImageMixin, serializers.ModelSerializer):
     currency_display = serializers.CharField(source='get_currency_display', read_only=True)
+    microsites = PrefetchedPrimaryKeyRelatedField(many=True, queryset=Microsite.objects.all(), required=False)
+    
+    prefetch_related_fields = ('microsites',)
+    processed_image_fields = ('image',)
     
     class Meta:
         model = MenuItem
         fields = ['id', 'microsites', 'name', 'description', 'price', 'currency', 
-                  'currency_display', 'image', 'is_active', 'created_at', 'updated_at']
+                  'currency_display', 'image', 'image_status', 'is_active', 'external_id', 'created_at', 'updated_at']
+        # External ids belong to the POS sync
+        read_only_fields = ['image_status', 'external_id']
+        list_serializer_class = MenuItemListSerializer
+
+
+class MenuItemSyncListSerializer(MenuItemListSerializer):
+    """
+    Validates a POS snapshot: like MenuItemListSerializer, and each external
+    id may appear only once.
+    """
+    def to_internal_value(self, data):
+        rows = super().to_internal_value(data)
+        seen = set()
+        errors = []
+        for row in rows:
+            duplicate = row['external_id'] in seen
+            errors.append({'external_id': ['Appears more than once in the snapshot.']} if duplicate else {})
+            seen.add(row['external_id'])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+
+class MenuItemSyncSerializer(serializers.ModelSerializer):
+    """
+    One item of a POS snapshot (content/sync.py). Fields left out take their
+    defaults; `microsites`, when given, replaces the item's microsites.
+    """
+    microsites = PrefetchedPrimaryKeyRelatedField(many=True, queryset=Microsite.objects.all(), required=False)
+
+    class Meta:
+        model = MenuItem
+        fields = ['external_id', 'microsites', 'name', 'description', 'price', 'currency', 'is_active']
+        # Existing ids are expected: they're what the upsert matches on
+        extra_kwargs = {'external_id': {'required': True, 'allow_null': False, 'allow_blank': False, 'validators': []}}
+        list_serializer_class = MenuItemSyncListSerializer
         
 
             
@@ -17,6 +84,9 @@ class TestimonialSerializer(serializers.ModelSerializer):
     branch_name = serializers.CharField(source='branch.name', read_only=True)
     rating_display = serializers.CharField(source='get_rating_display', read_only=True)
     
+    select_related_fields = ('branch',)
+    prefetch_related_fields = ('microsites',)
+    
     class Meta:
         model = Testimonial
         fields = ['id', 'name', 'content', 'branch', 'branch_name', 
@@ -34,6 +104,8 @@ class TestimonialSerializer(serializers.ModelSerializer):
 # content/serializers.py (Update these serializers)
 
 class FoodDeliveryEmbedSerializer(serializers.ModelSerializer):
+    prefetch_related_fields = ('microsites',)
+    
     class Meta:
         model = FoodDeliveryEmbed
         fields = ['id', 'microsites', 'name', 'url', 'description', 'is_active']
@@ -42,6 +114,9 @@ class CareerSerializer(serializers.ModelSerializer):
     branch_name = serializers.CharField(source='branch.name', read_only=True)
     job_type_display = serializers.CharField(source='get_job_type_display', read_only=True)
     
+    select_related_fields = ('branch',)
+    prefetch_related_fields = ('microsites',)
+    
     class Meta:
         model = Career
         fields = ['id', 'name', 'department', 'branch', 'branch_name', 'job_type', 
@@ -0,0 +1,92 @@
+# content/signals.py
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from management.models import Branch
+from microsites import bundle
+from microsites.models import Microsite
+from utils.conditional import touch
+from .models import Career, FoodDeliveryEmbed, MenuItem, Testimonial
+
+# Content models whose list payload includes their microsite ids
+MICROSITE_LINKED_MODELS = (MenuItem, Testimonial, FoodDeliveryEmbed, Career)
+
+# Content models whose list payload includes their branch name
+BRANCH_LINKED_MODELS = (Testimonial, Career)
+
+
+def touch_on_microsite_links(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        # item.microsites.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch(type(instance).objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        # microsite.menu_items.clear(): the linked ids are gone after the clear
+        touch(model.objects.filter(microsites=instance))
+    elif action in ('post_add', 'post_remove'):
+        # microsite.menu_items.add/remove(...)
+        touch(model.objects.filter(pk__in=pk_set))
+
+
+for content_model in MICROSITE_LINKED_MODELS:
+    m2m_changed.connect(
+        touch_on_microsite_links,
+        sender=content_model.microsites.through,
+        dispatch_uid=f'content.touch_on_microsite_links.{content_model.__name__}',
+    )
+
+
+@receiver(pre_delete, sender=Microsite)
+def touch_on_microsite_delete(sender, instance, **kwargs):
+    # The through rows are removed by cascade, which sends no m2m_changed
+    for content_model in MICROSITE_LINKED_MODELS:
+        touch(content_model.objects.filter(microsites=instance))
+
+
+@receiver(post_save, sender=Branch)
+def touch_on_branch_change(sender, instance, created, **kwargs):
+    if not created:
+        for content_model in BRANCH_LINKED_MODELS:
+            touch(content_model.objects.filter(branch=instance))
+
+
+@receiver(pre_delete, sender=Branch)
+def touch_on_branch_delete(sender, instance, **kwargs):
+    # SET_NULL is applied with a queryset update, which skips auto_now
+    for content_model in BRANCH_LINKED_MODELS:
+        touch(content_model.objects.filter(branch=instance))
+
+
+def invalidate_bundles_on_microsite_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # microsite.menu_items.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bundle.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        bundle.invalidate(instance.microsites.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        bundle.invalidate(pk_set)
+
+
+def invalidate_bundles_on_content_change(sender, instance, **kwargs):
+    # Deletes are handled before the row's microsite links are removed
+    if instance.pk:
+        bundle.invalidate(instance.microsites.values_list('pk', flat=True))
+
+
+for content_model in MICROSITE_LINKED_MODELS:
+    uid = content_model.__name__
+    m2m_changed.connect(
+        invalidate_bundles_on_microsite_links,
+        sender=content_model.microsites.through,
+        dispatch_uid=f'content.invalidate_bundles_on_microsite_links.{uid}',
+    )
+    post_save.connect(
+        invalidate_bundles_on_content_change,
+        sender=content_model,
+        dispatch_uid=f'content.invalidate_bundles_on_save.{uid}',
+    )
+    pre_delete.connect(
+        invalidate_bundles_on_content_change,
+        sender=content_model,
+        dispatch_uid=f'content.invalidate_bundles_on_delete.{uid}',
+    )
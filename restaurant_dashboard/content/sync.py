@@ -0,0 +1,132 @@
+# content/sync.py
+"""
+Upserting full menu snapshots from the POS, keyed by MenuItem.external_id.
+
+Each snapshot row describes a whole item: fields it leaves out take their
+defaults. Only rows that differ from the stored item are written, with
+INSERT ... ON CONFLICT (external_id) DO UPDATE, so pushing the same snapshot
+twice writes nothing the second time. Rows are compared with the stored
+values rather than with what was last synced, so an item edited elsewhere
+is restored by the next snapshot.
+"""
+from django.utils import timezone
+from .bulk import BATCH_SIZE, link_microsites, menu_items_changed, unlink_microsites
+from .models import MenuItem
+
+# The MenuItem fields a snapshot row sets
+SYNCED_FIELDS = ('name', 'description', 'price', 'currency', 'is_active')
+
+
+def row_values(row):
+    """
+    The synced field values of a validated snapshot row, with defaults for
+    the fields it leaves out.
+    """
+    return {
+        name: row[name] if name in row else MenuItem._meta.get_field(name).get_default()
+        for name in SYNCED_FIELDS
+    }
+
+
+def row_state(values, microsite_ids=None):
+    """
+    What a row syncs, comparable with the stored item's; `microsite_ids` is
+    None for rows that don't set microsites.
+    """
+    return {**values, 'microsites': None if microsite_ids is None else sorted(microsite_ids)}
+
+
+def stored(external_ids, field_name):
+    """
+    {external_id: value of `field_name`} of the existing items among
+    `external_ids`.
+    """
+    external_ids = list(external_ids)
+    values = {}
+    for start in range(0, len(external_ids), BATCH_SIZE):
+        values.update(MenuItem.objects.filter(
+            external_id__in=external_ids[start:start + BATCH_SIZE]
+        ).values_list('external_id', field_name))
+    return values
+
+
+def stored_states(rows):
+    """
+    {external_id: row_state()} of the existing items among the snapshot
+    rows, with microsites only for the rows that set them.
+    """
+    external_ids = [row['external_id'] for row in rows]
+    with_microsites = {row['external_id'] for row in rows if 'microsites' in row}
+    Link = MenuItem.microsites.through
+    states = {}
+    for start in range(0, len(external_ids), BATCH_SIZE):
+        items = list(MenuItem.objects.filter(external_id__in=external_ids[start:start + BATCH_SIZE]).values(
+            'pk', 'external_id', *SYNCED_FIELDS))
+        linked = {item['pk']: [] for item in items if item['external_id'] in with_microsites}
+        for item_id, microsite_id in Link.objects.filter(menuitem_id__in=list(linked)).values_list(
+                'menuitem_id', 'microsite_id'):
+            linked[item_id].append(microsite_id)
+        for item in items:
+            states[item['external_id']] = row_state(
+                {name: item[name] for name in SYNCED_FIELDS}, linked.get(item['pk'])
+            )
+    return states
+
+
+def sync_menu_items(rows, deactivate_missing=False):
+    """
+    Upsert validated snapshot rows (dicts with an `external_id`, the synced
+    fields and optionally `microsites`). With `deactivate_missing`, active
+    items with an external id that isn't in the snapshot are deactivated.
+    Returns the number of created, updated, unchanged and deactivated items.
+    Run it in a transaction.
+    """
+    existing = stored_states(rows)
+    now = timezone.now()
+    changed, relinked = [], {}
+    for row in rows:
+        values = row_values(row)
+        microsite_ids = [microsite.pk for microsite in row['microsites']] if 'microsites' in row else None
+        if existing.get(row['external_id']) == row_state(values, microsite_ids):
+            continue
+        changed.append(MenuItem(external_id=row['external_id'], updated_at=now, **values))
+        if microsite_ids is not None:
+            relinked[row['external_id']] = microsite_ids
+
+    # Primary keys of upserted rows aren't returned on every database: the
+    # rows are looked up again by external id where they're needed
+    MenuItem.objects.bulk_create(
+        changed, batch_size=BATCH_SIZE, update_conflicts=True, unique_fields=['external_id'],
+        update_fields=[*SYNCED_FIELDS, 'updated_at'],
+    )
+    pks = stored((item.external_id for item in changed), 'pk')
+
+    previous = unlink_microsites(pks[external_id] for external_id in relinked)
+    link_microsites([
+        (pks[external_id], microsite_id)
+        for external_id, microsite_ids in relinked.items() for microsite_id in microsite_ids
+    ])
+
+    deactivated = []
+    if deactivate_missing:
+        synced = {row['external_id'] for row in rows}
+        deactivated = [
+            pk for external_id, pk in MenuItem.objects.filter(
+                external_id__isnull=False, is_active=True
+            ).values_list('external_id', 'pk').iterator(chunk_size=2000)
+            if external_id not in synced
+        ]
+        for start in range(0, len(deactivated), BATCH_SIZE):
+            MenuItem.objects.filter(pk__in=deactivated[start:start + BATCH_SIZE]).update(
+                is_active=False, updated_at=now
+            )
+
+    if changed or deactivated:
+        menu_items_changed([*pks.values(), *deactivated], previous)
+    created = sum(1 for item in changed if item.external_id not in existing)
+    return {
+        'created': created,
+        'updated': len(changed) - created,
+        'unchanged': len(rows) - len(changed),
+        'deactivated': len(deactivated),
+    }
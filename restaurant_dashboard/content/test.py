@@ -0,0 +1,505 @@
+# content/test.py
+import csv
+import json
+import os
+import tempfile
+import zipfile
+from base64 import b64encode
+from io import BytesIO, StringIO
+from urllib.parse import urlencode
+from PIL import Image
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from management.models import Country, Branch
+from microsites.models import Microsite, MicrositeVisibility
+from users.models import User, UserRole
+from imaging import jobs as image_jobs
+from imaging.models import ImageJob, ImageStatus
+from utils import response_cache
+from .models import MenuItem, Testimonial
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MenuItemPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.user = User.objects.create_user(email='lead@example.com', password='secret', role=role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        MenuItem.objects.bulk_create([MenuItem(name=f'Item {i}') for i in range(7)])
+        # Give every row the same timestamp so only the id breaks ties
+        MenuItem.objects.update(created_at=timezone.now())
+
+    def test_pages_cover_every_item_once(self):
+        seen = []
+        url = '/api/content/menu-items/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(sorted(seen), sorted(MenuItem.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_previous_cursor_returns_prior_page(self):
+        first = self.client.get('/api/content/menu-items/?page_size=3')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+
+    def test_tampered_cursor_is_not_found(self):
+        position = b64encode(urlencode({'p': '["not a date","1"]'}).encode()).decode()
+        response = self.client.get('/api/content/menu-items/', {'cursor': position})
+        self.assertEqual(response.status_code, 404)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get('/api/content/menu-items/')
+        self.assertNotIn('count', response.data)
+
+        response = self.client.get('/api/content/menu-items/?count=exact')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(response.data['count_type'], 'exact')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestimonialQueryCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.user = User.objects.create_user(email='lead@example.com', password='secret', role=role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        country = Country.objects.create(name='Test Country', code='TST')
+        self.branch = Branch.objects.create(name='Test Branch', country=country, address='1 Test St')
+        self.microsite = Microsite.objects.create(name='Test Site')
+
+    def create_testimonials(self, count):
+        testimonials = Testimonial.objects.bulk_create([
+            Testimonial(name=f'Customer {i}', branch=self.branch) for i in range(count)
+        ])
+        for testimonial in testimonials:
+            testimonial.microsites.add(self.microsite)
+
+    def test_list_query_count_is_constant(self):
+        self.create_testimonials(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/content/testimonials/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_testimonials(20)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/content/testimonials/')
+
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.user = User.objects.create_user(email='lead@example.com', password='secret', role=role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.microsite = Microsite.objects.create(name='Test Site')
+        self.testimonial = Testimonial.objects.create(name='Guest', content='Great', rating=5)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/api/content/testimonials/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        cache.clear()  # bypass the shared response cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/content/testimonials/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+    def test_delete_is_not_hidden_by_if_modified_since(self):
+        Testimonial.objects.create(name='Other guest', content='Fine', rating=4)
+        response = self.client.get('/api/content/testimonials/')
+        self.assertNotIn('Last-Modified', response)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Testimonial.objects.filter(name='Other guest').delete()
+        response = self.client.get(
+            '/api/content/testimonials/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_related_change_invalidates_etag(self):
+        etag = self.client.get('/api/content/testimonials/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.microsite.testimonials.add(self.testimonial)
+
+        response = self.client.get('/api/content/testimonials/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['microsites'], [self.microsite.pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ScopedResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name='Test Country', code='TST')
+        branch = Branch.objects.create(name='Test Branch', country=country, address='1 Test St')
+        microsite = Microsite.objects.create(name='Test Site')
+        microsite.branches.add(branch)
+        self.menu_item = MenuItem.objects.create(name='Dish')
+        self.menu_item.microsites.add(microsite)
+
+        role = UserRole.objects.create(name=UserRole.COUNTRY_ADMIN)
+        self.users = [
+            User.objects.create_user(email=f'admin{i}@example.com', password='secret', role=role, country=country)
+            for i in range(2)
+        ]
+
+    def get_menu_items(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/content/menu-items/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_users_with_same_scope_share_cached_list(self):
+        first, _ = self.get_menu_items(self.users[0])
+        second, queries = self.get_menu_items(self.users[1])
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(queries, 0)
+
+    def test_save_invalidates_cached_list_on_commit(self):
+        self.get_menu_items(self.users[0])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.menu_item.name = 'New name'
+            self.menu_item.save()
+
+        # Until the save commits, readers keep the old version
+        response, queries = self.get_menu_items(self.users[1])
+        self.assertEqual((response.data['results'][0]['name'], queries), ('Dish', 0))
+
+        for callback in callbacks:
+            callback()
+        response, _ = self.get_menu_items(self.users[1])
+        self.assertEqual(response.data['results'][0]['name'], 'New name')
+
+    def test_unrelated_saves_do_not_invalidate(self):
+        self.get_menu_items(self.users[0])
+        with self.captureOnCommitCallbacks() as callbacks:
+            ContentType.objects.get_for_model(MenuItem).save()
+        self.assertEqual(callbacks, [])
+
+    @override_settings(RESPONSE_CACHE_STATS_FLUSH_EVERY=2)
+    def test_stats_add_up_across_processes(self):
+        response_cache.pending.clear()
+        endpoint = 'content.views.MenuItemViewSet'
+        # Counted by another process
+        cache.set(response_cache.stats_key('hits', endpoint), 3, None)
+
+        self.get_menu_items(self.users[0])
+        self.get_menu_items(self.users[1])
+        self.get_menu_items(self.users[1])
+
+        # Two events were added on their own, the third when stats were read
+        self.assertEqual(cache.get(response_cache.stats_key('hits', endpoint)), 4)
+        stats = response_cache.get_stats()['endpoints'][endpoint]
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (5, 1, 0.8333))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkImageUploadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='lead@example.com', password='secret', role=role))
+        self.butter_chicken = MenuItem.objects.create(name='Butter Chicken')
+        self.naan = MenuItem.objects.create(name='Naan')
+        MenuItem.objects.create(name='Dal')
+        MenuItem.objects.create(name='Dal')
+        MenuItem.objects.create(name='Notes')
+
+    def image(self, color):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 900), color).save(buffer, format='JPEG')
+        return buffer.getvalue()
+
+    def test_zip_is_matched_by_id_and_name_in_one_transaction(self):
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('menu/butter chicken.jpg', self.image((200, 80, 40)))
+            zf.writestr(f'menu/{self.naan.pk}.jpg', self.image((240, 220, 180)))
+            zf.writestr('menu/Dal.jpg', self.image((230, 180, 40)))
+            zf.writestr('menu/Unknown.jpg', self.image((0, 0, 0)))
+            zf.writestr('menu/notes.jpg', b'not an image')
+            zf.writestr('__MACOSX/menu/._Naan.jpg', b'')
+        archive.seek(0)
+        archive.name = 'menu.zip'
+
+        # The same however many files the archive has
+        ContentType.objects.clear_cache()
+        with self.assertNumQueries(11):
+            response = self.client.post('/api/content/menu-items/bulk_upload_images/', {'files': archive})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['queued'], response.data['failed']), (2, 3))
+        results = {result['file']: result for result in response.data['results']}
+        self.assertEqual(results['butter chicken.jpg']['menu_item'], self.butter_chicken.pk)
+        self.assertEqual(results[f'{self.naan.pk}.jpg']['menu_item'], self.naan.pk)
+        self.assertIn('2 menu items are named', results['Dal.jpg']['error'])
+        self.assertIn('No menu item named', results['Unknown.jpg']['error'])
+        self.assertEqual(results['notes.jpg']['error'], 'Not a readable image')
+
+        self.butter_chicken.refresh_from_db()
+        self.assertEqual(self.butter_chicken.image_status, ImageStatus.PENDING)
+        self.assertEqual(ImageJob.objects.count(), 2)
+        self.assertEqual(image_jobs.process_pending(), (2, 0))
+        self.butter_chicken.refresh_from_db()
+        self.assertEqual(self.butter_chicken.image_status, ImageStatus.READY)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkMenuItemTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='lead@example.com', password='secret', role=role))
+        self.downtown = Microsite.objects.create(name='Downtown', site_id='downtown')
+        self.airport = Microsite.objects.create(name='Airport', site_id='airport')
+
+    def bulk_create(self, count):
+        rows = [
+            {'name': f'Item {i}', 'price': '9.50', 'microsites': [self.downtown.pk, self.airport.pk]}
+            for i in range(count)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/content/menu-items/bulk-create/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response, len(queries)
+
+    def test_create_query_count_is_constant(self):
+        _, few = self.bulk_create(2)
+        response, many = self.bulk_create(20)
+        self.assertEqual(few, many)
+        self.assertEqual([item['name'] for item in response.data], [f'Item {i}' for i in range(20)])
+        self.assertEqual(self.airport.menu_items.count(), 22)
+
+    def test_invalid_item_creates_nothing(self):
+        rows = [{'name': 'Naan'}, {'price': 'cheap'}, {'name': 'Dal', 'microsites': [0]}]
+        response = self.client.post('/api/content/menu-items/bulk-create/', rows, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(set(response.data[1]), {'name', 'price'})
+        self.assertEqual(set(response.data[2]), {'microsites'})
+        self.assertFalse(MenuItem.objects.exists())
+
+    def test_update_and_delete(self):
+        naan, dal = MenuItem.objects.create(name='Naan'), MenuItem.objects.create(name='Dal')
+        naan.microsites.add(self.downtown)
+
+        response = self.client.patch('/api/content/menu-items/bulk-update/', [
+            {'id': naan.pk, 'microsites': [self.airport.pk]},
+            {'id': dal.pk, 'price': '4.00'},
+            {'id': 0, 'name': 'Missing'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertIn('id', response.data[2])
+
+        response = self.client.patch('/api/content/menu-items/bulk-update/', [
+            {'id': naan.pk, 'microsites': [self.airport.pk]},
+            {'id': dal.pk, 'price': '4.00'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(naan.microsites.all()), [self.airport])
+        dal.refresh_from_db()
+        self.assertEqual((dal.name, str(dal.price)), ('Dal', '4.00'))
+
+        response = self.client.post('/api/content/menu-items/bulk-delete/', {'ids': [naan.pk, dal.pk]}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertFalse(MenuItem.objects.exists())
+        self.assertFalse(MenuItem.microsites.through.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MenuSyncTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='lead@example.com', password='secret', role=role))
+        self.downtown = Microsite.objects.create(name='Downtown', site_id='downtown')
+        self.snapshot = [
+            {'external_id': 'pos-1', 'name': 'Naan', 'price': '2.50', 'microsites': [self.downtown.pk]},
+            {'external_id': 'pos-2', 'name': 'Dal', 'price': '6.00'},
+            {'external_id': 'pos-3', 'name': 'Lassi', 'price': '3.00'},
+        ]
+
+    def sync(self, items, **options):
+        response = self.client.post('/api/content/menu-items/sync/', {'items': items, **options}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_resync_rewrites_only_changed_items(self):
+        self.assertEqual(self.sync(self.snapshot), {'created': 3, 'updated': 0, 'unchanged': 0, 'deactivated': 0})
+        lassi_updated_at = MenuItem.objects.get(external_id='pos-3').updated_at
+
+        self.snapshot[1]['price'] = '6.50'
+        counts = self.sync(self.snapshot[:2], deactivate_missing=True)
+
+        self.assertEqual(counts, {'created': 0, 'updated': 1, 'unchanged': 1, 'deactivated': 1})
+        self.assertEqual(str(MenuItem.objects.get(external_id='pos-2').price), '6.50')
+        self.assertEqual(list(self.downtown.menu_items.values_list('external_id', flat=True)), ['pos-1'])
+        lassi = MenuItem.objects.get(external_id='pos-3')
+        self.assertFalse(lassi.is_active)
+        self.assertGreater(lassi.updated_at, lassi_updated_at)
+        self.assertEqual(MenuItem.objects.count(), 3)
+
+    def test_resync_restores_items_edited_elsewhere(self):
+        self.sync(self.snapshot)
+        naan = MenuItem.objects.get(external_id='pos-1')
+        response = self.client.patch(f'/api/content/menu-items/{naan.pk}/', {'name': 'Garlic Naan'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        naan.microsites.clear()
+
+        counts = self.sync(self.snapshot)
+
+        self.assertEqual(counts, {'created': 0, 'updated': 1, 'unchanged': 2, 'deactivated': 0})
+        naan.refresh_from_db()
+        self.assertEqual(naan.name, 'Naan')
+        self.assertEqual(list(naan.microsites.all()), [self.downtown])
+
+    def test_duplicate_external_ids_are_rejected(self):
+        response = self.client.post('/api/content/menu-items/sync/', {'items': [
+            {'external_id': 'pos-1', 'name': 'Naan'}, {'external_id': 'pos-1', 'name': 'Garlic Naan'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('external_id', response.data[1])
+        self.assertFalse(MenuItem.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE, EXPORT_CHUNK_SIZE=2)
+class ExportTest(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='India', code='IN')
+        self.branch = Branch.objects.create(name='Delhi', country=country)
+        self.microsite = Microsite.objects.create(name='Delhi', site_id='delhi')
+        self.microsite.branches.add(self.branch)
+        Microsite.objects.create(name='Elsewhere', site_id='elsewhere').menu_items.add(
+            MenuItem.objects.create(name='Hidden'))
+        for name in ('Naan', 'Dal', 'Lassi'):
+            MenuItem.objects.create(name=name).microsites.add(self.microsite)
+        role = UserRole.objects.create(name=UserRole.BRANCH_MANAGER)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            email='manager@example.com', password='secret', role=role, branch=self.branch))
+
+    def test_csv_export_is_streamed_and_scoped(self):
+        response = self.client.get('/api/content/menu-items/export/?format=csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'external_id', 'name'])
+        self.assertEqual([line.split(',')[2] for line in lines[1:]], ['Naan', 'Dal', 'Lassi'])
+        self.assertTrue(all(line.endswith(f',{self.microsite.pk}') for line in lines[1:]))
+
+    def test_csv_export_escapes_formulas(self):
+        MenuItem.objects.create(name='=HYPERLINK("http://example.com")', description='-2+3').microsites.add(
+            self.microsite)
+        response = self.client.get('/api/content/menu-items/export/?format=csv')
+
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[-1]['name'], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(rows[-1]['description'], "'-2+3")
+        self.assertEqual(rows[0]['name'], 'Naan')
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/content/menu-items/export/', HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Naan', 'Dal', 'Lassi'])
+        self.assertEqual(rows[0]['microsites'], [self.microsite.pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, MICROSITE_SNAPSHOTS_ON_SAVE=False)
+class ImportContentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.india = Country.objects.create(name='India', code='IN')
+        Country.objects.create(name='UAE', code='AE')
+
+    def run_import(self, kind, lines, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write('\n'.join(lines) + '\n')
+        self.addCleanup(os.remove, csv_file.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_content', csv_file.name, '--type', kind, '--chunk-size', '2', *args, stdout=StringIO(), stderr=StringIO())
+
+    def test_onboarding_a_country(self):
+        self.run_import('microsites', ['name,site_id', 'Delhi,delhi', 'Mumbai,mumbai'])
+        self.run_import('branches', [
+            'name,country,address,has_online_ordering,microsites',
+            'Connaught Place,IN,Block A,true,delhi',
+            'Bandra,IN,Hill Road,false,mumbai;delhi',
+            'Dubai Mall,AE,Downtown,true,',
+        ])
+        self.run_import('menu_items', [
+            'name,price,currency,external_id,microsites',
+            'Naan,2.50,INR,pos-1,delhi', 'Dal,6.00,INR,pos-2,delhi;mumbai', 'Lassi,3.00,INR,,',
+        ])
+        self.run_import('testimonials', ['name,rating,branch,microsites', 'Asha,5,Bandra,mumbai'])
+
+        delhi = Microsite.objects.get(site_id='delhi')
+        self.assertEqual(set(delhi.branches.values_list('name', flat=True)), {'Connaught Place', 'Bandra'})
+        self.assertEqual(MicrositeVisibility.objects.filter(microsite=delhi, country=self.india).count(), 2)
+        self.assertEqual(set(delhi.menu_items.values_list('name', flat=True)), {'Naan', 'Dal'})
+        self.assertEqual(MenuItem.objects.get(external_id='pos-2').microsites.count(), 2)
+        testimonial = Testimonial.objects.get()
+        self.assertEqual((testimonial.branch.name, testimonial.rating), ('Bandra', 5))
+
+    def test_invalid_rows_import_nothing(self):
+        with self.assertRaisesMessage(CommandError, '2 invalid rows'):
+            self.run_import('branches', [
+                'name,country,address', 'Connaught Place,IN,Block A', 'Nowhere,XX,Street', 'No Address,IN,',
+            ])
+        self.assertFalse(Branch.objects.exists())
+
+    def test_invalid_row_does_not_claim_its_external_id(self):
+        stderr = StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write('name,external_id,microsites\nNaan,pos-1,nowhere\nNaan,pos-1,\n')
+        self.addCleanup(os.remove, csv_file.name)
+        with self.assertRaisesMessage(CommandError, '1 invalid rows'):
+            call_command('import_content', csv_file.name, '--type', 'menu_items', stdout=StringIO(), stderr=stderr)
+        self.assertIn('Line 2: unknown microsites: nowhere', stderr.getvalue())
+        self.assertNotIn('already exists', stderr.getvalue())
+
+    def test_dry_run_rolls_back(self):
+        self.run_import('microsites', ['name,site_id', 'Delhi,delhi'], '--dry-run')
+        self.assertFalse(Microsite.objects.exists())
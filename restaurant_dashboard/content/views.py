@@ -2,11 +2,16 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from .models import MenuItem, Testimonial, FoodDeliveryEmbed, Career
+from management.models import Branch
+from microsites.models import Microsite
 from .serializers import (
-    MenuItemSerializer, TestimonialSerializer,
+    MenuItemSerializer, MenuItemSyncSerializer, TestimonialSerializer,
     FoodDeliveryEmbedSerializer, CareerSerializer
 )
 from users.permissions import IsLeadershipTeam, IsCountryLeadership, IsCountryAdmin, IsBranchManager
+from users.scoping import RoleScopedMixin, MICROSITE_CONTENT_SCOPE, BRANCH_SCOPE
+from users.access import get_access_context
+from users.models import UserRole
 from django.db.models import Q
 # Add these imports
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiResponse, OpenApiExample
@@ -14,6 +19,17 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from utils.eager_loading import EagerLoadingMixin, eager_load
+from utils.conditional import ConditionalListMixin
+from utils.response_cache import ScopedResponseCacheMixin
+from utils.export import ExportMixin
+from django.db import transaction
+from django.db.models.functions import Lower
+from imaging import jobs as image_jobs
+from imaging.uploads import BatchError, batch_filenames, batch_files, check_image
+from django.conf import settings
+from .bulk import delete_menu_items, menu_items_changed
+from .sync import sync_menu_items
 import os
 
 @extend_schema_view(
@@ -51,43 +67,41 @@ import os
         tags=["Content Management"]
     )
 )
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(ExportMixin, ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
+    scope = MICROSITE_CONTENT_SCOPE
+    response_cache_models = (MenuItem, Microsite, Branch)
+    ordering = ('-created_at', '-id')
+    export_fields = ('id', 'external_id', 'name', 'description', 'price', 'currency', 'is_active',
+                     'image', 'image_status', 'created_at', 'updated_at')
+    export_m2m_fields = ('microsites',)
+    export_filename = 'menu-items'
     parser_classes = (MultiPartParser, FormParser, JSONParser)
     def get_queryset(self):
-        user = self.request.user
+        # Role-based filtering is applied by MICROSITE_CONTENT_SCOPE
+        base_queryset = super().get_queryset()
         
         # Filter by microsite if provided (optional parameter)
         microsite_id = self.request.query_params.get('microsite', None)
-        base_queryset = MenuItem.objects.all()
-        
         if microsite_id:
             base_queryset = base_queryset.filter(microsites__id=microsite_id)
         
-        # Leadership team can see all menu items
-        if hasattr(user, 'role') and user.role and user.role.name == 'leadership':
-            return base_queryset
-        
-        # Country leadership & admins can only see menu items for microsites in their country
-        if hasattr(user, 'role') and user.role and user.role.name in ['country_leadership', 'country_admin']:
-            if hasattr(user, 'country') and user.country:
-                return base_queryset.filter(microsites__branches__country=user.country).distinct()
-        
-        # Branch managers can only see menu items for microsites linked to their branch
-        if hasattr(user, 'role') and user.role and user.role.name == 'branch_manager':
-            if hasattr(user, 'branch') and user.branch:
-                return base_queryset.filter(microsites__branches=user.branch).distinct()
-        
-        return MenuItem.objects.none()
+        return base_queryset
     
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             permission_classes = [IsAuthenticated]
-        elif self.action in ['create', 'update', 'partial_update', 'destroy']:
-            if self.request.user.role and self.request.user.role.name == 'leadership':
+        elif self.action == 'sync':
+            # The POS snapshot covers every country
+            permission_classes = [IsLeadershipTeam]
+        elif self.action in ['create', 'update', 'partial_update', 'destroy',
+                             'bulk_create', 'bulk_update', 'bulk_delete', 'bulk_upload_images']:
+            access = get_access_context(self.request)
+            if access.role == UserRole.LEADERSHIP:
                 permission_classes = [IsLeadershipTeam]
-            elif self.request.user.role and self.request.user.role.name == 'country_leadership':
+            elif access.role == UserRole.COUNTRY_LEADERSHIP:
                 permission_classes = [IsCountryLeadership]
             else:
                 permission_classes = [IsCountryAdmin]
@@ -95,6 +109,144 @@ class MenuItemViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    @extend_schema(
+        summary="Create menu items in bulk",
+        description="Create a list of menu items in one transaction. Every item is validated first; if any "
+                    "is invalid nothing is created and the response lists the errors of each item, in order "
+                    "(an empty object for valid items). Images are added afterwards with bulk_upload_images.",
+        request=MenuItemSerializer(many=True),
+        responses={
+            201: MenuItemSerializer(many=True),
+            400: OpenApiResponse(description="Per-item validation errors, in the order of the request")
+        },
+        tags=["Content Management"]
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=settings.BULK_MENU_ITEMS_MAX)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            items = serializer.save()
+        return Response(self.bulk_response_data(items), status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary="Update menu items in bulk",
+        description="Partially update a list of menu items, each identified by its id, in one transaction. "
+                    "If any item is invalid or not found nothing is changed and the response lists the "
+                    "errors of each item, in order. Giving `microsites` replaces an item's microsites.",
+        request=MenuItemSerializer(many=True, partial=True),
+        responses={
+            200: MenuItemSerializer(many=True),
+            400: OpenApiResponse(description="Per-item validation errors, in the order of the request")
+        },
+        tags=["Content Management"]
+    )
+    @action(detail=False, methods=['patch'], url_path='bulk-update')
+    def bulk_update(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({'error': 'Expected a list of menu items'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.BULK_MENU_ITEMS_MAX:
+            return Response({'error': f'At most {settings.BULK_MENU_ITEMS_MAX} menu items per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        ids = [row.get('id') if isinstance(row, dict) else None for row in rows]
+        # Role scoped: items outside the user's scope are not found
+        targets = self.get_queryset().prefetch_related(None).in_bulk(
+            [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+        )
+        id_errors, seen = [], set()
+        for pk in ids:
+            if pk is None:
+                id_errors.append({'id': ['This field is required.']})
+            elif pk not in targets:
+                id_errors.append({'id': ['Menu item not found.']})
+            elif pk in seen:
+                id_errors.append({'id': ['Menu item is listed more than once.']})
+            else:
+                id_errors.append({})
+            seen.add(pk)
+
+        serializer = self.get_serializer([targets.get(pk) for pk in ids], data=rows, many=True, partial=True)
+        valid = serializer.is_valid()
+        if not valid or any(id_errors):
+            item_errors = serializer.errors if not valid else [{} for _ in rows]
+            return Response([{**errors, **id_error} for errors, id_error in zip(item_errors, id_errors)],
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            items = serializer.save()
+        return Response(self.bulk_response_data(items))
+
+    @extend_schema(
+        summary="Delete menu items in bulk",
+        description="Delete the menu items with the given ids in one transaction. If any id is not found "
+                    "nothing is deleted.",
+        request={"application/json": {"type": "object", "properties": {"ids": {"type": "array", "items": {"type": "integer"}}}}},
+        responses={
+            200: OpenApiResponse(description="The number of deleted menu items"),
+            400: OpenApiResponse(description="Bad request: no ids, or ids that were not found")
+        },
+        tags=["Content Management"]
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            return Response({'error': 'Expected a non-empty list of menu item ids'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.BULK_MENU_ITEMS_MAX:
+            return Response({'error': f'At most {settings.BULK_MENU_ITEMS_MAX} menu items per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Role scoped: items outside the user's scope are not found
+        items = list(self.get_queryset().prefetch_related(None).filter(pk__in=ids).only('id', 'image', 'image_variants'))
+        missing = set(ids) - {item.pk for item in items}
+        if missing:
+            return Response({'error': 'Menu items not found', 'ids': sorted(missing)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            deleted = delete_menu_items(items)
+        return Response({'deleted': deleted})
+
+    @extend_schema(
+        summary="Sync menu items from the POS",
+        description="Upsert a full menu snapshot, matching items by `external_id`. Every item is validated "
+                    "first; if any is invalid nothing is written and the response lists the errors of each item. "
+                    "Items whose values didn't change since the last sync are not rewritten. With "
+                    "`deactivate_missing`, active items with an external id missing from the snapshot are "
+                    "deactivated. Restricted to the leadership team.",
+        request={"application/json": {"type": "object", "properties": {
+            "items": {"type": "array", "items": {"type": "object"}},
+            "deactivate_missing": {"type": "boolean"},
+        }}},
+        responses={
+            200: OpenApiResponse(description="Counts of created, updated, unchanged and deactivated items"),
+            400: OpenApiResponse(description="Per-item validation errors, in the order of the snapshot")
+        },
+        tags=["Content Management"]
+    )
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        if not isinstance(request.data, dict) or not isinstance(request.data.get('items'), list):
+            return Response({'error': 'Expected an object with a list of items'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = MenuItemSyncSerializer(
+            data=request.data['items'], many=True, max_length=settings.MENU_SYNC_MAX_ITEMS,
+            context=self.get_serializer_context(),
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            counts = sync_menu_items(serializer.validated_data, request.data.get('deactivate_missing') is True)
+        return Response(counts)
+
+    def bulk_response_data(self, items):
+        """
+        The serialized items, in the given order, reloaded with their microsites.
+        """
+        by_id = eager_load(MenuItem.objects.all(), MenuItemSerializer).in_bulk([item.pk for item in items])
+        return MenuItemSerializer(
+            [by_id[item.pk] for item in items], many=True, context=self.get_serializer_context()
+        ).data
+
     @extend_schema(
         summary="Upload menu item image",
         description="Upload an image for a specific menu item",
@@ -124,10 +276,8 @@ class MenuItemViewSet(viewsets.ModelViewSet):
             # Check if user has permission to update this menu item
             self.check_object_permissions(request, menu_item)
             
-            # Delete old image if it exists
-            if menu_item.image and os.path.isfile(menu_item.image.path):
-                os.remove(menu_item.image.path)
-            
+            # The old image is released by reference counting, since other
+            # items may share its file (imaging/blobs.py)
             menu_item.image = file
             menu_item.save()
             
@@ -141,6 +291,103 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @extend_schema(
+        summary="Bulk upload menu item images",
+        description="Upload many menu item images at once, as one ZIP archive or several files. "
+                    "Each file is matched to a menu item by its name without the extension: a menu item ID "
+                    "(e.g. 42.jpg) or a menu item name, case-insensitively (e.g. Butter Chicken.png). "
+                    "Originals are stored and assigned in one transaction; resized versions are rendered in "
+                    "parallel by the image workers, reported by each item's image_status.",
+        request={"multipart/form-data": {"files": "file"}},
+        responses={
+            200: OpenApiResponse(description="Per-file results: the matched menu item, or why the file was rejected"),
+            400: OpenApiResponse(description="Bad request: no files, an invalid ZIP or too many files")
+        },
+        tags=["Content Management"]
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_upload_images(self, request):
+        files = request.FILES.getlist('files') or request.FILES.getlist('file')
+        if not files:
+            return Response({'error': 'No files were provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            batch = list(self.store_batch(files))
+        except BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        assignments = [(item, name) for _, item, name, error in batch if error is None]
+        with transaction.atomic():
+            image_jobs.assign_images(assignments, 'image')
+            menu_items_changed([item.pk for item, _ in assignments])
+
+        results = [
+            {'file': filename, 'menu_item': item.pk if item else None,
+             'status': 'error' if error else 'queued', **({'error': error} if error else {})}
+            for filename, item, _, error in batch
+        ]
+        return Response({
+            'queued': len(assignments),
+            'failed': len(results) - len(assignments),
+            'results': results,
+        })
+
+    def store_batch(self, files):
+        """
+        Yield (filename, menu item, stored name, error) for each file of a
+        bulk upload, storing the images that match exactly one item the user
+        may edit. Of several files for the same item, the last one is used.
+        """
+        filenames = batch_filenames(files)
+        targets = self.bulk_upload_targets(filenames)
+        matches = [self.match_menu_item(filename, targets) for filename in filenames]
+        last = {item.pk: index for index, (item, _) in enumerate(matches) if item is not None}
+
+        for index, (filename, upload) in enumerate(batch_files(files)):
+            item, error = matches[index]
+            if error is None and upload is None:
+                error = 'File is too large'
+            elif error is None and last[item.pk] != index:
+                error = 'Replaced by a later file for the same menu item'
+            elif error is None:
+                try:
+                    check_image(upload)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                yield filename, None, None, error
+            else:
+                yield filename, item, image_jobs.store_upload(item, 'image', upload), None
+
+    def bulk_upload_targets(self, filenames):
+        """
+        The menu items the files may be assigned to, by ID and by lowercased
+        name, loaded with one query each.
+        """
+        stems = [os.path.splitext(filename)[0].strip() for filename in filenames]
+        ids = [int(stem) for stem in stems if stem.isdigit()]
+        names = [stem.lower() for stem in stems if not stem.isdigit()]
+        # Role scoped: items outside the user's scope are never matched
+        queryset = self.get_queryset().prefetch_related(None)
+        by_id = {item.pk: item for item in queryset.filter(pk__in=ids)}
+        by_name = {}
+        for item in queryset.annotate(lower_name=Lower('name')).filter(lower_name__in=names):
+            by_name.setdefault(item.lower_name, []).append(item)
+        return by_id, by_name
+
+    def match_menu_item(self, filename, targets):
+        by_id, by_name = targets
+        stem = os.path.splitext(filename)[0].strip()
+        if stem.isdigit():
+            item = by_id.get(int(stem))
+            return (item, None) if item else (None, f'No menu item with ID {stem}')
+        matches = by_name.get(stem.lower(), [])
+        if len(matches) == 1:
+            return matches[0], None
+        if matches:
+            return None, f'{len(matches)} menu items are named "{stem}"; name the file by ID instead'
+        return None, f'No menu item named "{stem}"'
+
 @extend_schema_view(
     list=extend_schema(
         summary="List testimonials",
@@ -177,12 +424,20 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         tags=["Content Management"]
     )
 )
-class TestimonialViewSet(viewsets.ModelViewSet):
+class TestimonialViewSet(ExportMixin, ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = Testimonial.objects.all()
     serializer_class = TestimonialSerializer
+    scope = MICROSITE_CONTENT_SCOPE
+    response_cache_models = (Testimonial, Microsite, Branch)
+    ordering = ('-created_at', '-id')
+    export_fields = ('id', 'name', 'content', 'rating', 'link', 'is_active', 'branch', 'created_at', 'updated_at')
+    export_related_fields = {'branch_name': 'branch__name'}
+    export_m2m_fields = ('microsites',)
+    export_filename = 'testimonials'
     
     def get_queryset(self):
-        user = self.request.user
-        base_queryset = Testimonial.objects.all()
+        # Role-based filtering is applied by MICROSITE_CONTENT_SCOPE
+        base_queryset = super().get_queryset()
         
         # Filter by microsite if provided
         microsite_id = self.request.query_params.get('microsite', None)
@@ -194,16 +449,7 @@ class TestimonialViewSet(viewsets.ModelViewSet):
         if branch_id:
             base_queryset = base_queryset.filter(branch_id=branch_id)
         
-        # Apply role-based filtering (existing logic)
-        if hasattr(user, 'role') and user.role:
-            if user.role.name == 'leadership':
-                return base_queryset
-            elif user.role.name in ['country_leadership', 'country_admin'] and hasattr(user, 'country') and user.country:
-                return base_queryset.filter(microsites__branches__country=user.country).distinct()
-            elif user.role.name == 'branch_manager' and hasattr(user, 'branch') and user.branch:
-                return base_queryset.filter(microsites__branches=user.branch).distinct()
-        
-        return Testimonial.objects.none()
+        return base_queryset
     
     # Add an endpoint to get available branches
     @extend_schema(
@@ -214,20 +460,11 @@ class TestimonialViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def available_branches(self, request):
-        from management.models import Branch
         from management.serializers import BranchSerializer
         
-        user = request.user
-        branches = []
-        
-        if user.role and user.role.name == 'leadership':
-            branches = Branch.objects.filter(is_active=True)
-        elif user.role and user.role.name in ['country_leadership', 'country_admin'] and user.country:
-            branches = Branch.objects.filter(country=user.country, is_active=True)
-        elif user.role and user.role.name == 'branch_manager' and user.branch:
-            branches = Branch.objects.filter(id=user.branch.id, is_active=True)
+        branches = BRANCH_SCOPE.apply(Branch.objects.filter(is_active=True), get_access_context(request))
             
-        serializer = BranchSerializer(branches, many=True)
+        serializer = BranchSerializer(eager_load(branches, BranchSerializer), many=True)
         return Response(serializer.data)    
 
     # def get_permissions(self):
@@ -255,28 +492,23 @@ class TestimonialViewSet(viewsets.ModelViewSet):
     ),
     # Other schema definitions remain the same
 )
-class FoodDeliveryEmbedViewSet(viewsets.ModelViewSet):
+class FoodDeliveryEmbedViewSet(ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = FoodDeliveryEmbed.objects.all()
     serializer_class = FoodDeliveryEmbedSerializer
+    scope = MICROSITE_CONTENT_SCOPE
+    response_cache_models = (FoodDeliveryEmbed, Microsite, Branch)
+    ordering = ('-id',)
     
     def get_queryset(self):
-        user = self.request.user
-        base_queryset = FoodDeliveryEmbed.objects.all()
+        # Role-based filtering is applied by MICROSITE_CONTENT_SCOPE
+        base_queryset = super().get_queryset()
         
         # Filter by microsite if provided (optional parameter)
         microsite_id = self.request.query_params.get('microsite', None)
         if microsite_id:
             base_queryset = base_queryset.filter(microsites__id=microsite_id)
         
-        # Apply role-based filtering
-        if hasattr(user, 'role') and user.role:
-            if user.role.name == 'leadership':
-                return base_queryset
-            elif user.role.name in ['country_leadership', 'country_admin'] and hasattr(user, 'country') and user.country:
-                return base_queryset.filter(microsites__branches__country=user.country).distinct()
-            elif user.role.name == 'branch_manager' and hasattr(user, 'branch') and user.branch:
-                return base_queryset.filter(microsites__branches=user.branch).distinct()
-        
-        return FoodDeliveryEmbed.objects.none()
+        return base_queryset
 
 @extend_schema_view(
     list=extend_schema(
@@ -290,12 +522,20 @@ class FoodDeliveryEmbedViewSet(viewsets.ModelViewSet):
     ),
     # Other schema definitions remain the same
 )
-class CareerViewSet(viewsets.ModelViewSet):
+class CareerViewSet(ExportMixin, ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = Career.objects.all()
     serializer_class = CareerSerializer
+    scope = MICROSITE_CONTENT_SCOPE
+    response_cache_models = (Career, Microsite, Branch)
+    ordering = ('-id',)
+    export_fields = ('id', 'name', 'department', 'job_type', 'url', 'description', 'is_active', 'branch', 'updated_at')
+    export_related_fields = {'branch_name': 'branch__name'}
+    export_m2m_fields = ('microsites',)
+    export_filename = 'careers'
     
     def get_queryset(self):
-        user = self.request.user
-        base_queryset = Career.objects.all()
+        # Role-based filtering is applied by MICROSITE_CONTENT_SCOPE
+        base_queryset = super().get_queryset()
         
         # Filter by microsite if provided (optional parameter)
         microsite_id = self.request.query_params.get('microsite', None)
@@ -307,16 +547,7 @@ class CareerViewSet(viewsets.ModelViewSet):
         if branch_id:
             base_queryset = base_queryset.filter(branch_id=branch_id)
         
-        # Apply role-based filtering (existing code...)
-        if hasattr(user, 'role') and user.role:
-            if user.role.name == 'leadership':
-                return base_queryset
-            elif user.role.name in ['country_leadership', 'country_admin'] and hasattr(user, 'country') and user.country:
-                return base_queryset.filter(microsites__branches__country=user.country).distinct()
-            elif user.role.name == 'branch_manager' and hasattr(user, 'branch') and user.branch:
-                return base_queryset.filter(microsites__branches=user.branch).distinct()
-        
-        return Career.objects.none()
+        return base_queryset
     
     # Add an endpoint to get available branches
     @extend_schema(
@@ -327,20 +558,11 @@ class CareerViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def available_branches(self, request):
-        from management.models import Branch
         from management.serializers import BranchSerializer
         
-        user = request.user
-        branches = []
-        
-        if user.role and user.role.name == 'leadership':
-            branches = Branch.objects.filter(is_active=True)
-        elif user.role and user.role.name in ['country_leadership', 'country_admin'] and user.country:
-            branches = Branch.objects.filter(country=user.country, is_active=True)
-        elif user.role and user.role.name == 'branch_manager' and user.branch:
-            branches = Branch.objects.filter(id=user.branch.id, is_active=True)
+        branches = BRANCH_SCOPE.apply(Branch.objects.filter(is_active=True), get_access_context(request))
             
-        serializer = BranchSerializer(branches, many=True)
+        serializer = BranchSerializer(eager_load(branches, BranchSerializer), many=True)
         return Response(serializer.data)
     
     @extend_schema(
@@ -361,7 +583,7 @@ class CareerViewSet(viewsets.ModelViewSet):
         This endpoint doesn't require any filtering parameters.
         """
         # Get all active careers
-        careers = Career.objects.filter(is_active=True).order_by('name')
+        careers = eager_load(Career.objects.filter(is_active=True).order_by('name'), CareerSerializer)
         
         # Serialize the careers
         serializer = self.get_serializer(careers, many=True)
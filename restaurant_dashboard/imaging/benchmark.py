@@ -0,0 +1,39 @@
+# imaging/benchmark.py
+"""
+Pipelines timed by the `benchmark_image_processing` command. They run in
+spawned processes, so like processing.py this module never imports models.
+"""
+import os
+import resource
+import tempfile
+import time
+from django.core.files import File
+from utils.image_utils import resize_image
+from .processing import process_image
+
+
+def peak_rss_kb():
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_resize_image(source_path, specs, max_pixels):
+    """
+    The former in-request pipeline: MenuItem.save called resize_image and
+    stored the returned ContentFile.
+    """
+    before = peak_rss_kb()
+    started = time.perf_counter()
+    with open(source_path, 'rb') as source:
+        resized = resize_image(File(source, name=os.path.basename(source_path)), max_size=(800, 600))
+        size = len(resized.read())
+    return time.perf_counter() - started, before, peak_rss_kb(), size
+
+
+def run_process_image(source_path, specs, max_pixels):
+    before = peak_rss_kb()
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as output_dir:
+        results = process_image(source_path, specs, output_dir, max_pixels)
+        size = sum(os.path.getsize(path) for path, _, _ in results.values())
+    return time.perf_counter() - started, before, peak_rss_kb(), size
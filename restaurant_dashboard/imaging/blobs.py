@@ -0,0 +1,110 @@
+# imaging/blobs.py
+"""
+Reference counting of content-addressed blobs (imaging/storage.py).
+
+A row references the blob of each processed image field and of each of its
+rendered variants. imaging/signals.py diffs those references on every save
+and delete and adjusts the counts here; a blob whose count drops to zero is
+deleted after the transaction commits. Files outside the blob directory
+(stored before it existed) are not counted and never deleted here.
+
+A save that reuses a stored file takes its reference only when its row is
+saved, later. Until then the file is protected by its mtime: reusing a file
+touches it, and unreferenced files used within MEDIA_BLOB_REUSE_GRACE
+seconds are left to the orphan collector (imaging/garbage.py). Reusing and
+removing a file both hold its Blob row lock, so they never interleave.
+"""
+import os
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .models import Blob
+from .storage import blob_storage
+
+
+def counted(names):
+    """
+    {count: [names]} of the blob names in `names`, which may repeat.
+    """
+    groups = {}
+    for name, count in Counter(name for name in names if blob_storage.is_blob(name)).items():
+        groups.setdefault(count, []).append(name)
+    return groups
+
+
+def incref(names):
+    """
+    Add one reference to each name in `names` (a name listed twice gets two).
+    """
+    for count, group in counted(names).items():
+        # Rows for blobs seen for the first time, then one increment for all
+        Blob.objects.bulk_create([Blob(name=name) for name in group], ignore_conflicts=True)
+        Blob.objects.filter(name__in=group).update(refcount=F('refcount') + count)
+
+
+def decref(names):
+    """
+    Remove one reference from each name in `names`, deleting blobs left
+    unreferenced once the transaction commits.
+    """
+    groups = counted(names)
+    for count, group in groups.items():
+        Blob.objects.filter(name__in=group).update(refcount=Greatest(F('refcount') - count, 0))
+    released = [name for group in groups.values() for name in group]
+    if released:
+        transaction.on_commit(lambda: collect(released))
+
+
+def lock(name):
+    """
+    Lock the Blob row of `name` until the transaction ends, creating it
+    unreferenced if it's missing.
+    """
+    Blob.objects.bulk_create([Blob(name=name)], ignore_conflicts=True)
+    return Blob.objects.select_for_update().get(name=name)
+
+
+def age(name):
+    """
+    Seconds since the blob's file was written or last reused.
+    """
+    return time.time() - os.path.getmtime(blob_storage.path(name))
+
+
+def reuse(name):
+    """
+    Keep the stored file of `name` for a save about to reference it. Returns
+    False if the file is gone and must be written again.
+    """
+    with transaction.atomic():
+        lock(name)
+        try:
+            os.utime(blob_storage.path(name))
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def collect(names):
+    """
+    Delete the blobs among `names` that no row references any more, unless
+    their file was used too recently.
+    """
+    for name in names:
+        with transaction.atomic():
+            # A save that referenced the blob again meanwhile raised its
+            # count; one reusing it waits for the lock, then rewrites it
+            blob = Blob.objects.select_for_update().filter(name=name, refcount=0).first()
+            if blob is None:
+                continue
+            try:
+                if age(name) < settings.MEDIA_BLOB_REUSE_GRACE:
+                    continue
+            except FileNotFoundError:
+                pass
+            blob_storage.delete(name)
+            blob.delete()
@@ -0,0 +1,128 @@
+# imaging/garbage.py
+"""
+Finding files under MEDIA_ROOT that no row references any more: images of
+deleted rows, replaced uploads, and files stored by requests that failed
+before committing.
+
+The media tree is walked lazily and checked in chunks: for each chunk, one
+query per FileField column and one for blob reference counts tell which of
+its files are still used, so memory stays flat however large the volume
+is. Directories other code manages (thumbnail cache, microsite snapshots)
+are skipped, and files younger than the grace period are left alone since
+an upload may be stored moments before its row is committed. Saves reusing
+a blob touch its file, so that covers deduplicated uploads too.
+"""
+import os
+import shutil
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from . import blobs
+from .models import Blob
+from .storage import blob_storage
+
+
+def managed_dirs():
+    """
+    Directories under MEDIA_ROOT whose files have their own lifecycle.
+    """
+    return [os.path.realpath(path) for path in (settings.THUMBNAIL_CACHE_DIR, settings.MICROSITE_SNAPSHOT_ROOT)]
+
+
+def walk_media(root, skip):
+    """
+    Yield (name relative to `root`, size, mtime) of every file under `root`,
+    except under the directories in `skip`.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.realpath(entry.path) not in skip:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    yield name, stat.st_size, stat.st_mtime
+
+
+def file_columns():
+    """
+    (model, field name) of every FileField (ImageField included) in the
+    project.
+    """
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def referenced(names, columns):
+    """
+    The subset of `names` that a FileField column or a blob reference uses.
+    Rendered variants are only recorded in JSON, so they count through
+    their blob rows.
+    """
+    used = set(Blob.objects.filter(name__in=names, refcount__gt=0).values_list('name', flat=True))
+    for model, field_name in columns:
+        used.update(model._base_manager.filter(**{f'{field_name}__in': names}).values_list(field_name, flat=True))
+    return used
+
+
+def find_orphans(grace_seconds, chunk_size=1000):
+    """
+    Yield (name, size) of every unreferenced file under MEDIA_ROOT older
+    than `grace_seconds`.
+    """
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - grace_seconds
+    columns = file_columns()
+    files = ((name, size) for name, size, mtime in walk_media(root, managed_dirs()) if mtime < cutoff)
+    while True:
+        chunk = dict(islice(files, chunk_size))
+        if not chunk:
+            return
+        used = referenced(list(chunk), columns)
+        for name, size in chunk.items():
+            if name not in used:
+                yield name, size
+
+
+def remove(name, quarantine_dir=None, grace_seconds=0):
+    """
+    Delete an orphan, or move it to the same relative path under
+    `quarantine_dir`. Blob rows left at zero references go with it.
+
+    A blob is checked again under its row lock first, since a save may have
+    referenced or reused it after find_orphans() saw it. Returns False if
+    it's kept.
+    """
+    if not blob_storage.is_blob(name):
+        move_or_delete(name, quarantine_dir)
+        return True
+    with transaction.atomic():
+        blob = blobs.lock(name)
+        if blob.refcount or blobs.age(name) < grace_seconds:
+            return False
+        move_or_delete(name, quarantine_dir)
+        blob.delete()
+    return True
+
+
+def move_or_delete(name, quarantine_dir=None):
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    if quarantine_dir:
+        target = os.path.join(quarantine_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+    else:
+        os.unlink(path)
@@ -0,0 +1,342 @@
+# imaging/jobs.py
+"""
+The database-backed image job queue.
+
+Models with a processed image field `<field>` also define `<field>_status`
+(an ImageStatus value) and `<field>_variants` (a JSON map of variant name to
+stored file). Saving a new upload stores the original as-is and queues a
+job; the `process_image_jobs` worker renders the variants configured in
+settings.IMAGE_VARIANTS and records them on the row. Originals and variants
+live in content-addressed storage (imaging/storage.py).
+"""
+import shutil
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import File
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from utils.response_cache import bump_version
+from .models import ImageJob, ImageStatus
+from . import blobs
+from .storage import blob_storage
+from .processing import CONTENT_TYPES, ImageTooLarge, process_image
+
+
+def status_field(field_name):
+    return f'{field_name}_status'
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def referenced_names(instance, field_name):
+    """
+    Counter of the stored files `field_name` references: the image and each
+    rendered variant. None if either column wasn't loaded.
+    """
+    deferred = instance.get_deferred_fields()
+    if field_name in deferred or variants_field(field_name) in deferred:
+        return None
+    names = Counter([getattr(instance, field_name).name])
+    names.update(variant['name'] for variant in (getattr(instance, variants_field(field_name)) or {}).values())
+    del names[None], names['']
+    return names
+
+
+def variant_config(model, field_name):
+    return settings.IMAGE_VARIANTS[f'{model._meta.label}.{field_name}']
+
+
+def variant_specs(model, field_name):
+    """
+    The variants to render for a field, named '<size>.<format>' (e.g.
+    '400w.webp'), from its sizes and formats in settings.IMAGE_VARIANTS.
+    """
+    config = variant_config(model, field_name)
+    return {
+        f'{size_name}.{format_name}': {'size': size, **settings.IMAGE_VARIANT_FORMATS[format_name]}
+        for size_name, size in config['sizes'].items()
+        for format_name in config['formats']
+    }
+
+
+def prepare_upload(instance, field_name):
+    """
+    Called from the model's save(): returns True if `field_name` holds a new,
+    not yet stored upload, and resets its status and variants accordingly.
+    """
+    image = getattr(instance, field_name)
+    if not image:
+        setattr(instance, status_field(field_name), ImageStatus.NONE)
+        setattr(instance, variants_field(field_name), {})
+        return False
+    if image._committed:
+        return False
+    setattr(instance, status_field(field_name), ImageStatus.PENDING)
+    setattr(instance, variants_field(field_name), {})
+    return True
+
+
+def enqueue(instance, field_name):
+    return ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        source_name=getattr(instance, field_name).name,
+    )
+
+
+def store_upload(instance, field_name, upload):
+    """
+    Store `upload` as `field_name` of `instance` would on save, without
+    saving the row. Returns the stored name, for assign_images().
+    """
+    field = instance._meta.get_field(field_name)
+    return field.storage.save(field.generate_filename(instance, upload.name), upload, max_length=field.max_length)
+
+
+def assign_images(assignments, field_name):
+    """
+    Bulk equivalent of setting `field_name` to a new upload and saving, for
+    a list of (instance, stored name) pairs of one model: writes the rows
+    with one bulk_update and queues their jobs with one insert.
+
+    No signals are sent; blob references and the response cache are kept
+    up to date here, anything else depending on the rows is up to the caller.
+    Run it in a transaction.
+    """
+    if not assignments:
+        return
+    model = type(assignments[0][0])
+    released, referenced = Counter(), Counter()
+    now = timezone.now()
+
+    instances = []
+    for instance, name in assignments:
+        released += referenced_names(instance, field_name) or Counter()
+        referenced[name] += 1
+        setattr(instance, field_name, name)
+        setattr(instance, status_field(field_name), ImageStatus.PENDING)
+        setattr(instance, variants_field(field_name), {})
+        instances.append(instance)
+
+    update_fields = [field_name, status_field(field_name), variants_field(field_name)]
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        for instance in instances:
+            instance.updated_at = now
+        update_fields.append('updated_at')
+    model.objects.bulk_update(instances, update_fields, batch_size=500)
+
+    blobs.incref(referenced.elements())
+    blobs.decref(released.elements())
+    content_type = ContentType.objects.get_for_model(model)
+    ImageJob.objects.bulk_create([
+        ImageJob(content_type=content_type, object_id=instance.pk, field_name=field_name,
+                 source_name=getattr(instance, field_name).name)
+        for instance in instances
+    ], batch_size=500)
+    bump_version(model)
+
+
+def requeue(instance, field_name):
+    """
+    Queue an already stored image for (re-)rendering. Marks it pending with
+    a queryset update, so callers queueing many rows invalidate caches once.
+    """
+    type(instance).objects.filter(pk=instance.pk).update(**{status_field(field_name): ImageStatus.PENDING})
+    setattr(instance, status_field(field_name), ImageStatus.PENDING)
+    return enqueue(instance, field_name)
+
+
+def claim(limit):
+    """
+    Mark up to `limit` jobs as running and return them. Pending jobs are
+    taken first-in first-out, along with running jobs whose worker seems to
+    have died (started more than IMAGE_JOB_STALE_AFTER seconds ago).
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.IMAGE_JOB_STALE_AFTER)
+    with transaction.atomic():
+        jobs = ImageJob.objects.filter(
+            Q(status=ImageJob.PENDING) | Q(status=ImageJob.RUNNING, started_at__lt=stale_before)
+        ).select_related('content_type').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent workers skip each other's rows instead of waiting
+            jobs = jobs.select_for_update(skip_locked=True, of=('self',))
+        jobs = list(jobs[:limit])
+        ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=ImageJob.RUNNING, started_at=now, attempts=F('attempts') + 1
+        )
+    for job in jobs:
+        job.status, job.started_at, job.attempts = ImageJob.RUNNING, now, job.attempts + 1
+    return jobs
+
+
+def job_arguments(job, output_dir):
+    """
+    The picklable arguments `process_image` needs for `job`.
+    """
+    model = job.content_type.model_class()
+    return (
+        model._meta.get_field(job.field_name).storage.path(job.source_name),
+        variant_specs(model, job.field_name),
+        output_dir,
+        settings.IMAGE_MAX_PIXELS,
+    )
+
+
+def _finish(job, status, error=''):
+    job.status, job.error, job.finished_at = status, error, timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def _locked_instance(job):
+    """
+    The job's row, locked, or None if it's gone or its image was replaced.
+    """
+    model = job.content_type.model_class()
+    instance = model.objects.select_for_update().filter(pk=job.object_id).first()
+    if instance is None or getattr(instance, job.field_name).name != job.source_name:
+        return None
+    return instance
+
+
+def _save_status(instance, field_name, status, variants):
+    setattr(instance, status_field(field_name), status)
+    setattr(instance, variants_field(field_name), variants)
+    update_fields = [status_field(field_name), variants_field(field_name)]
+    if any(field.name == 'updated_at' for field in instance._meta.concrete_fields):
+        update_fields.append('updated_at')
+    # A regular save, so cache invalidation signals see the change (the
+    # worker shares the cache with the web containers)
+    instance.save(update_fields=update_fields)
+
+
+def complete(job, results):
+    """
+    Store the files rendered for `job` and mark its image ready.
+    """
+    variants = {}
+    for name, (path, extension, (width, height)) in results.items():
+        with open(path, 'rb') as rendered:
+            # Copied in chunks, and stored once however many rows render the same bytes
+            stored = blob_storage.save(f'{name}{extension}', File(rendered))
+        variants[name] = {'name': stored, 'width': width, 'height': height, 'type': CONTENT_TYPES[extension]}
+    return _mark_ready(job, variants)
+
+
+def _mark_ready(job, variants):
+    with transaction.atomic():
+        instance = _locked_instance(job)
+        if instance is None:
+            _finish(job, ImageJob.DONE, 'Skipped: the image was replaced or removed')
+            return False
+        # Replaced variants are released by imaging/signals.py
+        _save_status(instance, job.field_name, ImageStatus.READY, variants)
+        _finish(job, ImageJob.DONE)
+    return True
+
+
+def rendered_elsewhere(job):
+    """
+    The variants another row already rendered from the same stored image
+    (content-addressed, so the same bytes), or None.
+    """
+    model = job.content_type.model_class()
+    expected = set(variant_specs(model, job.field_name))
+    candidates = model.objects.filter(**{
+        job.field_name: job.source_name, status_field(job.field_name): ImageStatus.READY,
+    }).exclude(pk=job.object_id).values_list(variants_field(job.field_name), flat=True)
+    for variants in candidates[:5]:
+        if expected <= set(variants):
+            return {name: variants[name] for name in expected}
+    return None
+
+
+def fail(job, error, retry=True):
+    """
+    Record a failed attempt; the job is retried until IMAGE_JOB_MAX_ATTEMPTS
+    unless `retry` is False.
+    """
+    if retry and job.attempts < settings.IMAGE_JOB_MAX_ATTEMPTS:
+        _finish(job, ImageJob.PENDING, str(error))
+        return
+
+    with transaction.atomic():
+        instance = _locked_instance(job)
+        if instance is not None:
+            _save_status(instance, job.field_name, ImageStatus.FAILED, {})
+        _finish(job, ImageJob.FAILED, str(error))
+
+
+def process_pending(limit=50, executor=None):
+    """
+    Claim and run up to `limit` jobs, in `executor` (a process pool) if given,
+    otherwise in this process. Returns the number of (completed, failed) jobs.
+    """
+    started = []
+    completed = failed = 0
+    for job in claim(limit):
+        variants = rendered_elsewhere(job)
+        if variants is not None:
+            _mark_ready(job, variants)
+            completed += 1
+            continue
+        # Rendered files are written here, then copied into storage
+        output_dir = tempfile.mkdtemp(prefix='image-job-', dir=settings.IMAGE_JOB_WORK_DIR)
+        try:
+            arguments = job_arguments(job, output_dir)
+            outcome = executor.submit(process_image, *arguments) if executor else process_image(*arguments)
+        except Exception as exc:
+            outcome = exc
+        started.append((job, output_dir, outcome))
+
+    for job, output_dir, outcome in started:
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            results = outcome.result() if executor else outcome
+        except Exception as exc:
+            # Retrying can't make an image smaller
+            fail(job, exc, retry=not isinstance(exc, ImageTooLarge))
+            failed += 1
+            continue
+        else:
+            complete(job, results)
+            completed += 1
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    return completed, failed
+
+
+def variant_url(instance, field_name, variant=None):
+    """
+    URL of one rendered variant (by default the field's 'default' variant),
+    or of the original while it's not ready. None if there is no image.
+    """
+    image = getattr(instance, field_name)
+    if not image:
+        return None
+    variant = variant or variant_config(type(instance), field_name)['default']
+    stored = (getattr(instance, variants_field(field_name)) or {}).get(variant)
+    if stored is not None:
+        return blob_storage.url(stored['name'])
+    return image.url
+
+
+def rendered_variants(instance, field_name):
+    """
+    The rendered variants of a field as {name: {'url', 'width', 'height',
+    'type'}}; empty until processing is done.
+    """
+    return {
+        name: {'url': blob_storage.url(stored['name']), 'width': stored['width'],
+               'height': stored['height'], 'type': stored.get('type')}
+        for name, stored in (getattr(instance, variants_field(field_name)) or {}).items()
+    }
@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from imaging import jobs
+from imaging.benchmark import run_process_image, run_resize_image
+
+
+class Command(BaseCommand):
+    help = 'Compares peak memory and time of the old resize_image with the image job pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('image', help='Path of the image to process')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per pipeline; the best time and highest memory are reported',
+        )
+
+    def handle(self, *args, **options):
+        source_path = options['image']
+        if not os.path.isfile(source_path):
+            raise CommandError(f'No such file: {source_path}')
+
+        from content.models import MenuItem
+        single = {'800w.jpeg': {'size': (800, 600), 'format': 'JPEG', 'quality': 85}}
+        pipelines = [
+            ('resize_image, 800x600 JPEG', run_resize_image, single),
+            ('process_image, 800x600 JPEG', run_process_image, single),
+            ('process_image, all MenuItem variants', run_process_image, jobs.variant_specs(MenuItem, 'image')),
+        ]
+
+        self.stdout.write(f"{'pipeline':<40}{'best time':>12}{'idle RSS':>12}{'peak RSS':>12}{'output':>10}")
+        context = multiprocessing.get_context('spawn')
+        for label, function, specs in pipelines:
+            runs = []
+            for _ in range(options['repeat']):
+                # A fresh process per run, so each peak is that run's own
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    runs.append(executor.submit(function, source_path, specs, settings.IMAGE_MAX_PIXELS).result())
+            elapsed = min(run[0] for run in runs)
+            idle = max(run[1] for run in runs)
+            peak = max(run[2] for run in runs)
+            size = runs[-1][3]
+            self.stdout.write(
+                f'{label:<40}{elapsed * 1000:>10.0f}ms{idle / 1024:>10.1f}MB{peak / 1024:>10.1f}MB{size / 1024:>8.0f}KB'
+            )
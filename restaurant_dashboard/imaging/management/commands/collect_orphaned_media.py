@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from imaging import garbage
+
+
+class Command(BaseCommand):
+    help = 'Quarantines (or deletes) files under MEDIA_ROOT that no row references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='Leave files modified more recently than this alone (default: 24)',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete orphans instead of moving them to MEDIA_QUARANTINE_DIR',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be removed',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Files checked against the database per round of queries',
+        )
+
+    def handle(self, *args, **options):
+        quarantine_dir = None if options['delete'] else settings.MEDIA_QUARANTINE_DIR
+        removed = reclaimed = 0
+        grace_seconds = options['grace_hours'] * 3600
+        for name, size in garbage.find_orphans(grace_seconds, options['chunk_size']):
+            if not options['dry_run']:
+                try:
+                    if not garbage.remove(name, quarantine_dir, grace_seconds):
+                        continue
+                except FileNotFoundError:
+                    continue
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+            removed += 1
+            reclaimed += size
+
+        if options['dry_run']:
+            action = 'Would remove'
+        elif quarantine_dir:
+            action = f'Moved to {quarantine_dir}:'
+        else:
+            action = 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {removed} orphaned file(s), {reclaimed / 1024 / 1024:.1f} MB reclaimed'
+        ))
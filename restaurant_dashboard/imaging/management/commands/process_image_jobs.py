@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from imaging import jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs queued image processing jobs in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of processes rendering images (default: CPU count; 0 renders in this process)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Jobs claimed per round (default: 4 per worker)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size'] or max(workers, 1) * 4
+
+        executor = None
+        if workers > 0:
+            # Spawned, not forked, so children never share this process's DB connection
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+        total_completed = total_failed = 0
+        try:
+            while True:
+                completed, failed = jobs.process_pending(batch_size, executor)
+                total_completed += completed
+                total_failed += failed
+                if completed or failed:
+                    self.stdout.write(f'Processed {completed} image(s), {failed} failed')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Image jobs done: {total_completed} processed, {total_failed} failed'
+        ))
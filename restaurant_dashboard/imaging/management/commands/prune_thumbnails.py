@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from imaging import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Evicts least recently used thumbnails until the cache fits THUMBNAIL_CACHE_MAX_BYTES'
+
+    def handle(self, *args, **options):
+        removed, freed = thumbnails.sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {removed} thumbnail(s), freed {freed / 1024 / 1024:.1f} MB '
+            f'(limit {settings.THUMBNAIL_CACHE_MAX_BYTES / 1024 / 1024:.0f} MB)'
+        ))
@@ -0,0 +1,42 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from imaging import jobs
+from imaging.models import ImageStatus
+from utils.response_cache import bump_version
+
+
+class Command(BaseCommand):
+    help = 'Queues image jobs for stored images missing any of their configured variants'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every image, not only those missing variants',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for key in settings.IMAGE_VARIANTS:
+            label, field_name = key.rsplit('.', 1)
+            model = apps.get_model(label)
+            expected = set(jobs.variant_specs(model, field_name))
+            status_field, variants_field = jobs.status_field(field_name), jobs.variants_field(field_name)
+
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}).exclude(
+                **{status_field: ImageStatus.PENDING}
+            ).only('pk', field_name, variants_field)
+            queued = 0
+            for instance in rows.iterator(chunk_size=500):
+                if not options['all'] and expected <= set(getattr(instance, variants_field) or {}):
+                    continue
+                jobs.requeue(instance, field_name)
+                queued += 1
+            if queued:
+                # Statuses were updated without signals
+                bump_version(model)
+            total += queued
+            self.stdout.write(f'{key}: queued {queued} image(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Queued {total} image job(s); run process_image_jobs to render them'))
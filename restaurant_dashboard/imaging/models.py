@@ -0,0 +1,69 @@
+# imaging/models.py
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+class ImageStatus:
+    """
+    Processing state stored on the model next to each processed image field
+    (e.g. MenuItem.image_status).
+    """
+    NONE = ''
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    CHOICES = [
+        (NONE, 'No image'),
+        (PENDING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
+class ImageJob(models.Model):
+    """
+    A queued request to produce the derived versions of one uploaded image.
+    Jobs are claimed and run by the `process_image_jobs` worker.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveBigIntegerField()
+    field_name = models.CharField(max_length=100)
+    # The stored file the job was queued for; a newer upload makes the job obsolete
+    source_name = models.CharField(max_length=255)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id}.{self.field_name} ({self.status})"
+
+class Blob(models.Model):
+    """
+    The number of references rows hold to one file in content-addressed
+    storage (imaging/storage.py). The file is deleted once no row uses it.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
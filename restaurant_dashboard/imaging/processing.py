@@ -0,0 +1,101 @@
+# imaging/processing.py
+"""
+Pillow work for derived images. Everything here runs in worker processes,
+so it only takes file paths and plain data and never touches Django models.
+
+Memory is bounded by the decoded source: oversized images are rejected from
+their header before any pixels are decoded, JPEGs are decoded at the
+smallest 1/2, 1/4 or 1/8 scale still covering the largest variant, and
+encoded variants go straight to files instead of in-memory buffers.
+"""
+import os
+from PIL import Image
+
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+CONTENT_TYPES = {'.jpg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp'}
+
+# Resize in two steps (integer reduce, then LANCZOS) once the image is this
+# many times larger than the target; visually identical and much faster.
+REDUCING_GAP = 3.0
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def fitted_size(size, box):
+    """
+    `size` scaled down to fit inside `box`, keeping the aspect ratio; never
+    scaled up.
+    """
+    width, height = size
+    max_width, max_height = box
+    if width <= max_width and height <= max_height:
+        return width, height
+    ratio = min(max_width / width, max_height / height)
+    return max(int(width * ratio), 1), max(int(height * ratio), 1)
+
+
+def open_image(source_path, max_pixels):
+    """
+    Open an image without decoding it, rejecting it if it has more than
+    `max_pixels` pixels.
+    """
+    img = Image.open(source_path)
+    width, height = img.size
+    if width * height > max_pixels:
+        img.close()
+        raise ImageTooLarge(
+            f'Image is {width}x{height} ({width * height / 1e6:.1f} MP); '
+            f'the limit is {max_pixels / 1e6:.1f} MP'
+        )
+    return img
+
+
+def encode(img, spec, path):
+    """
+    Encode an image in `spec['format']` at `spec['quality']` to `path`.
+    """
+    image_format = spec.get('format', 'JPEG')
+    if image_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        # WebP and PNG keep transparency
+        img = img.convert('RGBA')
+    img.save(path, format=image_format, quality=spec.get('quality', 85))
+
+
+def process_image(source_path, specs, output_dir, max_pixels):
+    """
+    Render every variant in `specs` ({name: spec}) from the image at
+    `source_path` into files in `output_dir`.
+    Returns {name: (path, extension, (width, height))}.
+
+    Each size is resized once and shared by every format of that size, and
+    is reduced from the smallest larger size already rendered rather than
+    from the full original.
+    """
+    results = {}
+    with open_image(source_path, max_pixels) as img:
+        targets = {name: fitted_size(img.size, spec['size']) for name, spec in specs.items()}
+        largest = max(targets.values(), default=img.size)
+        # A no-op for formats other than JPEG; keeps the size at least `largest`
+        img.draft(None, largest)
+        img.load()
+
+        resized = {img.size: img}
+        for name in sorted(specs, key=lambda name: targets[name], reverse=True):
+            target = targets[name]
+            if target not in resized:
+                source = min(
+                    (size for size in resized if size[0] >= target[0] and size[1] >= target[1]),
+                    key=lambda size: size[0] * size[1],
+                )
+                resized[target] = resized[source].resize(target, Image.LANCZOS, reducing_gap=REDUCING_GAP)
+
+            spec = specs[name]
+            extension = EXTENSIONS[spec.get('format', 'JPEG')]
+            path = os.path.join(output_dir, f'{name}{extension}')
+            encode(resized[target], spec, path)
+            results[name] = (path, extension, target)
+    return results
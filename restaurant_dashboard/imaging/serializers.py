@@ -0,0 +1,34 @@
+# imaging/serializers.py
+from rest_framework import serializers
+from . import jobs
+
+
+class ProcessedImageMixin(serializers.ModelSerializer):
+    """
+    Adds the rendered variants of each field in `processed_image_fields`:
+
+    - `<field>`: the field's default variant once ready, the original before
+    - `<field>_variants`: {name: {url, width, height, type}} of every variant
+    - `<field>_srcset`: a srcset string per content type, for <picture> sources
+    """
+    processed_image_fields = ()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field_name in self.processed_image_fields:
+            if field_name not in data:
+                continue
+            data[field_name] = self.absolute_url(jobs.variant_url(instance, field_name))
+
+            variants = jobs.rendered_variants(instance, field_name)
+            srcset = {}
+            for variant in sorted(variants.values(), key=lambda variant: variant['width']):
+                variant['url'] = self.absolute_url(variant['url'])
+                srcset.setdefault(variant['type'], []).append(f"{variant['url']} {variant['width']}w")
+            data[f'{field_name}_variants'] = variants
+            data[f'{field_name}_srcset'] = {content_type: ', '.join(urls) for content_type, urls in srcset.items()}
+        return data
+
+    def absolute_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if url and request else url
@@ -0,0 +1,83 @@
+# imaging/signals.py
+"""
+Keeps blob reference counts in step with the rows using them: every model
+with a processed image field (a key of settings.IMAGE_VARIANTS) remembers
+the blobs it referenced when loaded, and on save the difference is counted.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from . import blobs, jobs
+
+SNAPSHOT_ATTRIBUTE = '_image_blob_names'
+
+
+def processed_fields():
+    """
+    {model: [field names]} of every processed image field.
+    """
+    fields = {}
+    for key in settings.IMAGE_VARIANTS:
+        label, field_name = key.rsplit('.', 1)
+        fields.setdefault(apps.get_model(label), []).append(field_name)
+    return fields
+
+
+def snapshot(instance, field_names):
+    setattr(instance, SNAPSHOT_ATTRIBUTE, {
+        field_name: jobs.referenced_names(instance, field_name) for field_name in field_names
+    })
+
+
+def connect(model, field_names):
+    def remember_blobs(sender, instance, **kwargs):
+        snapshot(instance, field_names)
+
+    def load_unknown_blobs(sender, instance, update_fields=None, **kwargs):
+        # Fields deferred when the row was loaded: read their old values now
+        known = getattr(instance, SNAPSHOT_ATTRIBUTE, {})
+        unknown = [
+            field_name for field_name in field_names
+            if known.get(field_name) is None and instance.pk is not None and (
+                update_fields is None
+                or {field_name, jobs.variants_field(field_name)} & set(update_fields)
+            )
+        ]
+        if not unknown:
+            return
+        stored = sender.objects.filter(pk=instance.pk).first()
+        if stored is not None:
+            known.update({field_name: jobs.referenced_names(stored, field_name) for field_name in unknown})
+            setattr(instance, SNAPSHOT_ATTRIBUTE, known)
+
+    def count_blobs(sender, instance, created, **kwargs):
+        known = getattr(instance, SNAPSHOT_ATTRIBUTE, {})
+        added, removed = Counter(), Counter()
+        for field_name in field_names:
+            current = jobs.referenced_names(instance, field_name)
+            if current is None:
+                continue
+            previous = Counter() if created else known.get(field_name) or Counter()
+            added += current - previous
+            removed += previous - current
+        blobs.incref(added.elements())
+        blobs.decref(removed.elements())
+        snapshot(instance, field_names)
+
+    def release_blobs(sender, instance, **kwargs):
+        names = Counter()
+        for field_name in field_names:
+            names += jobs.referenced_names(instance, field_name) or Counter()
+        blobs.decref(names.elements())
+
+    uid = f'imaging.blobs.{model._meta.label}'
+    post_init.connect(remember_blobs, sender=model, weak=False, dispatch_uid=uid)
+    pre_save.connect(load_unknown_blobs, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(count_blobs, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(release_blobs, sender=model, weak=False, dispatch_uid=uid)
+
+
+for model, field_names in processed_fields().items():
+    connect(model, field_names)
@@ -0,0 +1,72 @@
+# imaging/storage.py
+"""
+Content-addressed storage for uploaded and derived images.
+
+Files are stored once per distinct content, as
+`<MEDIA_BLOB_DIR>/<ab>/<cd>/<sha256><ext>`, whatever name they were saved
+under. Saving bytes that are already stored returns the existing name, so
+the same dish photo uploaded to many menu items takes the disk space of one.
+A blob's content never changes, so nginx serves the directory as immutable.
+
+Blobs are shared between rows: never delete one directly. Rows hold
+references counted in imaging.models.Blob (see imaging/blobs.py), and a
+blob is removed when its last reference goes. Reusing a stored file goes
+through imaging.blobs.reuse(), which keeps it from being removed before the
+row referencing it is saved.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, digest, extension):
+        return '/'.join([settings.MEDIA_BLOB_DIR, digest[:2], digest[2:4], f'{digest}{extension.lower()}'])
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(f'{settings.MEDIA_BLOB_DIR}/')
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, in _save()
+        return name
+
+    def _save(self, name, content):
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        name = self.blob_name(sha256.hexdigest(), os.path.splitext(name)[1])
+        from .blobs import reuse
+        if self.exists(name) and reuse(name):
+            return name
+
+        # Written aside and renamed into place, so a concurrent save of the
+        # same content can never expose a partial file
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                content.seek(0)
+                for chunk in content.chunks():
+                    temp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return name
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def get_blob_storage():
+    # A callable, so migrations don't serialize the storage itself
+    return blob_storage
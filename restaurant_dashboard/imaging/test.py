@@ -0,0 +1,327 @@
+# imaging/test.py
+import os
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from content.models import MenuItem
+from content.serializers import MenuItemSerializer
+from optimization.models import BaseSEO
+from optimization.serializers import BaseSEOSerializer
+from .models import Blob, ImageJob, ImageStatus
+from .storage import blob_storage
+from . import garbage, jobs, processing, thumbnails
+
+
+def upload(size=(1600, 1200), name='dish.png', color=(200, 80, 40)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageJobTest(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+
+    def test_upload_is_stored_as_is_and_processed_later(self):
+        item = MenuItem.objects.create(name='Dish', image=upload())
+        self.assertEqual(item.image_status, ImageStatus.PENDING)
+        self.assertEqual(Image.open(item.image.path).size, (1600, 1200))
+        self.assertEqual(ImageJob.objects.filter(status=ImageJob.PENDING).count(), 1)
+
+        self.assertEqual(jobs.process_pending(), (1, 0))
+
+        item.refresh_from_db()
+        self.assertEqual(item.image_status, ImageStatus.READY)
+        self.assertEqual(
+            {name: (variant['width'], variant['height']) for name, variant in item.image_variants.items()},
+            {
+                'thumb.webp': (160, 120), 'thumb.jpeg': (160, 120),
+                '400w.webp': (400, 300), '400w.jpeg': (400, 300),
+                '800w.webp': (800, 600), '800w.jpeg': (800, 600),
+                # Never scaled up
+                '1600w.webp': (1600, 1200), '1600w.jpeg': (1600, 1200),
+            },
+        )
+        self.assertEqual(jobs.variant_url(item, 'image'), f"/media/{item.image_variants['800w.jpeg']['name']}")
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.DONE)
+
+    def test_replaced_upload_skips_the_old_job(self):
+        item = MenuItem.objects.create(name='Dish', image=upload())
+        item.image = upload(name='new.png', size=(400, 300))
+        item.save()
+
+        self.assertEqual(jobs.process_pending(), (2, 0))
+
+        item.refresh_from_db()
+        self.assertEqual(item.image_status, ImageStatus.READY)
+        self.assertEqual(item.image_variants['800w.jpeg']['width'], 400)
+        self.assertIn('replaced', ImageJob.objects.order_by('id').first().error)
+
+    @override_settings(IMAGE_JOB_MAX_ATTEMPTS=2)
+    def test_unreadable_image_fails_after_retries(self):
+        item = MenuItem.objects.create(
+            name='Dish', image=SimpleUploadedFile('broken.png', b'not an image', content_type='image/png'))
+
+        self.assertEqual(jobs.process_pending(), (0, 1))
+        self.assertEqual(jobs.process_pending(), (0, 1))
+        self.assertEqual(jobs.process_pending(), (0, 0))
+
+        item.refresh_from_db()
+        self.assertEqual(item.image_status, ImageStatus.FAILED)
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.FAILED)
+
+    @override_settings(IMAGE_MAX_PIXELS=1000 * 1000)
+    def test_oversized_image_fails_without_retrying(self):
+        item = MenuItem.objects.create(name='Dish', image=upload())
+
+        self.assertEqual(jobs.process_pending(), (0, 1))
+
+        item.refresh_from_db()
+        self.assertEqual(item.image_status, ImageStatus.FAILED)
+        self.assertIn('the limit is 1.0 MP', ImageJob.objects.get().error)
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        path = os.path.join(settings.MEDIA_ROOT, 'large.jpg')
+        Image.new('RGB', (4000, 3000), (200, 80, 40)).save(path, quality=90)
+        specs = {'small.jpeg': {'size': (400, 300), 'format': 'JPEG'}}
+
+        with mock.patch.object(Image.Image, 'resize', autospec=True, side_effect=Image.Image.resize) as resize:
+            results = processing.process_image(path, specs, settings.MEDIA_ROOT, 10 ** 8)
+
+        # Decoded at 1/8 scale (500x375), not 4000x3000
+        self.assertEqual(resize.call_args.args[0].size, (500, 375))
+        self.assertEqual(results['small.jpeg'][2], (400, 300))
+
+
+class ResponsiveVariantsTest(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+
+    def test_menu_item_serializer_exposes_srcset_per_format(self):
+        item = MenuItem.objects.create(name='Dish', image=upload())
+        data = MenuItemSerializer(item).data
+        self.assertEqual(data['image_status'], ImageStatus.PENDING)
+        self.assertEqual(data['image'], item.image.url)
+        self.assertEqual(data['image_srcset'], {})
+
+        jobs.process_pending()
+        item.refresh_from_db()
+        data = MenuItemSerializer(item).data
+
+        self.assertEqual(data['image'], jobs.variant_url(item, 'image', '800w.jpeg'))
+        self.assertEqual(set(data['image_srcset']), {'image/webp', 'image/jpeg'})
+        webp = data['image_srcset']['image/webp'].split(', ')
+        self.assertEqual([candidate.split(' ')[1] for candidate in webp], ['160w', '400w', '800w', '1600w'])
+        self.assertEqual(data['image_variants']['400w.webp']['type'], 'image/webp')
+
+    def test_seo_images_keep_transparency(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (512, 512), (0, 0, 0, 0)).save(buffer, format='PNG')
+        seo = BaseSEO.objects.create(
+            site_name='Site', meta_title='Title', meta_description='Description',
+            favicon=SimpleUploadedFile('icon.png', buffer.getvalue(), content_type='image/png'),
+            og_image=upload(name='og.png'),
+        )
+
+        self.assertEqual(jobs.process_pending(), (2, 0))
+        seo.refresh_from_db()
+        data = BaseSEOSerializer(seo).data
+
+        self.assertTrue(data['favicon'].endswith('.png'))
+        self.assertEqual(Image.open(default_storage.path(seo.favicon_variants['180.png']['name'])).mode, 'RGBA')
+        self.assertEqual(
+            (seo.og_image_variants['1200w.jpeg']['width'], seo.og_image_variants['1200w.jpeg']['height']),
+            (840, 630),
+        )
+
+
+class BlobStorageTest(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(
+            MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory()), MEDIA_BLOB_REUSE_GRACE=0,
+        ))
+
+    def test_identical_uploads_share_files_until_the_last_row_goes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = MenuItem.objects.create(name='Dish', image=upload())
+            second = MenuItem.objects.create(name='Same dish', image=upload(name='copy.png'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith('blobs/'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(jobs.process_pending(), (2, 0))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        # Same source bytes, so the same variant blobs
+        self.assertEqual(first.image_variants, second.image_variants)
+        self.assertEqual(Blob.objects.get(name=first.image.name).refcount, 2)
+        self.assertEqual(Blob.objects.count(), 1 + len(first.image_variants))
+
+        path = first.image.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_replaced_image_is_released(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish', image=upload())
+        old_path = item.image.path
+
+        item = MenuItem.objects.only('id', 'name').get(pk=item.pk)
+        item.image = upload(color=(0, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+
+        self.assertFalse(os.path.exists(old_path))
+        self.assertEqual(list(Blob.objects.values_list('name', flat=True)), [item.image.name])
+
+    @override_settings(MEDIA_BLOB_REUSE_GRACE=600)
+    def test_released_blob_reused_before_collection_is_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish', image=upload())
+        name, path = item.image.name, item.image.path
+        os.utime(path, (time.time() - 3600,) * 2)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            item.delete()
+        # Stored by a save whose row isn't committed yet
+        self.assertEqual(blob_storage.save('copy.png', upload()), name)
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Blob.objects.get(name=name).refcount, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItem.objects.create(name='Same dish', image=name)
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+
+    def test_file_removed_before_reuse_is_written_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish', image=upload())
+        os.remove(item.image.path)
+
+        with mock.patch.object(blob_storage, 'exists', return_value=True):
+            self.assertEqual(blob_storage.save('copy.png', upload()), item.image.name)
+        self.assertTrue(os.path.exists(item.image.path))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media_root,
+            THUMBNAIL_CACHE_DIR=os.path.join(media_root, 'thumb'),
+            SINGLE_FLIGHT_LOCK_DIR=os.path.join(media_root, 'locks'),
+        ))
+        self.item = MenuItem.objects.create(name='Dish', image=upload())
+
+    def test_renders_once_then_serves_the_cached_file(self):
+        url = thumbnails.thumbnail_url(self.item.image.name, 128)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        cached = thumbnails.cache_path(128, self.item.image.name)
+        self.assertEqual(Image.open(cached).size, (128, 96))
+        # Where nginx finds it
+        self.assertEqual(cached, os.path.join(settings.MEDIA_ROOT, url[len(settings.MEDIA_URL):]))
+
+        with mock.patch.object(thumbnails, 'render') as render:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        render.assert_not_called()
+
+    def test_rejects_sizes_and_paths_outside_the_whitelist(self):
+        self.assertEqual(self.client.get(thumbnails.thumbnail_url(self.item.image.name, 100)).status_code, 404)
+        self.assertEqual(self.client.get('/media/thumb/64/../../etc/passwd.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/media/thumb/64/blobs/missing.png').status_code, 404)
+
+    def test_evicts_least_recently_used(self):
+        names = []
+        for color in range(3):
+            item = MenuItem.objects.create(name='Dish', image=upload(color=(color, 0, 0)))
+            path = thumbnails.get_thumbnail(256, item.image.name)
+            os.utime(path, (1000 + color, 1000 + color))
+            names.append(path)
+        sizes = [os.path.getsize(path) for path in names]
+
+        with override_settings(THUMBNAIL_CACHE_MAX_BYTES=sum(sizes) - 1, THUMBNAIL_CACHE_LOW_WATER=0.99):
+            self.assertEqual(thumbnails.sweep(), (1, sizes[0]))
+        self.assertEqual([os.path.exists(path) for path in names], [False, True, True])
+
+
+class OrphanedMediaTest(TestCase):
+    def setUp(self):
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.quarantine = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media_root,
+            MEDIA_QUARANTINE_DIR=self.quarantine,
+            THUMBNAIL_CACHE_DIR=os.path.join(media_root, 'thumb'),
+            MICROSITE_SNAPSHOT_ROOT=os.path.join(media_root, 'microsites'),
+        ))
+
+    def write(self, name, age_hours=48):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100)
+        os.utime(path, (time.time() - age_hours * 3600,) * 2)
+        return path
+
+    def test_moves_old_unreferenced_files_to_quarantine(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish', image=upload())
+        jobs.process_pending()
+        item.refresh_from_db()
+        kept = [item.image.path] + [default_storage.path(v['name']) for v in item.image_variants.values()]
+        for path in kept:
+            os.utime(path, (time.time() - 48 * 3600,) * 2)
+
+        legacy = self.write('menu_items/old.jpg')
+        MenuItem.objects.create(name='Legacy', image='menu_items/used.jpg')
+        used_legacy = self.write('menu_items/used.jpg')
+        recent = self.write('menu_items/just_uploaded.jpg', age_hours=1)
+        thumbnail = self.write('thumb/64/menu_items/old.jpg')
+
+        out = StringIO()
+        call_command('collect_orphaned_media', '--chunk-size', '2', stdout=out)
+
+        self.assertIn('Moved to', out.getvalue())
+        self.assertIn('1 orphaned file(s)', out.getvalue())
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(os.path.join(self.quarantine, 'menu_items/old.jpg')))
+        for path in kept + [used_legacy, recent, thumbnail]:
+            self.assertTrue(os.path.exists(path), path)
+
+    def test_blob_reused_after_it_was_found_is_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish', image=upload())
+        name, path = item.image.name, item.image.path
+        MenuItem.objects.filter(pk=item.pk).update(image='')
+        Blob.objects.filter(name=name).update(refcount=0)
+        os.utime(path, (time.time() - 48 * 3600,) * 2)
+
+        orphans = [orphan for orphan, _ in garbage.find_orphans(24 * 3600)]
+        self.assertIn(name, orphans)
+        # An upload of the same bytes, its row not committed yet
+        self.assertEqual(blob_storage.save('copy.png', upload()), name)
+
+        self.assertFalse(garbage.remove(name, self.quarantine, 24 * 3600))
+        self.assertTrue(os.path.exists(path))
+
+        os.utime(path, (time.time() - 48 * 3600,) * 2)
+        Blob.objects.filter(name=name).update(refcount=1)
+        self.assertFalse(garbage.remove(name, self.quarantine, 24 * 3600))
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,142 @@
+# imaging/thumbnails.py
+"""
+On-demand thumbnails of stored images, cached on disk.
+
+/media/thumb/<size>/<name> renders the image stored as <name> to fit a
+<size>x<size> square on first request and writes it to the same path under
+THUMBNAIL_CACHE_DIR, where nginx serves every later request without
+reaching Django. Only THUMBNAIL_SIZES are rendered.
+
+The cache is bounded by THUMBNAIL_CACHE_MAX_BYTES: once enough new bytes
+were written since the last sweep, the least recently used thumbnails are
+evicted down to THUMBNAIL_CACHE_LOW_WATER of the limit. Recency is the later
+of a file's access and modification times, since nginx hits only show up as
+access times.
+"""
+import os
+import tempfile
+from PIL import Image
+
+from django.conf import settings
+from django.core.cache import cache
+from utils.single_flight import single_flight
+from .processing import EXTENSIONS, REDUCING_GAP, encode, fitted_size, open_image
+
+WRITTEN_KEY = 'imaging:thumbnails:written'
+FORMATS = {extension: image_format for image_format, extension in EXTENSIONS.items()}
+FORMATS['.jpeg'] = 'JPEG'
+
+
+class ThumbnailError(ValueError):
+    pass
+
+
+def source_path(name):
+    """
+    Filesystem path of a stored image, refusing anything outside MEDIA_ROOT,
+    cached thumbnails themselves, and non-image extensions.
+    """
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(media_root, name))
+    cache_dir = os.path.realpath(settings.THUMBNAIL_CACHE_DIR)
+    if os.path.commonpath([media_root, path]) != media_root or os.path.commonpath([cache_dir, path]) == cache_dir:
+        raise ThumbnailError(f'Not a stored image: {name}')
+    if os.path.splitext(path)[1].lower() not in FORMATS:
+        raise ThumbnailError(f'Not a supported image type: {name}')
+    return path
+
+
+def cache_path(size, name):
+    return os.path.join(settings.THUMBNAIL_CACHE_DIR, str(size), os.path.normpath(name))
+
+
+def get_thumbnail(size, name):
+    """
+    Path of the cached thumbnail of `name` at `size`, rendering it if needed.
+    Raises ThumbnailError for sizes outside THUMBNAIL_SIZES or bad names,
+    and FileNotFoundError if the image doesn't exist.
+    """
+    if size not in settings.THUMBNAIL_SIZES:
+        raise ThumbnailError(f'Size {size} is not one of {settings.THUMBNAIL_SIZES}')
+    source = source_path(name)
+    target = cache_path(size, name)
+    if os.path.exists(target):
+        return target
+    if not os.path.exists(source):
+        raise FileNotFoundError(name)
+
+    with single_flight(f'imaging:thumbnail:{size}:{name}'):
+        # Rendered by another request while this one waited
+        if os.path.exists(target):
+            return target
+        written = render(source, target, size)
+
+    # Sweep once the headroom the last sweep left has been written
+    cache.add(WRITTEN_KEY, 0, None)
+    if cache.incr(WRITTEN_KEY, written) >= settings.THUMBNAIL_CACHE_MAX_BYTES * (1 - settings.THUMBNAIL_CACHE_LOW_WATER):
+        sweep()
+    return target
+
+
+def render(source, target, size):
+    """
+    Write the thumbnail of `source` to `target`; returns its size in bytes.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    spec = {'format': FORMATS[os.path.splitext(target)[1].lower()], 'quality': 80}
+    with open_image(source, settings.IMAGE_MAX_PIXELS) as img:
+        box = (size, size)
+        img.draft(None, fitted_size(img.size, box))
+        img = img.resize(fitted_size(img.size, box), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+        # Renamed into place, so nginx never serves a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.thumb-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                encode(img, spec, temp)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    return os.path.getsize(target)
+
+
+def sweep():
+    """
+    Evict least recently used thumbnails until the cache is below its low
+    water mark. Returns (files removed, bytes freed); only one process
+    sweeps at a time.
+    """
+    with single_flight('imaging:thumbnails:sweep', timeout=0) as acquired:
+        if not acquired:
+            return 0, 0
+        cache.set(WRITTEN_KEY, 0, None)
+
+        entries, total = [], 0
+        for directory, _, filenames in os.walk(settings.THUMBNAIL_CACHE_DIR):
+            for filename in filenames:
+                try:
+                    stat = os.stat(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    continue
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, os.path.join(directory, filename)))
+                total += stat.st_size
+        if total <= settings.THUMBNAIL_CACHE_MAX_BYTES:
+            return 0, 0
+
+        limit = settings.THUMBNAIL_CACHE_MAX_BYTES * settings.THUMBNAIL_CACHE_LOW_WATER
+        removed = freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= limit:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            removed += 1
+            freed += size
+        return removed, freed
+
+
+def thumbnail_url(name, size):
+    return f'{settings.MEDIA_URL}thumb/{size}/{name}'
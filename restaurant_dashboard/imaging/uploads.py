@@ -0,0 +1,108 @@
+# imaging/uploads.py
+"""
+Reading a batch of uploaded images: either one ZIP archive or several
+multipart files. Every image is checked from its header only, against
+IMAGE_MAX_PIXELS, before anything is stored.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, UnidentifiedImageError
+from .processing import open_image
+
+
+class BatchError(ValueError):
+    pass
+
+
+def is_zip(upload):
+    upload.seek(0)
+    result = zipfile.is_zipfile(upload)
+    upload.seek(0)
+    return result
+
+
+def zip_entries(archive):
+    entries = [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not os.path.basename(info.filename).startswith('.')
+        and not info.filename.startswith('__MACOSX/')
+    ]
+    if len(entries) > settings.BULK_IMAGE_UPLOAD_MAX_FILES:
+        raise BatchError(f'The archive has {len(entries)} files; the limit is {settings.BULK_IMAGE_UPLOAD_MAX_FILES}')
+    return entries
+
+
+def check_count(files):
+    if len(files) > settings.BULK_IMAGE_UPLOAD_MAX_FILES:
+        raise BatchError(f'{len(files)} files were uploaded; the limit is {settings.BULK_IMAGE_UPLOAD_MAX_FILES}')
+
+
+def open_zip(upload):
+    try:
+        return zipfile.ZipFile(upload)
+    except zipfile.BadZipFile as exc:
+        raise BatchError(f'Not a valid ZIP file: {exc}')
+
+
+def zip_members(upload):
+    """
+    Yield (filename, File) for each file in a ZIP upload, spooled to disk
+    one at a time; each File is closed once the next one is requested.
+    Directories, hidden files and macOS resource forks are skipped.
+    """
+    with open_zip(upload) as archive:
+        for info in zip_entries(archive):
+            filename = os.path.basename(info.filename)
+            if info.file_size > settings.BULK_IMAGE_UPLOAD_MAX_FILE_SIZE:
+                yield filename, None
+                continue
+            with archive.open(info) as source, tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spooled:
+                shutil.copyfileobj(source, spooled)
+                spooled.seek(0)
+                yield filename, File(spooled, name=filename)
+
+
+def batch_filenames(files):
+    """
+    The filenames batch_files() yields, in the same order, without reading
+    any file.
+    """
+    if len(files) == 1 and is_zip(files[0]):
+        with open_zip(files[0]) as archive:
+            return [os.path.basename(info.filename) for info in zip_entries(archive)]
+    check_count(files)
+    return [upload.name for upload in files]
+
+
+def batch_files(files):
+    """
+    Yield (filename, File or None) for every image in a batch: the members
+    of a single ZIP upload, or the uploaded files themselves. None stands
+    for a file over BULK_IMAGE_UPLOAD_MAX_FILE_SIZE.
+    """
+    if len(files) == 1 and is_zip(files[0]):
+        yield from zip_members(files[0])
+        return
+    check_count(files)
+    for upload in files:
+        yield upload.name, upload if upload.size <= settings.BULK_IMAGE_UPLOAD_MAX_FILE_SIZE else None
+
+
+def check_image(upload):
+    """
+    Raise ValueError (ImageTooLarge for too many pixels) unless `upload` is
+    a readable image within IMAGE_MAX_PIXELS. Reads the header only.
+    """
+    try:
+        with open_image(upload, settings.IMAGE_MAX_PIXELS):
+            pass
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValueError('Not a readable image')
+    finally:
+        upload.seek(0)
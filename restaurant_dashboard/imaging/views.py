@@ -0,0 +1,27 @@
+# imaging/views.py
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from .processing import ImageTooLarge
+from .storage import blob_storage
+from . import thumbnails
+
+
+@require_safe
+def thumbnail(request, size, name):
+    """
+    A cached thumbnail of a stored image (see imaging/thumbnails.py). Only
+    reached on a cache miss when nginx serves /media/thumb/.
+    """
+    try:
+        path = thumbnails.get_thumbnail(size, name)
+    except (thumbnails.ThumbnailError, FileNotFoundError, ImageTooLarge):
+        raise Http404('No such thumbnail')
+
+    response = FileResponse(open(path, 'rb'))
+    if blob_storage.is_blob(name):
+        # Blob names change with their content
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=24 * 60 * 60)
+    return response
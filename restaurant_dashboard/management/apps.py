@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'management'
\ No newline at end of file
+    name = 'management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -10,6 +10,8 @@ class CountrySerializer(serializers.ModelSerializer):
 class BranchSerializer(serializers.ModelSerializer):
     country_name = serializers.CharField(source='country.name', read_only=True)
     
+    select_related_fields = ('country',)
+    
     class Meta:
         model = Branch
         fields = ['id', 'name', 'country', 'country_name', 'address', 'phone', 
@@ -0,0 +1,12 @@
+# management/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from utils.conditional import touch
+from .models import Branch, Country
+
+
+@receiver(post_save, sender=Country)
+def touch_branches_on_country_change(sender, instance, created, **kwargs):
+    # Branch listings include the country name
+    if not created:
+        touch(Branch.objects.filter(country=instance))
@@ -4,8 +4,12 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Country, Branch
 from .serializers import CountrySerializer, BranchSerializer
 from users.permissions import IsLeadershipTeam, IsCountryLeadership
+from users.scoping import RoleScopedMixin, COUNTRY_SCOPE, BRANCH_SCOPE
 # Add these imports
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse
+from utils.eager_loading import EagerLoadingMixin
+from utils.conditional import ConditionalListMixin
+from utils.response_cache import ScopedResponseCacheMixin
 
 @extend_schema_view(
     list=extend_schema(
@@ -39,31 +43,12 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResp
         tags=["Management"]
     )
 )
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, viewsets.ModelViewSet):
+    queryset = Country.objects.all()
     serializer_class = CountrySerializer
-    
-    @extend_schema(
-        description="Returns countries based on user's role permissions",
-        tags=["Management"]
-    )
-    def get_queryset(self):
-        user = self.request.user
-        
-        # Leadership team can see all countries
-        if user.role and user.role.name == 'leadership':
-            return Country.objects.all()
-        
-        # Country leadership & admins can only see their country
-        if user.role and user.role.name in ['country_leadership', 'country_admin']:
-            if user.country:
-                return Country.objects.filter(id=user.country.id)
-        
-        # Branch managers can only see their branch's country
-        if user.role and user.role.name == 'branch_manager':
-            if user.branch and user.branch.country:
-                return Country.objects.filter(id=user.branch.country.id)
-        
-        return Country.objects.none()
+    scope = COUNTRY_SCOPE
+    response_cache_models = (Country, Branch)
+    ordering = ('name', 'id')
     
     @extend_schema(
         description="Determines permissions based on action and user role",
@@ -108,28 +93,9 @@ class CountryViewSet(viewsets.ModelViewSet):
         tags=["Management"]
     )
 )
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = Branch.objects.all()
     serializer_class = BranchSerializer
-    
-    @extend_schema(
-        description="Returns branches based on user's role permissions",
-        tags=["Management"]
-    )
-    def get_queryset(self):
-        user = self.request.user
-        
-        # Leadership team can see all branches
-        if user.role and user.role.name == 'leadership':
-            return Branch.objects.all()
-        
-        # Country leadership & admins can only see branches in their country
-        if user.role and user.role.name in ['country_leadership', 'country_admin']:
-            if user.country:
-                return Branch.objects.filter(country=user.country)
-        
-        # Branch managers can only see their branch
-        if user.role and user.role.name == 'branch_manager':
-            if user.branch:
-                return Branch.objects.filter(id=user.branch.id)
-        
-        return Branch.objects.none()
\ No newline at end of file
+    scope = BRANCH_SCOPE
+    response_cache_models = (Branch, Country)
+    ordering = ('-created_at', '-id')
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class MicrositesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'microsites'
\ No newline at end of file
+    name = 'microsites'
+
+    def ready(self):
+        from . import signals  # noqa: F401
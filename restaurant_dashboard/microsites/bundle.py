@@ -0,0 +1,210 @@
+# microsites/bundle.py
+"""
+Public microsite bundles: everything a microsite page renders, in one payload.
+
+Bundles are built once and kept in the shared cache under the microsite's
+`site_id`, so serving one costs a single cache read and no SQL. Signals call
+`invalidate()` when a row that appears in a bundle changes. That only bumps
+version counters once the transaction commits, and expires the static
+snapshots of the microsites involved (see snapshots.py): the bundle is
+rebuilt by the next read, or by `warm_microsite_bundles`, however many
+microsites a change touches.
+
+A stored bundle carries the versions it was built under: the generation,
+bumped by changes to every microsite (the site-wide SEO configuration), and
+the microsite's own version. It's served only while both are current.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from utils.eager_loading import eager_load
+from utils.single_flight import single_flight
+from .models import Microsite, MicrositeSection
+from . import snapshots
+
+CACHE_PREFIX = 'microsites:bundle:'
+GENERATION_KEY = f'{CACHE_PREFIX}generation'
+
+
+def cache_key(site_id):
+    return f'{CACHE_PREFIX}{site_id}'
+
+
+def version_key(site_id):
+    return f'{CACHE_PREFIX}version:{site_id}'
+
+
+def current_versions(site_id, cached=None):
+    """
+    (generation, site version) of `site_id`, from `cached` (the result of a
+    get_many) when given. New counters start from the clock so they never
+    repeat a value used before an eviction.
+    """
+    keys = [GENERATION_KEY, version_key(site_id)]
+    cached = {key: cached[key] for key in keys if key in cached} if cached else cache.get_many(keys)
+    for key in keys:
+        if key not in cached:
+            cache.add(key, int(time.time() * 1000), None)
+            cached[key] = cache.get(key)
+    return [cached[key] for key in keys]
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No counter yet: nothing can have been cached against it
+        pass
+
+
+def build_bundle(microsite):
+    """
+    Serialize the microsite, its active sections in display order, and the
+    active content linked to it.
+    """
+    from content.serializers import (
+        MenuItemSerializer, TestimonialSerializer, FoodDeliveryEmbedSerializer, CareerSerializer
+    )
+    from management.serializers import BranchSerializer
+    from optimization.models import BaseSEO, WhatsAppLink
+    from optimization.serializers import BaseSEOSerializer, WhatsAppLinkSerializer
+
+    def serialize(serializer_class, queryset):
+        return serializer_class(eager_load(queryset, serializer_class), many=True).data
+
+    branches = serialize(BranchSerializer, microsite.branches.all())
+    menu_items = serialize(
+        MenuItemSerializer, microsite.menu_items.filter(is_active=True).order_by('name', 'id')
+    )
+    testimonials = serialize(
+        TestimonialSerializer, microsite.testimonials.filter(is_active=True).order_by('-created_at', '-id')
+    )
+    whatsapp_links = serialize(
+        WhatsAppLinkSerializer,
+        WhatsAppLink.objects.filter(branch__microsites=microsite, is_active=True).order_by('id')
+    )
+    seo = BaseSEO.objects.first()
+
+    section_content = {
+        MicrositeSection.MENU: menu_items,
+        MicrositeSection.TESTIMONIALS: testimonials,
+        MicrositeSection.LOCATION: branches,
+        MicrositeSection.CONTACT: whatsapp_links,
+    }
+    sections = [
+        {
+            'section_type': section.section_type,
+            'section_type_display': section.get_section_type_display(),
+            'display_order': section.display_order,
+            'items': section_content.get(section.section_type, []),
+        }
+        for section in microsite.sections.filter(is_active=True)
+    ]
+
+    return {
+        'id': microsite.pk,
+        'name': microsite.name,
+        'site_id': microsite.site_id,
+        'updated_at': microsite.updated_at.isoformat(),
+        'sections': sections,
+        'branches': branches,
+        'menu_items': menu_items,
+        'testimonials': testimonials,
+        'food_delivery_embeds': serialize(
+            FoodDeliveryEmbedSerializer, microsite.food_delivery_embeds.filter(is_active=True).order_by('id')
+        ),
+        'careers': serialize(
+            CareerSerializer, microsite.careers.filter(is_active=True).order_by('id')
+        ),
+        'whatsapp_links': whatsapp_links,
+        'seo': BaseSEOSerializer(seo).data if seo else None,
+    }
+
+
+def refresh(microsite):
+    """
+    Rebuild and store the bundle for one microsite; inactive ones are dropped.
+    """
+    if not microsite.site_id:
+        return None
+    if not microsite.is_active:
+        cache.delete(cache_key(microsite.site_id))
+        return None
+    # Read before building: a change committed meanwhile bumps past them
+    versions = current_versions(microsite.site_id)
+    bundle = build_bundle(microsite)
+    cache.set(cache_key(microsite.site_id), {'versions': versions, 'bundle': bundle}, None)
+    return bundle
+
+
+def cached_bundle(site_id):
+    """
+    (found, bundle) for `site_id` from the cache, with one cache read; a
+    found None bundle is a recent miss.
+    """
+    keys = [cache_key(site_id), GENERATION_KEY, version_key(site_id)]
+    cached = cache.get_many(keys)
+    entry = cached.get(cache_key(site_id))
+    if entry is not None and entry['versions'] == current_versions(site_id, cached):
+        return True, entry['bundle']
+    return False, None
+
+
+def get_bundle(site_id):
+    """
+    Return the bundle for `site_id`, building it on a cache miss.
+    None if there is no active microsite with that site_id; that is cached
+    for MICROSITE_BUNDLE_MISS_TIMEOUT seconds, or until such a microsite is
+    saved.
+
+    Concurrent misses for the same site_id are coalesced: one process builds
+    the bundle while the others wait for it to appear in the cache.
+    """
+    found, bundle = cached_bundle(site_id)
+    if found:
+        return bundle
+
+    with single_flight(f'microsites:bundle:{site_id}') as acquired:
+        if acquired:
+            found, bundle = cached_bundle(site_id)
+            if found:
+                return bundle
+        versions = current_versions(site_id)
+        microsite = Microsite.objects.filter(site_id=site_id, is_active=True).first()
+        if microsite is None:
+            cache.set(
+                cache_key(site_id), {'versions': versions, 'bundle': None}, settings.MICROSITE_BUNDLE_MISS_TIMEOUT
+            )
+            return None
+        return refresh(microsite)
+
+
+def invalidate(microsite_ids=None, site_ids=()):
+    """
+    Invalidate the bundles of the given microsites (all of them when
+    `microsite_ids` is None) and of any extra `site_ids` once the current
+    transaction commits, or at once outside a transaction.
+    """
+    if microsite_ids is None:
+        transaction.on_commit(lambda: _bump(GENERATION_KEY))
+        return
+    site_ids = set(site_ids)
+    microsite_ids = list(microsite_ids)
+    if microsite_ids:
+        site_ids.update(
+            Microsite.objects.filter(pk__in=microsite_ids).exclude(site_id__isnull=True).exclude(
+                site_id='').values_list('site_id', flat=True)
+        )
+    if site_ids:
+        transaction.on_commit(lambda: _expire(site_ids))
+
+
+def _expire(site_ids):
+    for site_id in site_ids:
+        _bump(version_key(site_id))
+    if settings.MICROSITE_SNAPSHOTS_ON_SAVE:
+        live = set(Microsite.objects.filter(site_id__in=site_ids, is_active=True).values_list(
+            'site_id', flat=True))
+        snapshots.expire_changes(live, site_ids - live)
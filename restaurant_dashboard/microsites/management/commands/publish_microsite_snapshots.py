@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from microsites import bundle, snapshots
+from microsites.models import Microsite
+
+
+class Command(BaseCommand):
+    help = 'Publishes static JSON snapshots of microsite bundles for nginx to serve'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'site_ids',
+            nargs='*',
+            help='Only publish these site_ids (default: all microsites)',
+        )
+
+    def handle(self, *args, **options):
+        microsites = Microsite.objects.exclude(site_id__isnull=True).exclude(site_id='')
+        if options['site_ids']:
+            microsites = microsites.filter(site_id__in=options['site_ids'])
+
+        published = removed = 0
+        for microsite in microsites.iterator():
+            payload = bundle.refresh(microsite)
+            if payload is None:
+                snapshots.unpublish(microsite.site_id)
+                removed += 1
+            else:
+                version = snapshots.publish(microsite.site_id, payload)
+                published += 1
+                self.stdout.write(f'{microsite.site_id}: {version}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Microsite snapshots published: {published}, removed: {removed}'
+        ))
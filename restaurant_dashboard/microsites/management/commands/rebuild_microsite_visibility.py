@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from microsites import visibility
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds or checks the denormalised microsite visibility table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report differences with the source tables; exits non-zero if any are found',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            self.check_consistency()
+            return
+
+        self.stdout.write('Rebuilding microsite visibility...')
+        rows = visibility.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Microsite visibility rebuilt: {rows} rows'))
+
+    def check_consistency(self):
+        missing, stale = visibility.find_inconsistencies()
+        missing_count, stale_count = missing.count(), stale.count()
+
+        for label, rows in (('Missing', missing), ('Stale', stale)):
+            for microsite_id, branch_id, country_id in rows[:20]:
+                self.stdout.write(
+                    f'{label}: microsite={microsite_id} branch={branch_id} country={country_id}'
+                )
+
+        if missing_count or stale_count:
+            raise CommandError(
+                f'Microsite visibility is inconsistent: {missing_count} missing, {stale_count} stale rows. '
+                'Run without --check to rebuild.'
+            )
+        self.stdout.write(self.style.SUCCESS('Microsite visibility is consistent'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from microsites import bundle
+from microsites.models import Microsite
+
+
+class Command(BaseCommand):
+    help = 'Precomputes the cached public bundle of every active microsite'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'site_ids',
+            nargs='*',
+            help='Only rebuild these site_ids (default: all active microsites)',
+        )
+
+    def handle(self, *args, **options):
+        microsites = Microsite.objects.filter(is_active=True).exclude(site_id__isnull=True).exclude(site_id='')
+        if options['site_ids']:
+            microsites = microsites.filter(site_id__in=options['site_ids'])
+
+        built = 0
+        for microsite in microsites.iterator():
+            bundle.refresh(microsite)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f'Microsite bundles built: {built}'))
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_visibility(apps, schema_editor):
+    Microsite = apps.get_model('microsites', 'Microsite')
+    MicrositeVisibility = apps.get_model('microsites', 'MicrositeVisibility')
+    links = Microsite.branches.through.objects.values_list(
+        'microsite_id', 'branch_id', 'branch__country_id'
+    ).iterator(chunk_size=2000)
+    MicrositeVisibility.objects.bulk_create(
+        (MicrositeVisibility(microsite_id=m, branch_id=b, country_id=c) for m, b, c in links),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0001_initial'),
+        ('microsites', '0002_remove_microsite_has_language_switcher_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MicrositeVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='management.branch')),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='management.country')),
+                ('microsite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='microsites.microsite')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['country', 'microsite'], name='microsites__country_487c9b_idx'), models.Index(fields=['branch', 'microsite'], name='microsites__branch__e3efe3_idx')],
+                'unique_together': {('microsite', 'branch')},
+            },
+        ),
+        migrations.RunPython(populate_visibility, migrations.RunPython.noop),
+    ]
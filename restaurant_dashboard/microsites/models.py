@@ -1,6 +1,6 @@
 # microsites/models.py
 from django.db import models
-from management.models import Branch
+from management.models import Country, Branch
 
 class Microsite(models.Model):
     name = models.CharField(max_length=100)  # Only this is mandatory
@@ -40,4 +40,24 @@ class MicrositeSection(models.Model):
         unique_together = ['microsite', 'section_type']
     
     def __str__(self):
-        return f"{self.microsite.name} - {self.get_section_type_display()}"
\ No newline at end of file
+        return f"{self.microsite.name} - {self.get_section_type_display()}"
+
+class MicrositeVisibility(models.Model):
+    """
+    Denormalised microsite -> branch -> country links, so role scoping is a single
+    indexed lookup instead of two M2M hops. Kept current by the signals in
+    microsites/signals.py; rebuild with `manage.py rebuild_microsite_visibility`.
+    """
+    microsite = models.ForeignKey(Microsite, on_delete=models.CASCADE, related_name='visibility')
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='+')
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='+')
+    
+    class Meta:
+        unique_together = ['microsite', 'branch']
+        indexes = [
+            models.Index(fields=['country', 'microsite']),
+            models.Index(fields=['branch', 'microsite']),
+        ]
+    
+    def __str__(self):
+        return f"{self.microsite_id} - {self.branch_id} ({self.country_id})"
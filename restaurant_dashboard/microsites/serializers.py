@@ -15,6 +15,8 @@ class MicrositeSerializer(serializers.ModelSerializer):
     sections = MicrositeSectionSerializer(many=True, read_only=True)
     branches_data = BranchSerializer(source='branches', many=True, read_only=True)
     
+    prefetch_related_fields = ('sections', 'branches__country')
+    
     class Meta:
         model = Microsite
         fields = ['id', 'name', 'site_id', 'branches', 'branches_data', 'is_active',
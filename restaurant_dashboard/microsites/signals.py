@@ -0,0 +1,131 @@
+# microsites/signals.py
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from management.models import Branch, Country
+from utils.conditional import touch
+from .models import Microsite, MicrositeSection, MicrositeVisibility
+from . import bundle, visibility
+
+
+@receiver(m2m_changed, sender=Microsite.branches.through)
+def sync_visibility_on_branch_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # microsite.branches.add/remove/clear(...)
+        visibility.sync_microsites([instance.pk])
+    elif action == 'post_clear':
+        # branch.microsites.clear()
+        MicrositeVisibility.objects.filter(branch_id=instance.pk).delete()
+    else:
+        # branch.microsites.add/remove(...)
+        visibility.sync_microsites(pk_set)
+
+
+@receiver(post_save, sender=Branch)
+def sync_visibility_on_branch_country(sender, instance, created, **kwargs):
+    if not created:
+        visibility.sync_branch_country(instance)
+
+
+# Microsite listings embed their sections, branches and the branches' countries,
+# so changes to any of those touch the microsite's updated_at.
+
+@receiver(m2m_changed, sender=Microsite.branches.through)
+def touch_on_branch_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch(Microsite.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        touch(Microsite.objects.filter(branches=instance))
+    elif action in ('post_add', 'post_remove'):
+        touch(Microsite.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=MicrositeSection)
+@receiver(post_delete, sender=MicrositeSection)
+def touch_on_section_change(sender, instance, **kwargs):
+    touch(Microsite.objects.filter(pk=instance.microsite_id))
+
+
+@receiver(post_save, sender=Branch)
+def touch_on_branch_change(sender, instance, created, **kwargs):
+    if not created:
+        touch(Microsite.objects.filter(branches=instance))
+
+
+@receiver(pre_delete, sender=Branch)
+def touch_on_branch_delete(sender, instance, **kwargs):
+    touch(Microsite.objects.filter(branches=instance))
+
+
+@receiver(post_save, sender=Country)
+def touch_on_country_change(sender, instance, created, **kwargs):
+    if not created:
+        touch(Microsite.objects.filter(branches__country=instance))
+
+
+# Public bundles embed the microsite, its sections and branches (with country
+# names), plus branch names shown on testimonials and careers.
+
+@receiver(pre_save, sender=Microsite)
+def invalidate_bundle_on_site_id_change(sender, instance, **kwargs):
+    if instance.pk:
+        old_site_id = Microsite.objects.filter(pk=instance.pk).values_list('site_id', flat=True).first()
+        if old_site_id and old_site_id != instance.site_id:
+            bundle.invalidate([], site_ids=[old_site_id])
+
+
+@receiver(post_save, sender=Microsite)
+def invalidate_bundle_on_microsite_save(sender, instance, **kwargs):
+    bundle.invalidate([instance.pk])
+
+
+@receiver(post_delete, sender=Microsite)
+def invalidate_bundle_on_microsite_delete(sender, instance, **kwargs):
+    if instance.site_id:
+        bundle.invalidate([], site_ids=[instance.site_id])
+
+
+@receiver(post_save, sender=MicrositeSection)
+@receiver(post_delete, sender=MicrositeSection)
+def invalidate_bundle_on_section_change(sender, instance, **kwargs):
+    bundle.invalidate([instance.microsite_id])
+
+
+@receiver(m2m_changed, sender=Microsite.branches.through)
+def invalidate_bundle_on_branch_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bundle.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        bundle.invalidate(Microsite.objects.filter(branches=instance).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        bundle.invalidate(pk_set)
+
+
+def microsites_showing_branch(branch):
+    return Microsite.objects.filter(
+        Q(branches=branch) | Q(testimonials__branch=branch) | Q(careers__branch=branch)
+    ).values_list('pk', flat=True).distinct()
+
+
+@receiver(post_save, sender=Branch)
+def invalidate_bundle_on_branch_change(sender, instance, created, **kwargs):
+    if not created:
+        bundle.invalidate(microsites_showing_branch(instance))
+
+
+@receiver(pre_delete, sender=Branch)
+def invalidate_bundle_on_branch_delete(sender, instance, **kwargs):
+    bundle.invalidate(microsites_showing_branch(instance))
+
+
+@receiver(post_save, sender=Country)
+def invalidate_bundle_on_country_change(sender, instance, created, **kwargs):
+    if not created:
+        bundle.invalidate(
+            Microsite.objects.filter(branches__country=instance).values_list('pk', flat=True).distinct()
+        )
@@ -0,0 +1,161 @@
+# microsites/snapshots.py
+"""
+Static JSON snapshots of public microsite bundles, served by nginx from
+MICROSITE_SNAPSHOT_ROOT without going through gunicorn.
+
+Layout, per microsite:
+
+    <site_id>/latest.json[.gz]       current payload, revalidated by clients
+    <site_id>/v/<version>.json[.gz]  immutable copy, named by content hash
+
+Every file is written to a temporary name in the same directory and moved
+into place with os.replace(), so readers only ever see complete files.
+
+When a microsite changes, its latest.json is expired rather than rewritten;
+nginx then passes the next request to Django (`views.snapshot`), which
+publishes it again from the bundle.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+LATEST_NAME = 'latest.json'
+VERSIONS_DIR = 'v'
+
+
+def snapshot_root():
+    return settings.MICROSITE_SNAPSHOT_ROOT
+
+
+def site_dir(site_id):
+    return os.path.join(snapshot_root(), site_id)
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _write_pair(path, data, compressed):
+    # The .gz goes first, so nginx's gzip_static never pairs a new plain file with an old .gz
+    _atomic_write(f'{path}.gz', compressed)
+    _atomic_write(path, data)
+
+
+def render(payload):
+    """
+    The version of `payload` and the snapshot document embedding it.
+    """
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    version = hashlib.sha256(body).hexdigest()[:16]
+    document = json.dumps(
+        {'version': version, **payload}, cls=DjangoJSONEncoder, separators=(',', ':')
+    ).encode()
+    return version, document
+
+
+def publish(site_id, payload):
+    """
+    Write `payload` as the current snapshot of `site_id`; returns its version.
+    """
+    version, document = render(payload)
+    # mtime=0 keeps the gzip bytes stable for identical payloads
+    compressed = gzip.compress(document, compresslevel=9, mtime=0)
+
+    directory = site_dir(site_id)
+    versioned = os.path.join(directory, VERSIONS_DIR, f'{version}.json')
+    if os.path.exists(versioned):
+        # Same content as an earlier version: mark it recent so prune() keeps it
+        os.utime(versioned)
+    else:
+        _write_pair(versioned, document, compressed)
+    _write_pair(os.path.join(directory, LATEST_NAME), document, compressed)
+    prune(site_id)
+    return version
+
+
+def unpublish(site_id):
+    """
+    Remove every snapshot of `site_id`, e.g. when the microsite is deactivated.
+    """
+    directory = site_dir(site_id)
+    if not os.path.isdir(directory):
+        return
+    # Move the directory out of the served path in one step, then delete it
+    trash = tempfile.mkdtemp(dir=snapshot_root(), prefix='.trash-')
+    os.replace(directory, os.path.join(trash, 'site'))
+    shutil.rmtree(trash, ignore_errors=True)
+
+
+def prune(site_id, keep=None):
+    """
+    Delete all but the `keep` most recent versions of `site_id`.
+    """
+    keep = settings.MICROSITE_SNAPSHOT_KEEP_VERSIONS if keep is None else keep
+    versions_dir = os.path.join(site_dir(site_id), VERSIONS_DIR)
+    if not os.path.isdir(versions_dir):
+        return 0
+
+    with os.scandir(versions_dir) as entries:
+        versions = sorted(
+            (entry for entry in entries if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+    for entry in versions[keep:]:
+        for path in (entry.path, f'{entry.path}.gz'):
+            if os.path.exists(path):
+                os.unlink(path)
+    return max(len(versions) - keep, 0)
+
+
+def expire(site_id):
+    """
+    Remove the current snapshot of `site_id`, so the next request for it is
+    passed to Django. Versioned copies stay until pruned.
+    """
+    path = os.path.join(site_dir(site_id), LATEST_NAME)
+    # The plain file goes first: nginx's try_files checks it, not the .gz
+    for name in (path, f'{path}.gz'):
+        try:
+            os.unlink(name)
+        except FileNotFoundError:
+            pass
+
+
+def expire_changes(changed_site_ids, removed_site_ids):
+    """
+    Called after microsites change: `changed_site_ids` are republished on
+    their next request, `removed_site_ids` (gone or inactive) are removed.
+    Failures are logged rather than raised, as the data is already committed.
+    """
+    if not settings.MICROSITE_SNAPSHOTS_ON_SAVE:
+        return
+    try:
+        for site_id in changed_site_ids:
+            expire(site_id)
+        for site_id in removed_site_ids:
+            unpublish(site_id)
+    except OSError:
+        logger.exception('Expiring microsite snapshots failed; run publish_microsite_snapshots')
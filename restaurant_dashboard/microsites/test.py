@@ -0,0 +1,215 @@
+# microsites/test.py
+import gzip
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from content.models import MenuItem
+from management.models import Country, Branch
+from optimization.models import BaseSEO
+from .models import Microsite, MicrositeSection, MicrositeVisibility
+from . import snapshots, visibility
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class MicrositeVisibilityTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(name='Country A', code='AAA')
+        self.other_country = Country.objects.create(name='Country B', code='BBB')
+        self.branch = Branch.objects.create(name='Branch A', country=self.country, address='1 A St')
+        self.microsite = Microsite.objects.create(name='Site A')
+
+    def rows(self):
+        return set(MicrositeVisibility.objects.values_list('microsite_id', 'branch_id', 'country_id'))
+
+    def assertConsistent(self):
+        missing, stale = visibility.find_inconsistencies()
+        self.assertEqual(list(missing), [])
+        self.assertEqual(list(stale), [])
+
+    def test_branch_links_are_tracked(self):
+        self.microsite.branches.add(self.branch)
+        self.assertEqual(self.rows(), {(self.microsite.id, self.branch.id, self.country.id)})
+
+        self.microsite.branches.remove(self.branch)
+        self.assertEqual(self.rows(), set())
+
+        self.branch.microsites.add(self.microsite)
+        self.assertEqual(self.rows(), {(self.microsite.id, self.branch.id, self.country.id)})
+
+        self.branch.microsites.clear()
+        self.assertEqual(self.rows(), set())
+
+    def test_branch_country_change_is_tracked(self):
+        self.microsite.branches.add(self.branch)
+        self.branch.country = self.other_country
+        self.branch.save()
+        self.assertEqual(self.rows(), {(self.microsite.id, self.branch.id, self.other_country.id)})
+        self.assertConsistent()
+
+    def test_rebuild_repairs_bulk_changes(self):
+        Microsite.branches.through.objects.bulk_create([
+            Microsite.branches.through(microsite_id=self.microsite.id, branch_id=self.branch.id)
+        ])
+        missing, stale = visibility.find_inconsistencies()
+        self.assertEqual(missing.count(), 1)
+
+        self.assertEqual(visibility.rebuild(), 1)
+        self.assertConsistent()
+
+
+@override_settings(CACHES=LOCMEM_CACHE, MICROSITE_SNAPSHOTS_ON_SAVE=False)
+class MicrositeBundleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Bundles are invalidated on commit, which TestCase never reaches on its own
+        with self.captureOnCommitCallbacks(execute=True):
+            country = Country.objects.create(name='Country A', code='AAA')
+            self.branch = Branch.objects.create(name='Branch A', country=country, address='1 A St')
+            self.microsite = Microsite.objects.create(name='Site A', site_id='site-a')
+            self.microsite.branches.add(self.branch)
+            MicrositeSection.objects.create(
+                microsite=self.microsite, section_type=MicrositeSection.LOCATION, display_order=2
+            )
+            MicrositeSection.objects.create(
+                microsite=self.microsite, section_type=MicrositeSection.MENU, display_order=1
+            )
+        self.client = APIClient()
+
+    def test_cached_bundle_costs_no_queries(self):
+        response = self.client.get('/api/microsites/public/site-a/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['section_type'] for s in response.data['sections']], ['menu', 'location'])
+        self.assertEqual(response.data['sections'][1]['items'][0]['name'], 'Branch A')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/microsites/public/site-a/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_related_changes_rebuild_bundle(self):
+        self.client.get('/api/microsites/public/site-a/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(name='Dish')
+            item.microsites.add(self.microsite)
+            self.branch.name = 'Branch B'
+            self.branch.save()
+
+        # Rebuilt by the first read, not by the save
+        response = self.client.get('/api/microsites/public/site-a/')
+        self.assertEqual([i['name'] for i in response.data['menu_items']], ['Dish'])
+        self.assertEqual(response.data['sections'][1]['items'][0]['name'], 'Branch B')
+        with self.assertNumQueries(0):
+            self.client.get('/api/microsites/public/site-a/')
+
+    def test_seo_change_invalidates_every_bundle_without_rebuilding(self):
+        self.client.get('/api/microsites/public/site-a/')
+
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(1):
+            BaseSEO.objects.create(site_name='Restaurants', meta_title='Restaurants', meta_description='Food')
+
+        response = self.client.get('/api/microsites/public/site-a/')
+        self.assertEqual(response.data['seo']['site_name'], 'Restaurants')
+
+    def test_unknown_site_is_cached_until_created(self):
+        self.assertEqual(self.client.get('/api/microsites/public/site-b/').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/microsites/public/site-b/').status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Microsite.objects.create(name='Site B', site_id='site-b')
+        self.assertEqual(self.client.get('/api/microsites/public/site-b/').status_code, 200)
+
+    def test_unknown_or_inactive_site_is_not_found(self):
+        self.assertEqual(self.client.get('/api/microsites/public/nope/').status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.microsite.is_active = False
+            self.microsite.save()
+        self.assertEqual(self.client.get('/api/microsites/public/site-a/').status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, MICROSITE_SNAPSHOTS_ON_SAVE=True)
+class MicrositeBundleAutocommitTest(TransactionTestCase):
+    """
+    Writes outside atomic(), as DRF views make them: on_commit callbacks
+    run as soon as they are registered.
+    """
+    def setUp(self):
+        cache.clear()
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MICROSITE_SNAPSHOT_ROOT=self.root))
+        self.microsite = Microsite.objects.create(name='Site A', site_id='site-a')
+        self.item = MenuItem.objects.create(name='Dish')
+        self.item.microsites.add(self.microsite)
+        self.client = APIClient()
+
+    def menu_item_names(self):
+        return [item['name'] for item in self.client.get('/api/microsites/public/site-a/').data['menu_items']]
+
+    def test_save_invalidates_bundle_and_snapshot(self):
+        self.client.get('/media/microsites/site-a/latest.json')
+        self.assertEqual(self.menu_item_names(), ['Dish'])
+
+        self.item.name = 'Other dish'
+        self.item.save()
+        self.assertEqual(self.menu_item_names(), ['Other dish'])
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'site-a', snapshots.LATEST_NAME)))
+
+    def test_seo_change_invalidates_bundle(self):
+        self.assertIsNone(self.client.get('/api/microsites/public/site-a/').data['seo'])
+
+        BaseSEO.objects.create(site_name='Restaurants', meta_title='Restaurants', meta_description='Food')
+        self.assertEqual(self.client.get('/api/microsites/public/site-a/').data['seo']['site_name'], 'Restaurants')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, MICROSITE_SNAPSHOTS_ON_SAVE=True)
+class MicrositeSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MICROSITE_SNAPSHOT_ROOT=self.root))
+
+    def read_latest(self, site_id):
+        path = os.path.join(self.root, site_id, snapshots.LATEST_NAME)
+        with open(path, 'rb') as plain, open(f'{path}.gz', 'rb') as compressed:
+            document = json.loads(plain.read())
+            self.assertEqual(json.loads(gzip.decompress(compressed.read())), document)
+        return document
+
+    def latest_exists(self, site_id):
+        return os.path.exists(os.path.join(self.root, site_id, snapshots.LATEST_NAME))
+
+    def test_expired_snapshot_is_published_on_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            microsite = Microsite.objects.create(name='Site A', site_id='site-a')
+        self.assertFalse(self.latest_exists('site-a'))
+
+        response = self.client.get('/media/microsites/site-a/latest.json')
+        first = self.read_latest('site-a')
+        self.assertEqual(json.loads(response.content), first)
+        self.assertEqual(first['name'], 'Site A')
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'site-a', 'v', f"{first['version']}.json.gz")))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItem.objects.create(name='Dish').microsites.add(microsite)
+        self.assertFalse(self.latest_exists('site-a'))
+        self.client.get('/media/microsites/site-a/latest.json')
+        second = self.read_latest('site-a')
+        self.assertNotEqual(second['version'], first['version'])
+        self.assertEqual([item['name'] for item in second['menu_items']], ['Dish'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            microsite.is_active = False
+            microsite.save()
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'site-a')))
+        self.assertEqual(self.client.get('/media/microsites/site-a/latest.json').status_code, 404)
+
+    def test_prune_keeps_recent_versions(self):
+        for i in range(4):
+            snapshots.publish('site-a', {'name': f'Site {i}'})
+        self.assertEqual(snapshots.prune('site-a', keep=2), 2)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'site-a', 'v'))), 4)  # .json + .json.gz
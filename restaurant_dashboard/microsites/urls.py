@@ -1,11 +1,12 @@
 # microsites/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MicrositeViewSet
+from .views import MicrositeViewSet, MicrositeBundleView
 
 router = DefaultRouter()
 router.register(r'', MicrositeViewSet, basename='microsite')
 
 urlpatterns = [
+    path('public/<slug:site_id>/', MicrositeBundleView.as_view(), name='microsite_bundle'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,14 +1,30 @@
 # microsites/views.py
+import logging
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 
 from .models import Microsite, MicrositeSection
+from management.models import Branch, Country
+from . import bundle, snapshots
 from .serializers import MicrositeSerializer, MicrositeSectionSerializer
 from users.permissions import IsLeadershipTeam, IsCountryLeadership, IsCountryAdmin, IsBranchManager
+from users.scoping import RoleScopedMixin, MICROSITE_SCOPE
+from users.access import get_access_context
+from users.models import UserRole
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiResponse
+from utils.eager_loading import EagerLoadingMixin
+from utils.conditional import ConditionalListMixin
+from utils.response_cache import ScopedResponseCacheMixin
+
+logger = logging.getLogger(__name__)
 
 @extend_schema_view(
     list=extend_schema(
@@ -42,31 +58,12 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
         tags=["Microsites"]
     )
 )
-class MicrositeViewSet(viewsets.ModelViewSet):
+class MicrositeViewSet(ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = Microsite.objects.all()
     serializer_class = MicrositeSerializer
-    
-    @extend_schema(
-        description="Returns microsites based on user's role permissions",
-        tags=["Microsites"]
-    )
-    def get_queryset(self):
-        user = self.request.user
-        
-        # Leadership team can see all microsites
-        if user.role and user.role.name == 'leadership':
-            return Microsite.objects.all()
-        
-        # Country leadership & admins can only see microsites linked to branches in their country
-        if user.role and user.role.name in ['country_leadership', 'country_admin']:
-            if user.country:
-                return Microsite.objects.filter(branches__country=user.country).distinct()
-        
-        # Branch managers can only see microsites linked to their branch
-        if user.role and user.role.name == 'branch_manager':
-            if user.branch:
-                return Microsite.objects.filter(branches=user.branch)
-        
-        return Microsite.objects.none()
+    scope = MICROSITE_SCOPE
+    response_cache_models = (Microsite, MicrositeSection, Branch, Country)
+    ordering = ('-created_at', '-id')
     
     @extend_schema(
         description="Determines permissions based on action and user role",
@@ -76,9 +73,10 @@ class MicrositeViewSet(viewsets.ModelViewSet):
         if self.action in ['list', 'retrieve']:
             permission_classes = [IsAuthenticated]
         elif self.action in ['create', 'update', 'partial_update', 'destroy']:
-            if self.request.user.role and self.request.user.role.name == 'leadership':
+            access = get_access_context(self.request)
+            if access.role == UserRole.LEADERSHIP:
                 permission_classes = [IsLeadershipTeam]
-            elif self.request.user.role and self.request.user.role.name == 'country_leadership':
+            elif access.role == UserRole.COUNTRY_LEADERSHIP:
                 permission_classes = [IsCountryLeadership]
             else:
                 permission_classes = [IsCountryAdmin]
@@ -119,4 +117,54 @@ class MicrositeViewSet(viewsets.ModelViewSet):
             
             sections = microsite.sections.all()
             serializer = MicrositeSectionSerializer(sections, many=True)
-            return Response(serializer.data)
\ No newline at end of file
+            return Response(serializer.data)
+
+
+class MicrositeBundleView(APIView):
+    """
+    Public, unauthenticated page payload for one microsite, served from cache.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Get public microsite bundle",
+        description="Returns everything needed to render a microsite page: the microsite, its active sections "
+                    "in display order with their content, branches, menu items, testimonials, food delivery "
+                    "embeds, careers, WhatsApp links and SEO configuration. Served from a precomputed cache.",
+        parameters=[
+            OpenApiParameter(name="site_id", type=str, location=OpenApiParameter.PATH,
+                             description="Microsite site_id (slug)")
+        ],
+        responses={
+            200: OpenApiResponse(description="Microsite bundle"),
+            404: OpenApiResponse(description="No active microsite with this site_id")
+        },
+        tags=["Microsites"]
+    )
+    def get(self, request, site_id):
+        payload = bundle.get_bundle(site_id)
+        if payload is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(payload)
+
+
+@require_safe
+def snapshot(request, site_id):
+    """
+    The current snapshot of a microsite (see microsites/snapshots.py). Only
+    reached when nginx finds no latest.json: it's published again here.
+    """
+    payload = bundle.get_bundle(site_id)
+    if payload is None:
+        raise Http404('No such microsite')
+
+    if settings.MICROSITE_SNAPSHOTS_ON_SAVE:
+        try:
+            snapshots.publish(site_id, payload)
+        except OSError:
+            logger.exception('Publishing the snapshot of %s failed', site_id)
+    _, document = snapshots.render(payload)
+    response = HttpResponse(document, content_type='application/json')
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,69 @@
+# microsites/visibility.py
+from django.db import transaction
+from .models import Microsite, MicrositeVisibility
+
+MicrositeBranch = Microsite.branches.through
+
+
+def _expected_rows(microsite_ids=None):
+    """
+    (microsite_id, branch_id, country_id) tuples derived from the source tables.
+    """
+    links = MicrositeBranch.objects.all()
+    if microsite_ids is not None:
+        links = links.filter(microsite_id__in=microsite_ids)
+    return links.values_list('microsite_id', 'branch_id', 'branch__country_id')
+
+
+def sync_microsites(microsite_ids):
+    """
+    Recompute the visibility rows of the given microsites from their branch links.
+    """
+    microsite_ids = list(microsite_ids)
+    if not microsite_ids:
+        return
+    with transaction.atomic():
+        MicrositeVisibility.objects.filter(microsite_id__in=microsite_ids).delete()
+        MicrositeVisibility.objects.bulk_create([
+            MicrositeVisibility(microsite_id=m, branch_id=b, country_id=c)
+            for m, b, c in _expected_rows(microsite_ids)
+        ])
+
+
+def sync_branch_country(branch):
+    """
+    Move the visibility rows of a branch to its current country.
+    """
+    MicrositeVisibility.objects.filter(branch_id=branch.pk).exclude(
+        country_id=branch.country_id
+    ).update(country_id=branch.country_id)
+
+
+def rebuild(batch_size=2000):
+    """
+    Rebuild the whole table from the source tables. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        MicrositeVisibility.objects.all().delete()
+        rows = 0
+        batch = []
+        for m, b, c in _expected_rows().iterator(chunk_size=batch_size):
+            batch.append(MicrositeVisibility(microsite_id=m, branch_id=b, country_id=c))
+            if len(batch) >= batch_size:
+                MicrositeVisibility.objects.bulk_create(batch)
+                rows += len(batch)
+                batch = []
+        MicrositeVisibility.objects.bulk_create(batch)
+        rows += len(batch)
+    return rows
+
+
+def find_inconsistencies():
+    """
+    Compare the table with the source tables in the database (SQL EXCEPT).
+    Returns (missing, stale) querysets of (microsite_id, branch_id, country_id):
+    rows that should exist but don't, and rows that shouldn't exist.
+    """
+    expected = _expected_rows()
+    actual = MicrositeVisibility.objects.values_list('microsite_id', 'branch_id', 'country_id')
+    return expected.difference(actual), actual.difference(expected)
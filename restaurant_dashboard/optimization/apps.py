@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class OptimizationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'optimization'
\ No newline at end of file
+    name = 'optimization'
+
+    def ready(self):
+        from . import signals  # noqa: F401
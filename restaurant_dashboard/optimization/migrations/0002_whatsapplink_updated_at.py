@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='whatsapplink',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
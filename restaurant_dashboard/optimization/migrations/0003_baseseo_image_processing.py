@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimization', '0002_whatsapplink_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baseseo',
+            name='favicon_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='baseseo',
+            name='favicon_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='baseseo',
+            name='og_image_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='baseseo',
+            name='og_image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
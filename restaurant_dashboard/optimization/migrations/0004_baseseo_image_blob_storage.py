@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import imaging.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimization', '0003_baseseo_image_processing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='baseseo',
+            name='favicon',
+            field=models.ImageField(blank=True, null=True, storage=imaging.storage.get_blob_storage, upload_to='favicon/'),
+        ),
+        migrations.AlterField(
+            model_name='baseseo',
+            name='og_image',
+            field=models.ImageField(blank=True, null=True, storage=imaging.storage.get_blob_storage, upload_to='og_images/'),
+        ),
+    ]
@@ -2,6 +2,9 @@
 from django.db import models
 from microsites.models import Microsite
 from management.models import Branch
+from imaging import jobs as image_jobs
+from imaging.models import ImageStatus
+from imaging.storage import get_blob_storage
 
 class WhatsAppLink(models.Model):
     name = models.CharField(max_length=100)
@@ -9,6 +12,7 @@ class WhatsAppLink(models.Model):
     custom_message = models.TextField(blank=True, null=True)
     branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='whatsapp_links', null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
@@ -27,13 +31,24 @@ class BaseSEO(models.Model):
     site_name = models.CharField(max_length=100)
     meta_title = models.CharField(max_length=60)
     meta_description = models.TextField(max_length=160)
-    favicon = models.ImageField(upload_to='favicon/', blank=True, null=True)
-    og_image = models.ImageField(upload_to='og_images/', blank=True, null=True)
+    favicon = models.ImageField(upload_to='favicon/', storage=get_blob_storage, blank=True, null=True)
+    og_image = models.ImageField(upload_to='og_images/', storage=get_blob_storage, blank=True, null=True)
+    # Resized versions are rendered in the background (see imaging/jobs.py)
+    favicon_status = models.CharField(max_length=10, choices=ImageStatus.CHOICES, default=ImageStatus.NONE, blank=True)
+    favicon_variants = models.JSONField(default=dict, blank=True)
+    og_image_status = models.CharField(max_length=10, choices=ImageStatus.CHOICES, default=ImageStatus.NONE, blank=True)
+    og_image_variants = models.JSONField(default=dict, blank=True)
     google_analytics_id = models.CharField(max_length=50, blank=True, null=True)
     
     def __str__(self):
         return self.site_name
     
+    def save(self, *args, **kwargs):
+        new_uploads = [field for field in ('favicon', 'og_image') if image_jobs.prepare_upload(self, field)]
+        super().save(*args, **kwargs)
+        for field in new_uploads:
+            image_jobs.enqueue(self, field)
+    
     class Meta:
         verbose_name = "Base SEO Configuration"
         verbose_name_plural = "Base SEO Configuration"
\ No newline at end of file
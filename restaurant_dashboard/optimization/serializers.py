@@ -1,5 +1,6 @@
 # optimization/serializers.py
 from rest_framework import serializers
+from imaging.serializers import ProcessedImageMixin
 from .models import WhatsAppLink, BaseSEO
 
 class WhatsAppLinkSerializer(serializers.ModelSerializer):
@@ -12,8 +13,11 @@ class WhatsAppLinkSerializer(serializers.ModelSerializer):
     def get_link(self, obj):
         return obj.get_link()
 
-class BaseSEOSerializer(serializers.ModelSerializer):
+class BaseSEOSerializer(ProcessedImageMixin, serializers.ModelSerializer):
+    processed_image_fields = ('favicon', 'og_image')
+    
     class Meta:
         model = BaseSEO
         fields = ['id', 'site_name', 'meta_title', 'meta_description', 
-                  'favicon', 'og_image', 'google_analytics_id']
\ No newline at end of file
+                  'favicon', 'favicon_status', 'og_image', 'og_image_status', 'google_analytics_id']
+        read_only_fields = ['favicon_status', 'og_image_status']
\ No newline at end of file
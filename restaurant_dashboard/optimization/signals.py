@@ -0,0 +1,34 @@
+# optimization/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from microsites import bundle
+from microsites.models import Microsite
+from .models import BaseSEO, WhatsAppLink
+
+
+def invalidate_bundles_for_branch(branch_id):
+    if branch_id:
+        bundle.invalidate(Microsite.objects.filter(branches=branch_id).values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=WhatsAppLink)
+def invalidate_bundles_on_whatsapp_link_move(sender, instance, **kwargs):
+    # The microsites of the branch the link is moving away from
+    if instance.pk:
+        old_branch_id = WhatsAppLink.objects.filter(pk=instance.pk).values_list('branch_id', flat=True).first()
+        if old_branch_id != instance.branch_id:
+            invalidate_bundles_for_branch(old_branch_id)
+
+
+@receiver(post_save, sender=WhatsAppLink)
+@receiver(post_delete, sender=WhatsAppLink)
+def invalidate_bundles_on_whatsapp_link_change(sender, instance, **kwargs):
+    invalidate_bundles_for_branch(instance.branch_id)
+
+
+@receiver(post_save, sender=BaseSEO)
+@receiver(post_delete, sender=BaseSEO)
+def invalidate_bundles_on_seo_change(sender, instance, **kwargs):
+    # Every bundle embeds the site-wide SEO configuration; this only bumps
+    # their generation, static snapshots wait for publish_microsite_snapshots
+    bundle.invalidate()
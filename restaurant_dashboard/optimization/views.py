@@ -3,9 +3,13 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from .models import WhatsAppLink, BaseSEO
+from management.models import Branch
 from .serializers import WhatsAppLinkSerializer, BaseSEOSerializer
 from users.models import User  # Import from users app instead
 from users.permissions import IsLeadershipTeam, IsCountryLeadership, IsCountryAdmin
+from users.scoping import RoleScopedMixin, WHATSAPP_LINK_SCOPE
+from utils.conditional import ConditionalListMixin
+from utils.response_cache import ScopedResponseCacheMixin
 # Add these imports
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiResponse
 
@@ -41,36 +45,13 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
         tags=["Optimization"]
     )
 )
-class WhatsAppLinkViewSet(viewsets.ModelViewSet):
+class WhatsAppLinkViewSet(ScopedResponseCacheMixin, ConditionalListMixin, RoleScopedMixin, viewsets.ModelViewSet):
+    queryset = WhatsAppLink.objects.all()
     serializer_class = WhatsAppLinkSerializer
+    scope = WHATSAPP_LINK_SCOPE
+    response_cache_models = (WhatsAppLink, Branch)
+    ordering = ('-id',)
     
-    @extend_schema(
-        description="Returns WhatsApp links based on user's role permissions",
-        tags=["Optimization"]
-    )
-    def get_queryset(self):
-        user = self.request.user
-        
-        # Leadership team can see all WhatsApp links
-        if user.role and user.role.name == 'leadership':
-            return WhatsAppLink.objects.all()
-        
-        # Country leadership & admins can only see WhatsApp links for branches in their country
-        if user.role and user.role.name in ['country_leadership', 'country_admin']:
-            if user.country:
-                return WhatsAppLink.objects.filter(
-                    Q(branch__country=user.country) | Q(branch__isnull=True)
-                )
-        
-        # Branch managers can only see WhatsApp links for their branch
-        if user.role and user.role.name == 'branch_manager':
-            if user.branch:
-                return WhatsAppLink.objects.filter(
-                    Q(branch=user.branch) | Q(branch__isnull=True)
-                )
-        
-        return WhatsAppLink.objects.none()
-
 @extend_schema_view(
     list=extend_schema(
         summary="List SEO configurations",
@@ -105,6 +86,7 @@ class WhatsAppLinkViewSet(viewsets.ModelViewSet):
 )
 class BaseSEOViewSet(viewsets.ModelViewSet):
     serializer_class = BaseSEOSerializer
+    ordering = ('-id',)
     queryset = BaseSEO.objects.all()
     
     @extend_schema(
@@ -116,4 +98,4 @@ class BaseSEOViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsLeadershipTeam]
-        return [permission() for permission in permission_classes]
\ No newline at end of file
+        return [permission() for permission in permission_classes]
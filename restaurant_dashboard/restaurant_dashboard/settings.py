@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'microsites.apps.MicrositesConfig',
     'content.apps.ContentConfig',
     'optimization.apps.OptimizationConfig',
+    'imaging.apps.ImagingConfig',
     
     'analytics.apps.AnalyticsConfig',
     'api.apps.ApiConfig',
@@ -124,12 +125,28 @@ AUTH_USER_MODEL = 'users.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'utils.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Cache shared by the web and image-worker containers: signals in either
+# one bump the versions the other reads. Redis runs with volatile-lru, so
+# when full it evicts least recently used entries that have a timeout
+# (responses, claims versions, misses) and never the ones stored without
+# one: version counters, response cache statistics, microsite bundles (one
+# per microsite) and the thumbnail byte counter. Those must fit in its
+# maxmemory.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://redis:6379/1',
+    }
 }
 
 # CORS settings
@@ -148,6 +165,79 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# Content-addressed images under MEDIA_ROOT, served as immutable (imaging/storage.py)
+MEDIA_BLOB_DIR = 'blobs'
+# Unreferenced blobs written or reused more recently than this (seconds) are
+# not deleted when released, since a save may be about to reference them;
+# `manage.py collect_orphaned_media` removes them later
+MEDIA_BLOB_REUSE_GRACE = 15 * 60
+# Where `manage.py collect_orphaned_media` moves unreferenced media files;
+# outside MEDIA_ROOT so nginx doesn't serve them
+MEDIA_QUARANTINE_DIR = '/var/tmp/restaurant_dashboard_media_quarantine'
+
+# On-demand thumbnails at /media/thumb/<size>/<name> (imaging/thumbnails.py),
+# cached where nginx serves them; least recently used ones are evicted
+THUMBNAIL_SIZES = [64, 96, 128, 256]
+THUMBNAIL_CACHE_DIR = os.path.join(MEDIA_ROOT, 'thumb')
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+THUMBNAIL_CACHE_LOW_WATER = 0.9  # evict down to this fraction of the limit
+
+# Static JSON snapshots of public microsite bundles, served by nginx at
+# /media/microsites/<site_id>/latest.json (see microsites/snapshots.py).
+# ON_SAVE expires a microsite's snapshot when it changes, to be published
+# again on its next request; changes to every microsite (the SEO
+# configuration) are published by `manage.py publish_microsite_snapshots`.
+MICROSITE_SNAPSHOT_ROOT = os.path.join(MEDIA_ROOT, 'microsites')
+MICROSITE_SNAPSHOTS_ON_SAVE = True
+MICROSITE_SNAPSHOT_KEEP_VERSIONS = 5
+# Seconds an unknown or inactive site_id is remembered as not found
+MICROSITE_BUNDLE_MISS_TIMEOUT = 60
+
+# Derived images rendered in the background by `manage.py process_image_jobs`
+# (see imaging/jobs.py), keyed by '<app_label>.<Model>.<field>'. Every size
+# (a bounding box) is rendered in every format; 'default' is the variant
+# served in place of the original.
+IMAGE_VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80},
+    'jpeg': {'format': 'JPEG', 'quality': 85},
+    'png': {'format': 'PNG'},
+}
+IMAGE_VARIANTS = {
+    'content.MenuItem.image': {
+        'sizes': {'thumb': (160, 160), '400w': (400, 300), '800w': (800, 600), '1600w': (1600, 1200)},
+        'formats': ['webp', 'jpeg'],
+        'default': '800w.jpeg',
+    },
+    'optimization.BaseSEO.og_image': {
+        'sizes': {'600w': (600, 315), '1200w': (1200, 630)},
+        'formats': ['webp', 'jpeg'],
+        'default': '1200w.jpeg',
+    },
+    'optimization.BaseSEO.favicon': {
+        # Transparent, so PNG rather than JPEG
+        'sizes': {'32': (32, 32), '180': (180, 180), '192': (192, 192)},
+        'formats': ['webp', 'png'],
+        'default': '32.png',
+    },
+}
+IMAGE_JOB_MAX_ATTEMPTS = 3
+# Larger images are rejected before decoding (a 48 MP phone photo is allowed)
+IMAGE_MAX_PIXELS = 64_000_000
+IMAGE_JOB_WORK_DIR = None  # scratch space for rendered files; None: the system temp dir
+IMAGE_JOB_STALE_AFTER = 10 * 60  # seconds before a running job is assumed lost
+
+# MenuItemViewSet.bulk_upload_images: files per request (or per ZIP) and bytes per file
+BULK_IMAGE_UPLOAD_MAX_FILES = 500
+BULK_IMAGE_UPLOAD_MAX_FILE_SIZE = 20 * 1024 * 1024
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_IMAGE_UPLOAD_MAX_FILES
+# MenuItemViewSet.bulk_create/bulk_update/bulk_delete: items per request
+BULK_MENU_ITEMS_MAX = 1000
+# MenuItemViewSet.sync: items per POS snapshot
+MENU_SYNC_MAX_ITEMS = 20000
+
+# Rows fetched per round trip by the streaming exports (utils/export.py)
+EXPORT_CHUNK_SIZE = 2000
+
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Your API',
@@ -165,3 +255,19 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),     # Adjust as needed
     # Optional: add other configuration settings here
 }
+
+# Shared, scope-keyed cache of list responses (utils/response_cache.py).
+# Entries are invalidated by model version counters; this only bounds orphans.
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+# Hits, misses and invalidations each process counts before adding them to
+# the shared statistics
+RESPONSE_CACHE_STATS_FLUSH_EVERY = 100
+
+# Single-flight locks for expensive recomputations (utils/single_flight.py).
+# File locks are only used when the database is not PostgreSQL.
+SINGLE_FLIGHT_LOCK_DIR = '/var/tmp/restaurant_dashboard_locks'
+SINGLE_FLIGHT_WAIT_TIMEOUT = 10  # seconds a request waits for another's result
+
+# How long a user's JWT claims version is cached before re-checking the database.
+# Bounds how long a revoked token can still skip the user lookup.
+JWT_CLAIMS_VERSION_CACHE_TIMEOUT = 60
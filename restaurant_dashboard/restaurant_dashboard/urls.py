@@ -4,6 +4,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from imaging.views import thumbnail
+from microsites.views import snapshot
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,6 +14,10 @@ urlpatterns = [
     # Optional UI:
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # Cache misses only; nginx serves rendered thumbnails (imaging/thumbnails.py)
+    path('media/thumb/<int:size>/<path:name>', thumbnail, name='thumbnail'),
+    # Expired microsite snapshots only; nginx serves published ones (microsites/snapshots.py)
+    path('media/microsites/<slug:site_id>/latest.json', snapshot, name='microsite_snapshot'),
 
 ]
 
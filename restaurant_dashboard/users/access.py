@@ -0,0 +1,53 @@
+# users/access.py
+from .models import UserRole
+
+COUNTRY_ROLES = (UserRole.COUNTRY_LEADERSHIP, UserRole.COUNTRY_ADMIN)
+
+
+class AccessContext:
+    """
+    What the current user may see, resolved once per request.
+
+    `role` is one of the UserRole names (or None). Querysets are narrowed to
+    it in users/scoping.py.
+    """
+    def __init__(self, user_id=None, role=None, country_id=None, branch_id=None):
+        self.user_id = user_id
+        self.role = role
+        self.country_id = country_id
+        self.branch_id = branch_id
+
+    @classmethod
+    def from_user(cls, user):
+        if not user or not user.is_authenticated:
+            return cls()
+        role = getattr(user, 'role', None)
+        return cls(
+            user_id=user.pk,
+            role=role.name if role else None,
+            country_id=getattr(user, 'country_id', None),
+            branch_id=getattr(user, 'branch_id', None),
+        )
+
+    @property
+    def is_leadership(self):
+        return self.role == UserRole.LEADERSHIP
+
+    @property
+    def is_country_level(self):
+        return self.role in COUNTRY_ROLES and self.country_id is not None
+
+    @property
+    def is_branch_manager(self):
+        return self.role == UserRole.BRANCH_MANAGER and self.branch_id is not None
+
+
+def get_access_context(request):
+    """
+    Return the request's AccessContext, building it on first use.
+    """
+    context = getattr(request, '_access_context', None)
+    if context is None:
+        context = AccessContext.from_user(request.user)
+        request._access_context = context
+    return context
@@ -0,0 +1,165 @@
+# users/authentication.py
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .models import User, UserRole
+
+ROLE_CLAIM = 'role'
+COUNTRY_CLAIM = 'country_id'
+BRANCH_CLAIM = 'branch_id'
+CLAIMS_VERSION_CLAIM = 'claims_version'
+
+ROLE_DISPLAY = dict(UserRole.ROLE_CHOICES)
+
+
+def claims_version_cache_key(user_id):
+    return f'users:claims-version:{user_id}'
+
+
+def set_access_claims(token, user):
+    """
+    Embed the fields role scoping needs, so read requests never load the user.
+    """
+    token[ROLE_CLAIM] = user.role.name if user.role_id else None
+    token[COUNTRY_CLAIM] = user.country_id
+    token[BRANCH_CLAIM] = user.branch_id
+    token[CLAIMS_VERSION_CLAIM] = user.claims_version
+    return token
+
+
+def get_claims_version(user_id):
+    """
+    Current claims version for a user, cached so validating a token costs no query.
+    """
+    key = claims_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('claims_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, settings.JWT_CLAIMS_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def revoke_claims(user):
+    """
+    Invalidate the role/country/branch claims of every token issued to `user`.
+    Those tokens fall back to a database lookup until the client refreshes.
+    """
+    User.objects.filter(pk=user.pk).update(claims_version=user.claims_version + 1)
+    user.claims_version += 1
+    cache.set(claims_version_cache_key(user.pk), user.claims_version, settings.JWT_CLAIMS_VERSION_CACHE_TIMEOUT)
+
+
+class TokenRole:
+    """
+    Stand-in for UserRole built from the token's role claim.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def get_name_display(self):
+        return ROLE_DISPLAY.get(self.name, self.name)
+
+    def __str__(self):
+        return self.get_name_display()
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user backed only by the access token's claims.
+    `role.name`, `country_id` and `branch_id` come from the token; `country` and
+    `branch` are loaded lazily for the rare code paths that need the objects.
+    """
+    @cached_property
+    def role(self):
+        role_name = self.token.get(ROLE_CLAIM)
+        return TokenRole(role_name) if role_name else None
+
+    @cached_property
+    def country_id(self):
+        return self.token.get(COUNTRY_CLAIM)
+
+    @cached_property
+    def branch_id(self):
+        return self.token.get(BRANCH_CLAIM)
+
+    @cached_property
+    def country(self):
+        from management.models import Country
+        return Country.objects.filter(pk=self.country_id).first() if self.country_id else None
+
+    @cached_property
+    def branch(self):
+        from management.models import Branch
+        return Branch.objects.filter(pk=self.branch_id).first() if self.branch_id else None
+
+    def __str__(self):
+        return f"ClaimsUser {self.id}"
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the user lookup on safe (read) requests when the
+    token carries current role/country/branch claims. Writes, and tokens whose
+    claims were revoked, load the user from the database as usual.
+    """
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in permissions.SAFE_METHODS:
+            user = self.get_claims_user(validated_token)
+            if user is not None:
+                return user, validated_token
+
+        return self.get_user(validated_token), validated_token
+
+    def get_claims_user(self, validated_token):
+        if CLAIMS_VERSION_CLAIM not in validated_token:
+            return None
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return None
+
+        current_version = get_claims_version(user_id)
+        if current_version is None or validated_token[CLAIMS_VERSION_CLAIM] != current_version:
+            return None
+        return ClaimsUser(validated_token)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return set_access_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads the user on refresh so new access tokens carry current claims.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.select_related('role').filter(
+            pk=refresh[api_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise AuthenticationFailed('User not found or inactive', code='user_not_found')
+
+        data = super().validate(attrs)
+        data['access'] = str(set_access_claims(refresh.access_token, user))
+        return data
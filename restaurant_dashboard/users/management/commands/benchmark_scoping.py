@@ -0,0 +1,112 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from content.models import MenuItem
+from management.models import Country, Branch
+from microsites.models import Microsite
+from microsites import visibility
+from users.scoping import MICROSITE_CONTENT_SCOPE
+
+
+class Command(BaseCommand):
+    help = 'Compares the JOIN + DISTINCT role filter with the role scope on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', type=int, default=10)
+        parser.add_argument('--branches', type=int, default=500)
+        parser.add_argument('--microsites', type=int, default=10000)
+        parser.add_argument('--items', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        # Everything is created inside a transaction that is rolled back at the end
+        with transaction.atomic():
+            country = self.seed(options)
+            self.compare(country, options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        batch_size = 5000
+        started = time.perf_counter()
+
+        countries = Country.objects.bulk_create([
+            Country(name=f'Bench Country {i}', code=f'B{i:02d}'[:3])
+            for i in range(options['countries'])
+        ])
+        branches = Branch.objects.bulk_create([
+            Branch(name=f'Bench Branch {i}', country=countries[i % len(countries)], address='-')
+            for i in range(options['branches'])
+        ], batch_size=batch_size)
+        microsites = Microsite.objects.bulk_create([
+            Microsite(name=f'Bench Site {i}', site_id=f'bench-site-{i}')
+            for i in range(options['microsites'])
+        ], batch_size=batch_size)
+
+        MicrositeBranch = Microsite.branches.through
+        MicrositeBranch.objects.bulk_create([
+            MicrositeBranch(microsite_id=microsite.id, branch_id=branch.id)
+            for microsite in microsites
+            for branch in rng.sample(branches, rng.randint(1, 3))
+        ], batch_size=batch_size)
+
+        items = MenuItem.objects.bulk_create([
+            MenuItem(name=f'Bench Item {i}') for i in range(options['items'])
+        ], batch_size=batch_size)
+
+        MenuItemMicrosite = MenuItem.microsites.through
+        MenuItemMicrosite.objects.bulk_create([
+            MenuItemMicrosite(menuitem_id=item.id, microsite_id=microsite.id)
+            for item in items
+            for microsite in rng.sample(microsites, rng.randint(1, 3))
+        ], batch_size=batch_size)
+
+        # bulk_create bypasses the m2m_changed signals
+        visibility.rebuild()
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(f'Seeded data in {time.perf_counter() - started:.1f}s')
+        return countries[0]
+
+    def compare(self, country, repeat):
+        base = MenuItem.objects.all()
+        candidates = {
+            'join + distinct': base.filter(microsites__branches__country=country.id).distinct(),
+            'scope': MICROSITE_CONTENT_SCOPE.for_country(base, country.id, None),
+        }
+
+        for label, queryset in candidates.items():
+            first_page = queryset.order_by('-created_at', '-id')[:50]
+
+            count_time = self.time(lambda: queryset.count(), repeat)
+            page_time = self.time(lambda: list(first_page.values_list('id', flat=True)), repeat)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'  rows:            {queryset.count()}')
+            self.stdout.write(f'  count():         {count_time * 1000:.1f} ms')
+            self.stdout.write(f'  first page:      {page_time * 1000:.1f} ms')
+            cost = self.plan_cost(first_page)
+            if cost is not None:
+                self.stdout.write(f'  plan total cost: {cost:.1f}')
+
+    def time(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def plan_cost(self, queryset):
+        if connection.vendor != 'postgresql':
+            return None
+        plan = json.loads(queryset.explain(format='json'))
+        return plan[0]['Plan']['Total Cost']
@@ -0,0 +1,266 @@
+import random
+import time
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from analytics import stats
+from content.models import Career, MenuItem, Testimonial
+from management.models import Branch, Country
+from microsites import visibility
+from microsites.models import Microsite
+from users.models import User, UserRole
+from utils.response_cache import bump_version
+
+DISH_WORDS = ('Butter', 'Garlic', 'Tandoori', 'Masala', 'Smoked', 'Spicy', 'Crispy', 'Grilled', 'Paneer', 'Mango')
+DISHES = ('Chicken', 'Naan', 'Dal', 'Biryani', 'Kebab', 'Tikka', 'Lassi', 'Samosa', 'Korma', 'Kulfi')
+FIRST_NAMES = ('Asha', 'Ravi', 'Omar', 'Lina', 'Priya', 'Karan', 'Sara', 'Yusuf', 'Meera', 'Arjun')
+LAST_NAMES = ('Sharma', 'Khan', 'Patel', 'Haddad', 'Iyer', 'Singh', 'Nair', 'Rahman', 'Das', 'Mehta')
+DEPARTMENTS = ('Kitchen', 'Service', 'Delivery', 'Management', 'Marketing')
+CURRENCIES = [code for code, _ in MenuItem.CURRENCY_CHOICES]
+JOB_TYPES = [code for code, _ in Career.JOB_TYPE_CHOICES]
+RATINGS = [value for value, _ in Testimonial.RATING_CHOICES]
+
+# Share of users per role; branch managers take the rest
+ROLE_SHARES = {UserRole.LEADERSHIP: 0.01, UserRole.COUNTRY_LEADERSHIP: 0.04, UserRole.COUNTRY_ADMIN: 0.15}
+
+
+def batches(objects, size):
+    objects = iter(objects)
+    while batch := list(islice(objects, size)):
+        yield batch
+
+
+def country_code(index):
+    # AA, AB, ... ZZ, then AAA
+    letters = ''
+    index += 26
+    while index:
+        index, remainder = divmod(index, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters[-3:]
+
+
+class Command(BaseCommand):
+    help = 'Creates a large synthetic dataset for load testing, with bulk inserts and a fixed random seed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', type=int, default=10)
+        parser.add_argument('--branches', type=int, default=1000)
+        parser.add_argument('--microsites', type=int, default=2000)
+        parser.add_argument('--menu-items', type=int, default=200000)
+        parser.add_argument('--testimonials', type=int, default=100000)
+        parser.add_argument('--careers', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument(
+            '--fan-out',
+            type=int,
+            default=3,
+            help='Most microsites a menu item or testimonial is linked to, and branches per microsite',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Same seed, same dataset')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Prefix of microsite site_ids and user emails, so several datasets can coexist',
+        )
+        parser.add_argument('--password', default='seed-password', help='Password of every created user')
+
+    def handle(self, *args, **options):
+        if (options['branches'] and not options['countries']) or (options['microsites'] and not options['branches']):
+            raise CommandError('Branches need at least one country, and microsites at least one branch')
+        prefix = options['prefix']
+        if Microsite.objects.filter(site_id__startswith=f'{prefix}-').exists() or \
+                User.objects.filter(email__endswith=f'@{prefix}.example.com').exists():
+            raise CommandError(f'A dataset with prefix "{prefix}" exists; pass another --prefix')
+
+        # Separate streams for rows and links, so the dataset doesn't depend on --batch-size
+        self.rng = random.Random(options['seed'])
+        self.link_rng = random.Random(f'{options["seed"]}-links')
+        self.options = options
+        self.counts = {}
+        started = time.monotonic()
+
+        with transaction.atomic():
+            countries = self.seed_countries()
+            branches = self.seed_branches(countries)
+            microsites = self.seed_microsites(branches)
+            self.seed_menu_items(microsites)
+            self.seed_testimonials(branches, microsites)
+            self.seed_careers(branches, microsites)
+            self.seed_users(countries, branches)
+
+            # Bulk inserts send no signals
+            stats.mark_stale(all_countries=True, all_branches=True)
+            bump_version(Country, Branch, Microsite, MenuItem, Testimonial, Career, User)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        elapsed = time.monotonic() - started
+        total = sum(self.counts.values())
+        for label, count in self.counts.items():
+            self.stdout.write(f'  {label:<32} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)'
+        ))
+
+    def insert(self, model, objects, links=None):
+        """
+        Bulk insert `objects` in batches, and for each inserted batch the
+        through rows `links(batch)` returns. Returns the new primary keys.
+        """
+        pks = []
+        for batch in batches(objects, self.options['batch_size']):
+            created = model.objects.bulk_create(batch)
+            pks.extend(instance.pk for instance in created)
+            if links is not None:
+                through_rows = links(created)
+                if through_rows:
+                    through = type(through_rows[0])
+                    through.objects.bulk_create(through_rows, batch_size=self.options['batch_size'])
+                    self.count(through, len(through_rows))
+            self.count(model, len(created))
+            if self.options['verbosity'] > 1:
+                self.stdout.write(f'{model._meta.verbose_name_plural}: {len(pks)}')
+        return pks
+
+    def count(self, model, count):
+        label = model._meta.db_table
+        self.counts[label] = self.counts.get(label, 0) + count
+
+    def fan_out(self, population, most):
+        return self.link_rng.sample(population, self.link_rng.randint(1, min(most, len(population))))
+
+    def seed_countries(self):
+        return self.insert(Country, (
+            Country(name=f'{self.options["prefix"].title()} Country {i}', code=country_code(i))
+            for i in range(self.options['countries'])
+        ))
+
+    def seed_branches(self, countries):
+        """
+        Returns [(branch id, country id)].
+        """
+        country_ids = [self.rng.choice(countries) for _ in range(self.options['branches'])]
+        pks = self.insert(Branch, (
+            Branch(
+                name=f'Branch {i}', country_id=country_id, address=f'{i} Main Street',
+                phone=f'+1555{i:07d}', has_online_ordering=self.rng.random() < 0.6,
+            )
+            for i, country_id in enumerate(country_ids)
+        ))
+        return list(zip(pks, country_ids))
+
+    def seed_microsites(self, branches):
+        by_country = {}
+        for branch_id, country_id in branches:
+            by_country.setdefault(country_id, []).append(branch_id)
+        countries = sorted(by_country)
+        MicrositeBranch = Microsite.branches.through
+
+        def links(microsites):
+            return [
+                MicrositeBranch(microsite_id=microsite.pk, branch_id=branch_id)
+                for microsite in microsites
+                # Each microsite serves branches of one country
+                for branch_id in self.fan_out(by_country[self.link_rng.choice(countries)], self.options['fan_out'])
+            ]
+
+        pks = self.insert(Microsite, (
+            Microsite(name=f'Microsite {i}', site_id=f'{self.options["prefix"]}-{i}')
+            for i in range(self.options['microsites'])
+        ), links)
+        for batch in batches(pks, self.options['batch_size']):
+            visibility.sync_microsites(batch)
+        return pks
+
+    def seed_menu_items(self, microsites):
+        Link = MenuItem.microsites.through
+        rng = self.rng
+        self.insert(MenuItem, (
+            MenuItem(
+                name=f'{rng.choice(DISH_WORDS)} {rng.choice(DISHES)}',
+                description=f'House special #{i}',
+                price=Decimal(rng.randint(100, 5000)) / 100,
+                currency=rng.choice(CURRENCIES),
+                is_active=rng.random() < 0.95,
+            )
+            for i in range(self.options['menu_items'])
+        ), lambda items: [
+            Link(menuitem_id=item.pk, microsite_id=microsite_id)
+            for item in items for microsite_id in self.fan_out(microsites, self.options['fan_out'])
+        ] if microsites else [])
+
+    def seed_testimonials(self, branches, microsites):
+        Link = Testimonial.microsites.through
+        rng = self.rng
+        branch_ids = [branch_id for branch_id, _ in branches]
+        self.insert(Testimonial, (
+            Testimonial(
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                content=f'Visit number {i} was great.',
+                rating=rng.choice(RATINGS),
+                branch_id=rng.choice(branch_ids) if branch_ids else None,
+                is_active=rng.random() < 0.9,
+            )
+            for i in range(self.options['testimonials'])
+        ), lambda testimonials: [
+            Link(testimonial_id=testimonial.pk, microsite_id=microsite_id)
+            for testimonial in testimonials for microsite_id in self.fan_out(microsites, self.options['fan_out'])
+        ] if microsites else [])
+
+    def seed_careers(self, branches, microsites):
+        Link = Career.microsites.through
+        rng = self.rng
+        branch_ids = [branch_id for branch_id, _ in branches]
+        self.insert(Career, (
+            Career(
+                name=f'{rng.choice(DEPARTMENTS)} Role {i}',
+                department=rng.choice(DEPARTMENTS),
+                branch_id=rng.choice(branch_ids) if branch_ids else None,
+                job_type=rng.choice(JOB_TYPES),
+                is_active=rng.random() < 0.8,
+            )
+            for i in range(self.options['careers'])
+        ), lambda careers: [
+            Link(career_id=career.pk, microsite_id=microsite_id)
+            for career in careers for microsite_id in self.fan_out(microsites, 2)
+        ] if microsites else [])
+
+    def seed_users(self, countries, branches):
+        roles = {}
+        for name, description in UserRole.ROLE_CHOICES:
+            roles[name], _ = UserRole.objects.get_or_create(name=name, defaults={'description': description})
+        # Hashing is deliberately slow: hash once and share it
+        password = make_password(self.options['password'])
+        prefix, rng = self.options['prefix'], self.rng
+
+        def user(i):
+            share = rng.random()
+            for role, role_share in ROLE_SHARES.items():
+                if share < role_share:
+                    break
+                share -= role_share
+            else:
+                role = UserRole.BRANCH_MANAGER
+            if i < len(UserRole.ROLE_CHOICES):
+                # At least one user of every role
+                role = UserRole.ROLE_CHOICES[i][0]
+            country_id = branch_id = None
+            if role == UserRole.BRANCH_MANAGER and branches:
+                branch_id, country_id = rng.choice(branches)
+            elif role != UserRole.LEADERSHIP and countries:
+                country_id = rng.choice(countries)
+            return User(
+                email=f'user{i}@{prefix}.example.com', password=password,
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                role=roles[role], country_id=country_id, branch_id=branch_id,
+            )
+
+        self.insert(User, (user(i) for i in range(self.options['users'])))
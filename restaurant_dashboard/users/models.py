@@ -47,6 +47,8 @@ class User(AbstractUser):
     role = models.ForeignKey(UserRole, on_delete=models.SET_NULL, null=True, blank=True)
     country = models.ForeignKey(Country, on_delete=models.SET_NULL, null=True, blank=True)
     branch = models.ForeignKey(Branch, on_delete=models.SET_NULL, null=True, blank=True)
+    # Bumped whenever role/country/branch/status change; invalidates JWT access claims
+    claims_version = models.PositiveIntegerField(default=0, editable=False)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
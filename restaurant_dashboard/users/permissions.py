@@ -1,5 +1,19 @@
 # users/permissions.py
 from rest_framework import permissions
+from .access import get_access_context
+from .models import UserRole
+
+
+def _object_country_matches(access, obj):
+    # Allow access only if object's country matches user's country
+    if hasattr(obj, 'country'):
+        return obj.country_id == access.country_id
+
+    # If obj has branch that has country
+    if getattr(obj, 'branch', None) is not None:
+        return obj.branch.country_id == access.country_id
+
+    return False
 
 class IsLeadershipTeam(permissions.BasePermission):
     """
@@ -7,8 +21,8 @@ class IsLeadershipTeam(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         # Check if user is authenticated and has leadership role
-        return bool(request.user and request.user.is_authenticated and 
-                    request.user.role and request.user.role.name == 'leadership')
+        return bool(request.user and request.user.is_authenticated and
+                    get_access_context(request).role == UserRole.LEADERSHIP)
 
 class IsCountryLeadership(permissions.BasePermission):
     """
@@ -16,19 +30,11 @@ class IsCountryLeadership(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         # Check if user has country leadership role
-        return bool(request.user and request.user.is_authenticated and 
-                    request.user.role and request.user.role.name == 'country_leadership')
-    
+        return bool(request.user and request.user.is_authenticated and
+                    get_access_context(request).role == UserRole.COUNTRY_LEADERSHIP)
+
     def has_object_permission(self, request, view, obj):
-        # Allow access only if object's country matches user's country
-        if hasattr(obj, 'country'):
-            return obj.country == request.user.country
-        
-        # If obj has branch that has country
-        if hasattr(obj, 'branch') and hasattr(obj.branch, 'country'):
-            return obj.branch.country == request.user.country
-        
-        return False
+        return _object_country_matches(get_access_context(request), obj)
 
 class IsCountryAdmin(permissions.BasePermission):
     """
@@ -36,19 +42,11 @@ class IsCountryAdmin(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         # Check if user has country admin role
-        return bool(request.user and request.user.is_authenticated and 
-                    request.user.role and request.user.role.name == 'country_admin')
-    
+        return bool(request.user and request.user.is_authenticated and
+                    get_access_context(request).role == UserRole.COUNTRY_ADMIN)
+
     def has_object_permission(self, request, view, obj):
-        # Allow access only if object's country matches user's country
-        if hasattr(obj, 'country'):
-            return obj.country == request.user.country
-        
-        # If obj has branch that has country
-        if hasattr(obj, 'branch') and hasattr(obj.branch, 'country'):
-            return obj.branch.country == request.user.country
-        
-        return False
+        return _object_country_matches(get_access_context(request), obj)
 
 class IsBranchManager(permissions.BasePermission):
     """
@@ -58,19 +56,20 @@ class IsBranchManager(permissions.BasePermission):
         # Check if user has branch manager role
         # Read-only for branch managers
         if request.method in permissions.SAFE_METHODS:
-            return bool(request.user and request.user.is_authenticated and 
-                        request.user.role and request.user.role.name == 'branch_manager')
+            return bool(request.user and request.user.is_authenticated and
+                        get_access_context(request).role == UserRole.BRANCH_MANAGER)
         return False
-    
+
     def has_object_permission(self, request, view, obj):
         # Allow view access only if object's branch matches user's branch
         if request.method in permissions.SAFE_METHODS:
+            access = get_access_context(request)
             if hasattr(obj, 'branch'):
-                return obj.branch == request.user.branch
-            
+                return obj.branch_id == access.branch_id
+
             # If obj is a branch
             if obj.__class__.__name__ == 'Branch':
-                return obj == request.user.branch
-            
+                return obj.pk == access.branch_id
+
             return False
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,189 @@
+# users/scoping.py
+from django.db.models import Exists, OuterRef, Q
+from microsites.models import MicrositeVisibility
+from .access import get_access_context
+from .models import UserRole
+
+
+class RoleScope:
+    """
+    Decides which rows of a queryset a user may see, based on their role.
+
+    Leadership sees everything, country leadership & admins see rows tied to
+    their country, branch managers see rows tied to their branch and anyone
+    else sees nothing. Subclasses describe how a model is tied to a country
+    or a branch by implementing `for_country` and `for_branch`.
+    """
+    def apply(self, queryset, access):
+        """
+        Restrict `queryset` for an AccessContext (see users/access.py).
+        """
+        if access.is_leadership:
+            return self.for_leadership(queryset, access)
+
+        if access.is_country_level:
+            return self.for_country(queryset, access.country_id, access)
+
+        if access.is_branch_manager:
+            return self.for_branch(queryset, access.branch_id, access)
+
+        return queryset.none()
+
+    def for_leadership(self, queryset, access):
+        return queryset
+
+    def for_country(self, queryset, country_id, access):
+        raise NotImplementedError
+
+    def for_branch(self, queryset, branch_id, access):
+        raise NotImplementedError
+
+    def visible_pks(self, model, level, scope_id, access):
+        """
+        Return a `values()` queryset of the primary keys of `model` visible at
+        `level` ('country' or 'branch'), for use as an `__in` subquery.
+        """
+        queryset = model._default_manager.all()
+        if level == 'country':
+            return self.for_country(queryset, scope_id, access).values('pk')
+        return self.for_branch(queryset, scope_id, access).values('pk')
+
+
+class FieldScope(RoleScope):
+    """
+    Scope through plain FK lookups, e.g. `branch__country` / `branch`.
+    Forward FK joins cannot duplicate rows, so no `.distinct()` is needed.
+    """
+    def __init__(self, country, branch, include_unassigned=None):
+        self.country = country
+        self.branch = branch
+        # Optional FK whose NULL value means "shared by every scope"
+        self.include_unassigned = include_unassigned
+
+    def _filter(self, queryset, condition):
+        if self.include_unassigned:
+            condition |= Q(**{f'{self.include_unassigned}__isnull': True})
+        return queryset.filter(condition)
+
+    def for_country(self, queryset, country_id, access):
+        return self._filter(queryset, Q(**{self.country: country_id}))
+
+    def for_branch(self, queryset, branch_id, access):
+        return self._filter(queryset, Q(**{self.branch: branch_id}))
+
+
+class RelatedExistsScope(RoleScope):
+    """
+    Scope through a many-to-many relation as a correlated EXISTS subquery.
+
+    A row is visible when its relation's through table links it to at least one
+    related row visible under `target_scope`. Each outer row is tested once (a
+    semi-join) instead of being multiplied by the join and de-duplicated
+    afterwards with `.distinct()`. The visible related ids are read straight
+    from the next through table as an uncorrelated subquery, so chained scopes
+    never touch the intermediate model tables.
+    """
+    def __init__(self, relation, target_scope):
+        self.relation = relation
+        self.target_scope = target_scope
+
+    def _relation(self, model):
+        field = model._meta.get_field(self.relation)
+        return field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name()
+
+    def _visible_targets(self, model, level, scope_id, access):
+        target_model = model._meta.get_field(self.relation).related_model
+        return self.target_scope.visible_pks(target_model, level, scope_id, access)
+
+    def _exists(self, queryset, level, scope_id, access):
+        through, source, target = self._relation(queryset.model)
+        visible_targets = self._visible_targets(queryset.model, level, scope_id, access)
+        return queryset.filter(Exists(
+            through.objects.filter(**{
+                source: OuterRef('pk'),
+                f'{target}__in': visible_targets,
+            })
+        ))
+
+    def for_country(self, queryset, country_id, access):
+        return self._exists(queryset, 'country', country_id, access)
+
+    def for_branch(self, queryset, branch_id, access):
+        return self._exists(queryset, 'branch', branch_id, access)
+
+    def visible_pks(self, model, level, scope_id, access):
+        through, source, target = self._relation(model)
+        visible_targets = self._visible_targets(model, level, scope_id, access)
+        return through.objects.filter(**{f'{target}__in': visible_targets}).values(source)
+
+
+class VisibilityTableScope(RoleScope):
+    """
+    Scope through a denormalised (row, branch, country) table such as
+    MicrositeVisibility: every check is one indexed lookup on that table.
+    `source` is the table's FK back to the scoped model.
+    """
+    def __init__(self, table, source):
+        self.table = table
+        self.source = source
+
+    def _exists(self, queryset, **lookups):
+        return queryset.filter(Exists(
+            self.table.objects.filter(**{self.source: OuterRef('pk')}, **lookups)
+        ))
+
+    def for_country(self, queryset, country_id, access):
+        return self._exists(queryset, country_id=country_id)
+
+    def for_branch(self, queryset, branch_id, access):
+        return self._exists(queryset, branch_id=branch_id)
+
+    def visible_pks(self, model, level, scope_id, access):
+        return self.table.objects.filter(**{f'{level}_id': scope_id}).values(f'{self.source}_id')
+
+
+BRANCH_SCOPE = FieldScope(country='country', branch='id')
+
+MICROSITE_SCOPE = VisibilityTableScope(MicrositeVisibility, 'microsite')
+
+# Content is linked to microsites, which are linked to branches
+MICROSITE_CONTENT_SCOPE = RelatedExistsScope('microsites', MICROSITE_SCOPE)
+
+COUNTRY_SCOPE = FieldScope(country='id', branch='branches')
+
+# Links without a branch are shared across every country
+WHATSAPP_LINK_SCOPE = FieldScope(country='branch__country', branch='branch', include_unassigned='branch')
+
+
+class UserScope(RoleScope):
+    """
+    Users belong to a country directly or through their branch. Country admins
+    cannot see the leadership tiers above them, branch managers only see themselves.
+    """
+    def apply(self, queryset, access):
+        if access.role == UserRole.BRANCH_MANAGER:
+            return queryset.filter(pk=access.user_id)
+        return super().apply(queryset, access)
+
+    def for_country(self, queryset, country_id, access):
+        queryset = queryset.filter(Q(country=country_id) | Q(branch__country=country_id))
+        if access.role == UserRole.COUNTRY_ADMIN:
+            queryset = queryset.exclude(
+                role__name__in=[UserRole.LEADERSHIP, UserRole.COUNTRY_LEADERSHIP]
+            )
+        return queryset
+
+
+USER_SCOPE = UserScope()
+
+
+class RoleScopedMixin:
+    """
+    Viewset mixin that restricts the base queryset with `scope`, using the
+    request's AccessContext. Viewsets should build their filters on top of
+    `super().get_queryset()`.
+    """
+    scope = None
+
+    def get_queryset(self):
+        return self.scope.apply(super().get_queryset(), get_access_context(self.request))
@@ -14,6 +14,8 @@ class UserSerializer(serializers.ModelSerializer):
     country_name = serializers.CharField(source='country.name', read_only=True)
     branch_name = serializers.CharField(source='branch.name', read_only=True)
     
+    select_related_fields = ('role', 'country', 'branch')
+    
     class Meta:
         model = User
         fields = ['id', 'email', 'first_name', 'last_name', 'phone', 'description',
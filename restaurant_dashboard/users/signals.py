@@ -0,0 +1,30 @@
+# users/signals.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from .models import User
+from .authentication import claims_version_cache_key
+
+# Fields embedded in (or gating) JWT access claims
+CLAIM_FIELDS = ('role_id', 'country_id', 'branch_id', 'is_active')
+
+
+@receiver(pre_save, sender=User)
+def bump_claims_version(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    current = User.objects.filter(pk=instance.pk).values(*CLAIM_FIELDS, 'claims_version').first()
+    if current is None:
+        return
+    if any(current[field] != getattr(instance, field) for field in CLAIM_FIELDS):
+        instance.claims_version = current['claims_version'] + 1
+
+
+@receiver(post_save, sender=User)
+def publish_claims_version(sender, instance, **kwargs):
+    cache.set(
+        claims_version_cache_key(instance.pk),
+        instance.claims_version,
+        settings.JWT_CLAIMS_VERSION_CACHE_TIMEOUT
+    )
@@ -0,0 +1,126 @@
+# users/test.py
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from content.models import MenuItem
+from management.models import Country, Branch
+from microsites.models import Microsite, MicrositeVisibility
+from .access import AccessContext
+from .models import User, UserRole
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ClaimsTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name='Test Country', code='TST')
+        self.role = UserRole.objects.create(name=UserRole.COUNTRY_ADMIN)
+        self.user = User.objects.create_user(
+            email='admin@example.com', password='secret', role=self.role, country=self.country
+        )
+        self.client = APIClient()
+
+    def obtain_tokens(self):
+        response = self.client.post('/api/token/', {'email': 'admin@example.com', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def user_queries(self, queries):
+        return [q['sql'] for q in queries if '"users_user"' in q['sql'] or '"users_userrole"' in q['sql']]
+
+    def test_read_requests_do_not_load_the_user(self):
+        tokens = self.obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        self.client.get('/api/management/branches/')  # warms the claims version cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/management/branches/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_queries(queries.captured_queries), [])
+
+    def test_role_change_revokes_claims_until_refresh(self):
+        tokens = self.obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        self.user.role = UserRole.objects.create(name=UserRole.LEADERSHIP)
+        self.user.save()
+        self.assertEqual(self.user.claims_version, 1)
+
+        # The stale token still works, but the user is read from the database
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/management/countries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(self.user_queries(queries.captured_queries), [])
+
+        self.client.credentials()
+        refreshed = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed.data['access']}")
+
+        self.client.get('/api/management/countries/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/management/countries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_queries(queries.captured_queries), [])
+
+
+class AccessContextTest(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Test Country', code='TST')
+        branch = Branch.objects.create(name='Test Branch', country=country, address='1 Test St')
+        microsite = Microsite.objects.create(name='Test Site')
+        microsite.branches.add(branch)
+        self.menu_item = MenuItem.objects.create(name='Dish')
+        self.menu_item.microsites.add(microsite)
+
+        role = UserRole.objects.create(name=UserRole.COUNTRY_ADMIN)
+        User.objects.create_user(email='admin@example.com', password='secret', role=role, country=country)
+
+    def test_write_request_resolves_access_once(self):
+        # Menu items have no country, so country admins may not edit them
+        # A fresh instance, so the role is not already cached on the user
+        user = User.objects.get(email='admin@example.com')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch.object(AccessContext, 'from_user', wraps=AccessContext.from_user) as from_user:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.patch(
+                    f'/api/content/menu-items/{self.menu_item.pk}/', {'name': 'New name'}, format='json'
+                )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(from_user.call_count, 1)
+
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(len([q for q in sql if 'FROM "users_userrole"' in q]), 1)
+        self.assertEqual([q for q in sql if 'FROM "management_country"' in q], [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SeedScaleTest(TestCase):
+    def seed(self, prefix, batch_size):
+        call_command(
+            'seed_scale', '--countries', '2', '--branches', '6', '--microsites', '8', '--menu-items', '40',
+            '--testimonials', '10', '--careers', '5', '--users', '12', '--batch-size', str(batch_size),
+            '--prefix', prefix, stdout=StringIO(),
+        )
+        items = MenuItem.objects.filter(microsites__site_id__startswith=f'{prefix}-')
+        return sorted(items.values_list('name', 'price', 'microsites__name'))
+
+    def test_dataset_is_reproducible_and_covers_every_role(self):
+        first = self.seed('one', batch_size=7)
+        self.assertEqual(first, self.seed('two', batch_size=50))
+
+        self.assertEqual(User.objects.filter(email__endswith='@one.example.com').count(), 12)
+        self.assertEqual(
+            set(User.objects.values_list('role__name', flat=True)), {name for name, _ in UserRole.ROLE_CHOICES}
+        )
+        self.assertTrue(MicrositeVisibility.objects.filter(microsite__site_id__startswith='one-').exists())
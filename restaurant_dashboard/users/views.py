@@ -8,8 +8,11 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from .models import User, UserRole
 from .serializers import UserSerializer, UserRoleSerializer
+from .scoping import RoleScopedMixin, USER_SCOPE
 # Add these imports
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiResponse
+from utils.eager_loading import EagerLoadingMixin
+from utils.export import ExportMixin
 
 @extend_schema_view(
     list=extend_schema(
@@ -60,40 +63,12 @@ class UserRoleViewSet(viewsets.ReadOnlyModelViewSet):
         tags=["Users"]
     )
 )
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ExportMixin, RoleScopedMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = User.objects.all()
     serializer_class = UserSerializer
-    
-    @extend_schema(
-        description="Returns users based on the requester's role permissions",
-        tags=["Users"]
-    )
-    def get_queryset(self):
-        user = self.request.user
-        
-        # Leadership team can see all users
-        if user.role and user.role.name == 'leadership':
-            return User.objects.all()
-        
-        # Country leadership can see users in their country
-        if user.role and user.role.name == 'country_leadership':
-            if user.country:
-                return User.objects.filter(
-                    Q(country=user.country) | 
-                    Q(branch__country=user.country)
-                ).distinct()
-        
-        # Country admin can see some users in their country
-        if user.role and user.role.name == 'country_admin':
-            if user.country:
-                return User.objects.filter(
-                    Q(country=user.country) | 
-                    Q(branch__country=user.country),
-                    ~Q(role__name='leadership'),
-                    ~Q(role__name='country_leadership')
-                ).distinct()
-        
-        # Branch managers can only see themselves
-        if user.role and user.role.name == 'branch_manager':
-            return User.objects.filter(id=user.id)
-        
-        return User.objects.none()
\ No newline at end of file
+    scope = USER_SCOPE
+    ordering = ('-date_joined', '-id')
+    export_fields = ('id', 'email', 'first_name', 'last_name', 'phone', 'is_active', 'date_joined', 'last_login',
+                     'role', 'country', 'branch')
+    export_related_fields = {'role_name': 'role__name', 'country_name': 'country__name', 'branch_name': 'branch__name'}
+    export_filename = 'users'
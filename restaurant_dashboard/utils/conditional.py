@@ -0,0 +1,66 @@
+# utils/conditional.py
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+
+def touch(queryset, field='updated_at'):
+    """
+    Bump `field` on every row of `queryset` in one UPDATE, so list validators
+    see changes made to related rows (which don't call the rows' save()).
+    """
+    return queryset.update(**{field: timezone.now()})
+
+
+class ConditionalListMixin:
+    """
+    Viewset mixin answering list requests with an ETag validator.
+
+    The ETag comes from one aggregate over the scoped, filtered queryset,
+    Max(`last_modified_field`) and Count(pk), so an unchanged list returns
+    304 Not Modified without fetching or serializing any rows. Row edits bump
+    the max, inserts and deletes change the count; related changes that alter
+    the payload must touch `last_modified_field` (see the app signals).
+
+    There's no Last-Modified: the max alone doesn't move when a row is
+    deleted or leaves the caller's scope, or on a second edit within the
+    same second, so If-Modified-Since would answer 304 for changed lists.
+    """
+    last_modified_field = 'updated_at'
+
+    def get_list_etag(self, request, queryset):
+        stats = queryset.order_by().aggregate(
+            count=Count('pk'),
+            last_modified=Max(self.last_modified_field),
+        )
+        last_modified = stats['last_modified']
+
+        fingerprint = '|'.join([
+            str(stats['count']),
+            last_modified.isoformat() if last_modified else '',
+            request.get_full_path(),
+            request.accepted_media_type or '',
+            self.get_scope_fingerprint(request),
+        ])
+        return quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest())
+
+    def get_scope_fingerprint(self, request):
+        from users.access import get_access_context
+        access = get_access_context(request)
+        return f'{access.role}:{access.country_id}:{access.branch_id}'
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request, self.filter_queryset(self.get_queryset()))
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        # Responses are per user scope, and must be revalidated before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,29 @@
+# utils/eager_loading.py
+
+
+def eager_load(queryset, serializer_class):
+    """
+    Apply the relations a serializer declares it reads.
+
+    Serializers list their needs as class attributes:
+        select_related_fields = ('branch',)        # forward FK / one-to-one
+        prefetch_related_fields = ('microsites',)  # M2M and reverse relations
+    """
+    select_related_fields = getattr(serializer_class, 'select_related_fields', ())
+    prefetch_related_fields = getattr(serializer_class, 'prefetch_related_fields', ())
+
+    if select_related_fields:
+        queryset = queryset.select_related(*select_related_fields)
+    if prefetch_related_fields:
+        queryset = queryset.prefetch_related(*prefetch_related_fields)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Viewset mixin that applies the serializer's declared relations to the base
+    queryset, so list endpoints run a constant number of queries.
+    Viewsets should build their filters on top of `super().get_queryset()`.
+    """
+    def get_queryset(self):
+        return eager_load(super().get_queryset(), self.get_serializer_class())
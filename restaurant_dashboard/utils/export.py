@@ -0,0 +1,139 @@
+# utils/export.py
+"""
+Streaming CSV / NDJSON exports of a viewset's rows.
+
+Rows are read as plain dicts with `.values()` through a server-side cursor
+(`.iterator(chunk_size=EXPORT_CHUNK_SIZE)` on PostgreSQL) and written out one
+chunk at a time by a StreamingHttpResponse, so a worker holds at most one
+chunk in memory however many rows the export has. Many-to-many ids are
+loaded per chunk, with one query each.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets `?format=` and the Accept header pick an export format. Exports
+    stream their own response; this only renders error bodies, as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_value(value):
+    if isinstance(value, list):
+        return ';'.join(str(item) for item in value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def csv_lines(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in batches:
+        for row in chunk:
+            writer.writerow([csv_value(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_lines(batches):
+    for chunk in batches:
+        yield ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in chunk)
+
+
+class ExportMixin:
+    """
+    Viewset mixin adding `GET <list>/export/?format=csv|ndjson`: every row
+    of `get_queryset()` (so the same role scoping and filters as the list),
+    ordered by primary key.
+
+    `export_fields` are model fields read as-is, `export_related_fields`
+    maps column names to lookups (e.g. {'branch_name': 'branch__name'}), and
+    `export_m2m_fields` are many-to-many fields exported as lists of ids.
+    """
+    export_fields = ()
+    export_related_fields = {}
+    export_m2m_fields = ()
+    export_filename = None
+
+    def export_columns(self):
+        return [*self.export_fields, *self.export_related_fields, *self.export_m2m_fields]
+
+    def export_rows(self, queryset):
+        size = settings.EXPORT_CHUNK_SIZE
+        rows = queryset.prefetch_related(None).order_by('pk').values(
+            *self.export_fields, **{name: F(lookup) for name, lookup in self.export_related_fields.items()}
+        ).iterator(chunk_size=size)
+        for chunk in chunks(rows, size):
+            for field_name in self.export_m2m_fields:
+                self.attach_m2m(queryset.model, field_name, chunk)
+            yield chunk
+
+    def attach_m2m(self, model, field_name, chunk):
+        field = model._meta.get_field(field_name)
+        source, target = field.m2m_column_name(), field.m2m_reverse_name()
+        links = field.remote_field.through.objects.filter(
+            **{f'{source}__in': [row['id'] for row in chunk]}
+        ).order_by(target).values_list(source, target)
+        linked = {}
+        for source_id, target_id in links:
+            linked.setdefault(source_id, []).append(target_id)
+        for row in chunk:
+            row[field_name] = linked.get(row['id'], [])
+
+    @extend_schema(
+        summary="Export",
+        description="Stream every row the user may see as CSV (the default) or newline-delimited JSON, "
+                    "with the same filters as the list.",
+        parameters=[OpenApiParameter(name="format", description="csv or ndjson", required=False, type=str)],
+        responses={200: OpenApiResponse(description="The rows, as CSV or NDJSON")},
+    )
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        fmt = request.accepted_renderer.format
+        rows = self.export_rows(self.filter_queryset(self.get_queryset()))
+        lines = csv_lines(self.export_columns(), rows) if fmt == 'csv' else ndjson_lines(rows)
+
+        response = StreamingHttpResponse(lines, content_type=f'{request.accepted_renderer.media_type}; charset=utf-8')
+        filename = self.export_filename or self.queryset.model._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{filename}-{timezone.now():%Y%m%d}.{fmt}"'
+        return response
@@ -0,0 +1,212 @@
+# utils/pagination.py
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for a queryset.
+    Falls back to an exact COUNT(*) on databases without a usable planner estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the full ordering tuple, e.g. (created_at, id),
+    instead of only the first ordering field. Every page is a single indexed range
+    scan, so page N costs the same as page 1.
+
+    Views choose their ordering with an `ordering` attribute. The primary key is
+    appended automatically so the ordering is always unique.
+
+    Pass `?count=exact` or `?count=estimate` to include a total count.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-id',)
+
+    count_query_param = 'count'
+    count_query_description = 'Include a total count: "exact" or "estimate".'
+    count_modes = ('exact', 'estimate')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.count_mode = self.get_count_mode(request)
+        self.count = self.get_count(queryset)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(current_position, reverse))
+            except (ValidationError, ValueError, TypeError):
+                # A tampered position whose values don't fit the ordering fields
+                raise NotFound(self.invalid_cursor_message)
+
+        # Positions are unique, so the offset only ever comes from DRF's own
+        # first/last page handling and stays at 0 in practice.
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+
+        assert not any('__' in field for field in ordering), (
+            'Keyset pagination does not support double underscore lookups for orderings.'
+        )
+
+        # Append the primary key so that every position is unique.
+        last_field = ordering[-1].lstrip('-')
+        if last_field not in ('pk', 'id'):
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering = ordering + (direction + 'id',)
+        return ordering
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Build the row-value comparison `(f1, f2, ...) > (v1, v2, ...)` as an OR of
+        prefix-equality terms, honouring the direction of each ordering field.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal_prefix = {}
+        for order, value in zip(self.ordering, values):
+            field_name = order.lstrip('-')
+            is_reversed = order.startswith('-')
+            lookup = '__lt' if reverse != is_reversed else '__gt'
+            condition |= Q(**equal_prefix, **{field_name + lookup: value})
+            equal_prefix[field_name] = value
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = getattr(instance, field_name)
+            values.append(str(attr))
+        return json.dumps(values, separators=(',', ':'))
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        return mode if mode in self.count_modes else None
+
+    def get_count(self, queryset):
+        if self.count_mode == 'exact':
+            return queryset.count()
+        if self.count_mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+    def get_paginated_response(self, data):
+        response_data = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count_mode:
+            response_data['count'] = self.count
+            response_data['count_type'] = self.count_mode
+        response_data['results'] = data
+        return Response(response_data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'nullable': True,
+        }
+        response_schema['properties']['count_type'] = {
+            'type': 'string',
+            'enum': list(self.count_modes),
+            'nullable': True,
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.count_query_description,
+                'schema': {
+                    'type': 'string',
+                    'enum': list(self.count_modes),
+                },
+            }
+        )
+        return parameters
@@ -0,0 +1,40 @@
+# utils/relations.py
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+
+def prefetch(serializer, model, pks):
+    """
+    Load the `model` rows with the given primary keys in one query, for every
+    PrefetchedPrimaryKeyRelatedField of `model` under `serializer` to use.
+    Keys that aren't valid primary keys are skipped; the fields reject them.
+    """
+    valid = set()
+    for pk in pks:
+        try:
+            valid.add(model._meta.pk.to_python(pk))
+        except (DjangoValidationError, TypeError):
+            continue
+    serializer.context.setdefault('prefetched', {})[model] = model.objects.in_bulk(list(valid))
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A PrimaryKeyRelatedField that resolves ids from rows loaded up front with
+    `prefetch()` when there are some, instead of one query per id. Validating
+    a list of 500 items with a few related ids each then costs one query.
+    """
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        prefetched = self.context.get('prefetched', {}).get(model)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in prefetched:
+            self.fail('does_not_exist', pk_value=data)
+        return prefetched[pk]
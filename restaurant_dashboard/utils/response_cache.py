@@ -0,0 +1,236 @@
+# utils/response_cache.py
+"""
+Shared cache of list responses, keyed by what the user may see rather than
+who the user is.
+
+Every user with the same scope (e.g. all country roles of one country) gets
+the same list, so one cached response serves all of them. Entries are keyed
+by endpoint, full URL, accepted media type, scope key and the current
+version counters of the models the list depends on. Saving, deleting or
+changing the m2m links of one of those models bumps its counter once the
+transaction commits, which orphans every entry built from the old version;
+orphans simply expire.
+
+Code that writes without signals (bulk_create, bulk_update, queryset
+update) must call `bump_version()` itself.
+
+Hits, misses and invalidations are counted in memory by each process and
+added to shared counters in the cache every
+RESPONSE_CACHE_STATS_FLUSH_EVERY events, so most requests write nothing but
+the cached entry.
+"""
+import hashlib
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'response-cache'
+REPLAYED_HEADERS = ('ETag',)
+
+# Events this process hasn't added to the shared counters yet
+pending = Counter()
+
+
+def version_key(label):
+    return f'{PREFIX}:version:{label}'
+
+
+def stats_key(event, name):
+    return f'{PREFIX}:stats:{event}:{name}'
+
+
+def record(event, name):
+    pending[stats_key(event, name)] += 1
+    logger.debug('Response cache %s: %s', event, name)
+    if pending.total() >= settings.RESPONSE_CACHE_STATS_FLUSH_EVERY:
+        flush_stats()
+
+
+def flush_stats():
+    """
+    Add this process's pending counts to the shared counters.
+    """
+    counts = dict(pending)
+    pending.clear()
+    for key, count in counts.items():
+        cache.add(key, 0, None)
+        cache.incr(key, count)
+
+
+def bump_version(*models):
+    """
+    Invalidate every cached response that depends on any of `models`, once
+    the current transaction commits. Bumping earlier would let a concurrent
+    request cache data from before the commit under the new version.
+    """
+    labels = [model._meta.label_lower for model in models]
+    transaction.on_commit(lambda: _bump_versions(labels))
+
+
+def _bump_versions(labels):
+    for label in labels:
+        try:
+            cache.incr(version_key(label))
+        except ValueError:
+            # No counter yet: nothing can have been cached against it
+            pass
+        record('invalidations', label)
+
+
+def get_versions(models):
+    """
+    Current version counter of each model, starting new counters from the
+    clock so they never repeat a value used before an eviction.
+    """
+    keys = [version_key(model._meta.label_lower) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def cached_models():
+    """
+    Every model a cached list depends on.
+    """
+    return list(dict.fromkeys(
+        model for viewset in ScopedResponseCacheMixin.registry for model in viewset.response_cache_models
+    ))
+
+
+def get_stats():
+    """
+    Hits, misses and hit ratio per cached endpoint, and invalidations per
+    model those endpoints depend on, counted by every process. Each other
+    process may hold up to RESPONSE_CACHE_STATS_FLUSH_EVERY events it hasn't
+    added yet.
+    """
+    flush_stats()
+    endpoints = [viewset.response_cache_endpoint() for viewset in ScopedResponseCacheMixin.registry]
+    labels = [model._meta.label_lower for model in cached_models()]
+    counts = cache.get_many(
+        [stats_key(event, endpoint) for endpoint in endpoints for event in ('hits', 'misses')]
+        + [stats_key('invalidations', label) for label in labels]
+    )
+    result = {'endpoints': {}, 'invalidations': {}}
+    for endpoint in endpoints:
+        hits, misses = counts.get(stats_key('hits', endpoint), 0), counts.get(stats_key('misses', endpoint), 0)
+        result['endpoints'][endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    for label in labels:
+        result['invalidations'][label] = counts.get(stats_key('invalidations', label), 0)
+    return result
+
+
+def bump_version_on_change(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached list shows
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_version(sender)
+
+
+def bump_version_on_m2m_change(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(type(instance), model)
+
+
+def connect_signals():
+    """
+    Bump versions on changes to the models cached lists depend on and to
+    their many-to-many links; saves of any other model cost nothing. Call
+    once every cached viewset is defined.
+    """
+    models = cached_models()
+    for model in models:
+        uid = f'{PREFIX}:{model._meta.label_lower}'
+        post_save.connect(bump_version_on_change, sender=model, dispatch_uid=uid)
+        post_delete.connect(bump_version_on_change, sender=model, dispatch_uid=uid)
+    throughs = {field.remote_field.through for model in models for field in model._meta.many_to_many}
+    throughs |= {rel.through for model in models for rel in model._meta.related_objects if rel.many_to_many}
+    for through in throughs:
+        m2m_changed.connect(bump_version_on_m2m_change, sender=through, dispatch_uid=f'{PREFIX}:{through._meta.label_lower}')
+
+
+class ScopedResponseCacheMixin:
+    """
+    Viewset mixin caching list responses per user scope.
+
+    `response_cache_models` lists every model whose changes can alter the
+    list: the listed model, and the ones its payload or role scoping read.
+    Place it before ConditionalListMixin so cached validators answer
+    conditional requests without touching the database.
+    """
+    response_cache_models = ()
+
+    # Every viewset using the mixin, for reporting
+    registry = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        ScopedResponseCacheMixin.registry.append(cls)
+
+    @classmethod
+    def response_cache_endpoint(cls):
+        return f'{cls.__module__}.{cls.__name__}'
+
+    def get_response_cache_scope(self, request):
+        from users.access import get_access_context
+        access = get_access_context(request)
+        if access.is_leadership:
+            return 'all'
+        if access.is_country_level:
+            return f'country:{access.country_id}'
+        if access.is_branch_manager:
+            return f'branch:{access.branch_id}'
+        return 'none'
+
+    def get_response_cache_key(self, request):
+        versions = get_versions(self.response_cache_models)
+        request_key = hashlib.sha1('|'.join([
+            request.build_absolute_uri(),
+            request.accepted_media_type or '',
+            ':'.join(str(version) for version in versions),
+        ]).encode()).hexdigest()
+        return f'{PREFIX}:{self.response_cache_endpoint()}:{self.get_response_cache_scope(request)}:{request_key}'
+
+    def list(self, request, *args, **kwargs):
+        endpoint = self.response_cache_endpoint()
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            record('hits', endpoint)
+            return self.replay_cached_response(request, entry)
+
+        record('misses', endpoint)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, {
+                'data': response.data,
+                'headers': {name: response[name] for name in REPLAYED_HEADERS if name in response},
+            }, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def replay_cached_response(self, request, entry):
+        headers = {name: value for name, value in entry['headers'].items() if name in REPLAYED_HEADERS}
+        response = get_conditional_response(request, etag=headers.get('ETag'))
+        if response is None:
+            response = Response(entry['data'])
+        for name, value in headers.items():
+            response[name] = value
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,95 @@
+# utils/single_flight.py
+"""
+Cross-process locks for coalescing expensive recomputations.
+
+When a cached value goes missing or stale, only the request holding the lock
+for its key recomputes it; concurrent requests, in any gunicorn worker, either
+wait for that result or keep serving the stale value.
+
+On PostgreSQL the lock is a session-level advisory lock, so it also
+coordinates workers on different hosts; other databases fall back to an
+exclusive file lock under SINGLE_FLIGHT_LOCK_DIR.
+"""
+import fcntl
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+POLL_INTERVAL = 0.05
+
+
+def _digest(name):
+    return hashlib.sha1(name.encode()).digest()
+
+
+class AdvisoryLock:
+    def __init__(self, name):
+        # pg advisory locks take a signed 64-bit key
+        self.key = int.from_bytes(_digest(name)[:8], 'big', signed=True)
+
+    def try_acquire(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [self.key])
+            return cursor.fetchone()[0]
+
+    def release(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [self.key])
+
+
+class FileLock:
+    def __init__(self, name):
+        self.path = os.path.join(settings.SINGLE_FLIGHT_LOCK_DIR, f'{_digest(name).hex()}.lock')
+        self.fd = None
+
+    def try_acquire(self):
+        os.makedirs(settings.SINGLE_FLIGHT_LOCK_DIR, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+
+    def release(self):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+def get_lock(name):
+    if connection.vendor == 'postgresql':
+        return AdvisoryLock(name)
+    return FileLock(name)
+
+
+@contextmanager
+def single_flight(name, timeout=None):
+    """
+    Try to become the one process recomputing `name`.
+
+    Yields True while holding the lock. Yields False if another process held
+    it for `timeout` seconds (0: don't wait; None: SINGLE_FLIGHT_WAIT_TIMEOUT);
+    a waiter that got the lock late should re-check whether the value it
+    wanted was produced in the meantime.
+    """
+    timeout = settings.SINGLE_FLIGHT_WAIT_TIMEOUT if timeout is None else timeout
+    lock = get_lock(name)
+    deadline = time.monotonic() + timeout
+
+    acquired = lock.try_acquire()
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        acquired = lock.try_acquire()
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()